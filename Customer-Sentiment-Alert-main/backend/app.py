@@ -1,168 +1,388 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from contextlib import asynccontextmanager
 import asyncio
 import json
 import logging
+import os
 import random
 from datetime import datetime, timedelta
-from typing import List, Dict
-from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import settings
-from models.database import init_db, get_session_maker, SentimentRecord, Alert
-from services.nlp_service import get_nlp_service
+from models.database import init_async_db, get_async_session_maker, SentimentRecord, Alert
+from services.nlp_service import generate_response_suggestion
+from services.inference_executor import get_inference_executor
+from services.loop_monitor import get_loop_monitor
+from services.result_cache import get_result_cache
+from services.startup import StartupTracker
+from services.bulk_ingest import BulkIngestor, iter_json_array, iter_ndjson
+from services.responses import FastJSONResponse, NDJSONStreamingResponse, RawJSONResponse
+from services.serialization import ALERT_COLUMNS, RECORD_COLUMNS, RowEncoder
+from services.stats_aggregator import SentimentLabel, get_stats_aggregator
+from services.term_index import get_term_index
+from services.pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, paginate
+from services.connection_manager import SubscriptionFilter, get_connection_manager
 from services.alert_service import get_alert_service
+from services.write_behind import WriteBehindQueue
+from services.search import search_records
+from services.export import MEDIA_TYPES, build_export_query, create_encoder, stream_export
 from services.demo_data import get_demo_generator
+from services.event_bus import LeaderLock, create_event_bus
+from services.ingest_pipeline import build_ingest_pipeline
+from services.dedupe import get_dedupe_index
+from services.emotion_backfill import EmotionBackfill
+from services import metrics
+from services.metrics import RECORDS_INGESTED, RequestMetricsMiddleware, stage_timer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize database
-engine = init_db(settings.database_url)
-SessionLocal = get_session_maker(engine)
+# Database and models are initialized during startup (see lifespan)
+engine = None
+SessionLocal = None
+write_behind = None
+event_bus = None
+ingest_pipeline = None
+emotion_backfill = None
+leader = LeaderLock(settings.leader_lock_path)
+
+startup = StartupTracker()
 
 # WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+manager = get_connection_manager()
+
+# Records inserted while rebuild_indexes() runs, as (record, observe_alerts); None once it is done
+held_records = None
+
+def index_new_records(records: List[Dict], observe_alerts: bool = True, relayed: bool = False):
+    """Feed freshly inserted records (as dicts) to the in-memory indexes.
+    Relayed records were persisted (and counted) by the worker that published them."""
+    dedupe_index = get_dedupe_index()
+    for record in records:
+        if not relayed:
+            RECORDS_INGESTED.inc(source=record["source"])
+        dedupe_index.add(record["source_id"])
+    if held_records is not None:
+        # The rebuild would replace these updates; apply them once it finishes
+        held_records.extend((record, observe_alerts) for record in records)
+        return
+    _index_records(records, observe_alerts)
+
+def _index_records(records: List[Dict], observe_alerts: bool):
+    stats_aggregator = get_stats_aggregator()
+    term_index = get_term_index()
+    alert_service = get_alert_service()
+    for record in records:
+        stats_aggregator.add_record(record)
+        term_index.add_record(record)
+        if not observe_alerts:
+            continue
+        processed_at = record.get("processed_at")
+        alert_service.observe(
+            record["source"],
+            record["sentiment_score"],
+            datetime.fromisoformat(processed_at) if processed_at else None
+        )
+
+async def rebuild_indexes():
+    """
+    Rebuild the in-memory indexes from the database, in the background after startup.
+    Only rows up to the current max id are read; records inserted meanwhile are held
+    back and indexed afterwards. The CPU-heavy loops run in threads, off the event loop.
+    """
+    global held_records
+    held_records = []
+    last_id = 0
+    try:
+        async with SessionLocal() as db:
+            last_id = await db.scalar(select(func.max(SentimentRecord.id))) or 0
+            term_index = get_term_index()
+            stats_since = datetime.utcnow() - timedelta(hours=settings.stats_retention_hours)
+            term_since = datetime.utcnow() - timedelta(hours=settings.term_retention_hours)
+            result = await db.stream(
+                select(
+                    SentimentRecord.created_at,
+                    SentimentRecord.source,
+                    SentimentRecord.sentiment_label,
+                    SentimentRecord.sentiment_score,
+                    SentimentRecord.text
+                ).where(
+                    SentimentRecord.created_at >= min(stats_since, term_since),
+                    SentimentRecord.id <= last_id
+                ).execution_options(yield_per=5000)
+            )
+            rows = []
+            term_index.clear()
+
+            def index_partition(partition):
+                for created_at, source, label, score, text in partition:
+                    if created_at >= stats_since:
+                        rows.append((created_at, source, label, score))
+                    # Texts are tokenized as they stream past rather than kept around
+                    if created_at >= term_since:
+                        term_index.add(created_at, label, text)
+
+            async for partition in result.partitions():
+                await asyncio.to_thread(index_partition, partition)
+            await asyncio.to_thread(get_stats_aggregator().rebuild, rows)
+            logger.info(f"Rebuilt term index: {term_index.stats()}")
+
+            # Alert windows are keyed on ingest time, oldest first
+            window_start = datetime.utcnow() - timedelta(minutes=settings.alert_window_minutes)
+            rows = await db.execute(
+                select(
+                    SentimentRecord.source,
+                    SentimentRecord.sentiment_score,
+                    SentimentRecord.processed_at
+                ).where(SentimentRecord.processed_at >= window_start, SentimentRecord.id <= last_id)
+                .order_by(SentimentRecord.processed_at, SentimentRecord.id)
+            )
+            get_alert_service().seed(rows)
+
+            # Newest source_ids for the dedupe index, fed oldest first. IDs inserted meanwhile are
+            # already in it, and until the seed completes it sends unknown IDs to the database
+            dedupe_index = get_dedupe_index()
+            seed_limit = max(settings.dedupe_max_entries, settings.dedupe_bloom_capacity)
+            source_ids = (await db.execute(
+                select(SentimentRecord.source_id).order_by(SentimentRecord.id.desc()).limit(seed_limit)
+            )).scalars().all()
+            await asyncio.to_thread(dedupe_index.seed, source_ids[::-1])
+            logger.info(f"Seeded dedupe index: {dedupe_index.stats()}")
+    finally:
+        held, held_records = held_records, None
+        for record, observe_alerts in held:
+            if record.get("id") is None or record["id"] > last_id:
+                _index_records([record], observe_alerts)
+
+def backfill_emotions(records: List[Dict]):
+    """Queue records this worker stored without emotions (cascade mode) for the background backfill"""
+    if emotion_backfill is not None:
+        emotion_backfill.enqueue_missing(records)
+
+def inference_busy() -> bool:
+    """Live mentions are waiting for the models"""
+    return ingest_pipeline.queued() > 0 or get_inference_executor().pending() > 0
+
+# Background task for demo data generation
+def register_runtime_metrics():
+    """Expose counters that other components already keep, read at scrape time"""
+    cache = get_result_cache()
+    loop_monitor = get_loop_monitor()
     
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info(f"Client connected. Total connections: {len(self.active_connections)}")
+    def cache_lookups():
+        stats = cache.stats()
+        return [(("hit",), stats["hits"]), (("disk_hit",), stats["disk_hits"]), (("miss",), stats["misses"])]
     
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-        logger.info(f"Client disconnected. Total connections: {len(self.active_connections)}")
+    def queue_depths():
+        return [
+            (("write_behind",), write_behind.stats()["queued"]),
+            (("websocket",), manager.stats()["queued"]),
+            (("inference",), get_inference_executor().pending()),
+        ]
     
-    async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to client: {e}")
+    def loop_lag():
+        snapshot = loop_monitor.snapshot()
+        return [(("0.5",), snapshot["p50_ms"] / 1000), (("0.99",), snapshot["p99_ms"] / 1000), (("1",), snapshot["max_ms"] / 1000)]
+    
+    metrics.callback("sentiguard_cache_lookups_total", "Sentiment result cache lookups", "counter", cache_lookups, ("result",))
+    metrics.callback("sentiguard_queue_depth", "Items waiting in internal queues", "gauge", queue_depths, ("queue",))
+    metrics.callback("sentiguard_event_loop_lag_seconds", "Event loop scheduling lag over the recent sample window", "gauge", loop_lag, ("quantile",))
+    metrics.callback("sentiguard_websocket_clients", "Connected WebSocket clients", "gauge", lambda: [((), manager.stats()["clients"])])
+    metrics.callback("sentiguard_websocket_dropped_total", "Messages dropped for slow WebSocket clients", "counter", lambda: [((), manager.stats()["dropped"])])
+    metrics.callback("sentiguard_is_leader", "1 when this worker runs background ingestion", "gauge", lambda: [((), int(leader.is_leader))])
+    metrics.callback(
+        "sentiguard_event_bus_messages_total", "Events exchanged with other workers", "counter",
+        lambda: [((key,), value) for key, value in event_bus.stats().items() if key in ("published", "received", "dropped")],
+        ("direction",)
+    )
+    def pipeline_queues():
+        return [((name,), stage["queued"]) for name, stage in ingest_pipeline.stats()["stages"].items()]
+    
+    def pipeline_items():
+        return [
+            ((name, outcome), stage[outcome])
+            for name, stage in ingest_pipeline.stats()["stages"].items()
+            for outcome in ("in", "out", "failed")
+        ]
+    
+    metrics.callback("sentiguard_pipeline_queue_depth", "Mentions waiting at each ingest pipeline stage", "gauge", pipeline_queues, ("stage",))
+    metrics.callback("sentiguard_pipeline_items_total", "Mentions taken in, passed on and failed per ingest stage", "counter", pipeline_items, ("stage", "outcome"))
+    metrics.callback(
+        "sentiguard_dedupe_checks_total", "Dedupe index lookups: duplicate, new (no DB lookup) or unknown (DB lookup)", "counter",
+        lambda: [((result,), value) for result, value in get_dedupe_index().counts.items()], ("result",)
+    )
+    if emotion_backfill is not None:
+        metrics.callback(
+            "sentiguard_emotion_backfill_total", "Records queued, filled, dropped and failed by the emotion backfill", "counter",
+            lambda: [((outcome,), value) for outcome, value in emotion_backfill.counts.items()], ("outcome",)
+        )
+    metrics.callback("sentiguard_db_transactions_total", "Write-behind transactions committed", "counter", lambda: [((), write_behind.counts["transactions"])])
 
-manager = ConnectionManager()
+async def publish(message: dict, source: str = None):
+    """Send an event to this worker's clients and to the other workers"""
+    await manager.broadcast(message, source=source)
+    event_bus.publish(message, source)
 
-# Background task for demo data generation
-async def demo_data_task():
-    """Generate demo data periodically for hackathon presentation"""
-    nlp_service = get_nlp_service()
-    alert_service = get_alert_service()
+async def on_bus_event(message: dict, source: str = None):
+    """Events ingested by another worker: index them here, then relay to our clients"""
+    if message.get("type") == "records":
+        # Inserted without a broadcast, only the indexes need them
+        index_new_records(message["data"], relayed=True)
+        return
+    if message.get("type") == "sentiment":
+        index_new_records([message["data"]], relayed=True)
+    await manager.broadcast(message, source=source)
+
+async def run_as_leader(job):
+    """Only one worker runs background ingestion; standbys take over if it exits"""
+    await leader.acquire()
+    logger.info(f"Worker {os.getpid()} is the ingestion leader")
+    await job()
+
+async def demo_mentions():
+    """Generate a demo mention every 10-30 seconds for hackathon presentation"""
     demo_generator = get_demo_generator()
-    
-    await asyncio.sleep(5)  # Wait for startup
-    
     while True:
-        try:
-            # Generate a demo mention every 10-30 seconds
-            await asyncio.sleep(random.randint(10, 30))
-            
-            mention = demo_generator.generate_demo_mention()
-            
-            # Analyze sentiment
-            sentiment = nlp_service.analyze_sentiment(mention['text'])
-            
-            # Save to database
-            db = SessionLocal()
-            try:
-                # Check if this source_id already exists to prevent duplicates
-                existing = db.query(SentimentRecord).filter(
-                    SentimentRecord.source_id == mention['source_id']
-                ).first()
-                
-                if existing:
-                    db.close()
-                    continue
-                
-                record = SentimentRecord(
-                    source=mention['source'],
-                    source_id=mention['source_id'],
-                    text=mention['text'],
-                    sentiment_score=sentiment['score'],
-                    sentiment_label=sentiment['label'],
-                    confidence=sentiment['confidence'],
-                    emotions=json.dumps(sentiment['emotions']),
-                    author=mention['author'],
-                    created_at=mention['created_at']
-                )
-                db.add(record)
-                db.commit()
-                db.refresh(record)
-                
-                # Check if alert needed
-                recent_records = db.query(SentimentRecord).filter(
-                    SentimentRecord.created_at >= datetime.utcnow() - timedelta(minutes=15)
-                ).all()
-                recent_scores = [r.sentiment_score for r in recent_records]
-                
-                should_alert, severity = alert_service.should_create_alert(
-                    sentiment['score'], recent_scores
-                )
-                
-                if should_alert:
-                    alert_msg = alert_service.create_alert_message(
-                        severity, mention['text'], mention['source'],
-                        mention['author'], sentiment['score']
-                    )
-                    
-                    suggested_response = nlp_service.generate_response_suggestion(
-                        mention['text'], sentiment['score']
-                    )
-                    
-                    alert = Alert(
-                        severity=severity,
-                        title=alert_msg['title'],
-                        message=alert_msg['message'],
-                        sentiment_record_id=record.id,
-                        suggested_response=suggested_response
-                    )
-                    db.add(alert)
-                    db.commit()
-                    db.refresh(alert)
-                    
-                    # Broadcast alert
-                    await manager.broadcast({
-                        'type': 'alert',
-                        'data': alert.to_dict()
-                    })
-                
-                # Broadcast new sentiment
-                await manager.broadcast({
-                    'type': 'sentiment',
-                    'data': record.to_dict()
-                })
-                
-            finally:
-                db.close()
-                
-        except Exception as e:
-            logger.error(f"Error in demo data task: {e}")
+        await asyncio.sleep(random.randint(10, 30))
+        yield demo_generator.generate_demo_mention()
 
-import random
+async def on_ingested(items):
+    """Last pipeline stage: index the committed records and broadcast them"""
+    for item in items:
+        record_dict = item.record.to_dict()
+        index_new_records([record_dict], observe_alerts=False)  # the alerts stage already observed it
+        backfill_emotions([record_dict])
+        if item.alert is not None:
+            await publish({'type': 'alert', 'data': item.alert.to_dict()}, source=item.record.source)
+        await publish({'type': 'sentiment', 'data': record_dict})
+
+async def demo_data_task():
+    """Feed demo mentions into the ingestion pipeline once the models are warm"""
+    await startup.wait_ready()
+    await ingest_pipeline.add_source(demo_mentions())
+
+async def warm_up_models() -> bool:
+    """Load the models and run a dummy batch"""
+    inference = get_inference_executor()
+    try:
+        with startup.phase("model_load"):
+            await inference.load_models()
+        with startup.phase("warm_up"):
+            await inference.warm_up()
+    except Exception as e:
+        logger.error(f"Model warm-up failed: {e}")
+        return False
+    return True
+
+async def load_indexes() -> bool:
+    try:
+        with startup.phase("indexes"):
+            await rebuild_indexes()
+    except Exception as e:
+        logger.error(f"Index rebuild failed: {e}")
+        return False
+    return True
+
+async def get_ready():
+    """Warm up the models and rebuild the indexes in the background, then report ready"""
+    if all(await asyncio.gather(warm_up_models(), load_indexes())):
+        startup.mark_ready()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global engine, SessionLocal, write_behind, event_bus, ingest_pipeline, emotion_backfill
+    
     # Startup
     logger.info("Starting SentiGuard API...")
     
-    # Start background task for demo data
-    task = asyncio.create_task(demo_data_task())
+    with startup.phase("database"):
+        engine = await init_async_db(
+            settings.database_url,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            sqlite_wal=settings.sqlite_wal,
+            sqlite_busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+            sqlite_cache_size_kb=settings.sqlite_cache_size_kb
+        )
+        SessionLocal = get_async_session_maker(engine)
+        write_behind = WriteBehindQueue(
+            SessionLocal,
+            max_batch_size=settings.write_batch_size,
+            max_delay_ms=settings.write_max_delay_ms,
+            max_queue_size=settings.write_queue_size
+        )
+        write_behind.start()
+        ingest_pipeline = build_ingest_pipeline(
+            SessionLocal,
+            get_inference_executor(),
+            write_behind,
+            get_alert_service(),
+            get_dedupe_index(),
+            on_ingested,
+            queue_size=settings.pipeline_queue_size,
+            batch_size=settings.pipeline_batch_size,
+            max_wait_ms=settings.pipeline_max_wait_ms,
+            inference_concurrency=settings.pipeline_inference_concurrency,
+            persist_concurrency=settings.pipeline_persist_concurrency
+        )
+        ingest_pipeline.start()
+        if settings.emotion_cascade and settings.emotion_backfill:
+            emotion_backfill = EmotionBackfill(
+                SessionLocal,
+                get_inference_executor(),
+                batch_size=settings.emotion_backfill_batch_size,
+                max_queue_size=settings.emotion_backfill_queue_size,
+                is_busy=inference_busy
+            )
+            emotion_backfill.start()
+    register_runtime_metrics()
+    
+    loop_monitor = get_loop_monitor()
+    loop_monitor.start()
+    
+    # Events from other workers (a no-op bus when running a single process)
+    event_bus = create_event_bus(settings.event_bus, settings.event_bus_socket)
+    event_bus.subscribe(on_bus_event)
+    await event_bus.start()
+    
+    # Models and indexes load off the request path; /readyz reports when both are done
+    warm_up_task = asyncio.create_task(get_ready())
+    
+    # Start background task for demo data (in the leader worker only)
+    task = asyncio.create_task(run_as_leader(demo_data_task)) if settings.demo_data_enabled else None
     
     yield
     
     # Shutdown
     logger.info("Shutting down SentiGuard API...")
-    task.cancel()
+    warm_up_task.cancel()
+    if task is not None:
+        task.cancel()
+    await ingest_pipeline.close()  # Let mentions already in the pipeline finish
+    if emotion_backfill is not None:
+        await emotion_backfill.close()
+    await write_behind.close()  # Commit whatever is still queued
+    await event_bus.close()
+    leader.release()
+    await manager.close_all()
+    loop_monitor.stop()
+    get_inference_executor().shutdown(wait=False)
+    await engine.dispose()
 
 # Create FastAPI app
 app = FastAPI(
     title="SentiGuard API",
     description="Real-time Customer Sentiment Monitoring System",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -172,15 +392,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+app.add_middleware(RequestMetricsMiddleware)
 
 # Dependency for database session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # REST API Endpoints
 
@@ -192,33 +411,98 @@ async def root():
         "status": "running"
     }
 
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving"""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: models are loaded and warmed, safe to route traffic here"""
+    snapshot = startup.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+_record_encoder = RowEncoder([column.key for column in RECORD_COLUMNS])
+_alert_encoder = RowEncoder([column.key for column in ALERT_COLUMNS])
+
+async def _page(db: AsyncSession, statement, model, encoder: RowEncoder, limit: int, cursor: str):
+    """Fast path: column tuples straight to JSON bytes, no ORM objects or to_dict()"""
+    try:
+        rows, next_cursor = await paginate(db, statement, model, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return RawJSONResponse(encoder.encode_array(rows), headers=headers)
+
 @app.get("/api/sentiments")
 async def get_sentiments(
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
     source: str = None,
-    db: Session = Depends(get_db)
+    cursor: str = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get recent sentiment records"""
-    query = db.query(SentimentRecord).order_by(SentimentRecord.created_at.desc())
+    """Get recent sentiment records, newest first. Pass the X-Next-Cursor header back as cursor for the next page"""
+    statement = select(*RECORD_COLUMNS)
     
     if source:
-        query = query.filter(SentimentRecord.source == source)
+        statement = statement.where(SentimentRecord.source == source)
     
-    records = query.limit(limit).all()
-    return [record.to_dict() for record in records]
+    return await _page(db, statement, SentimentRecord, _record_encoder, limit, cursor)
+
+@app.get("/api/search")
+async def search(
+    response: Response,
+    q: str,
+    limit: int = Query(20, ge=1, le=200),
+    sort: str = "relevance",
+    source: str = None,
+    label: str = None,
+    since: datetime = None,
+    until: datetime = None,
+    cursor: str = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Full-text search over mention text. Words must all match, "quoted phrases" match in order,
+    and word* matches a prefix. sort is relevance (bm25) or recent (newest ingested first).
+    Pass the X-Next-Cursor header back as cursor for the next page
+    """
+    try:
+        results, next_cursor = await search_records(
+            db, q, limit=limit, cursor=cursor, sort=sort,
+            source=source, label=label, since=since, until=until
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return results
 
 @app.get("/api/sentiments/stats")
 async def get_sentiment_stats(
     hours: int = 24,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get sentiment statistics"""
+    stats_aggregator = get_stats_aggregator()
+    if stats_aggregator.covers(hours):
+        return stats_aggregator.stats(hours)
+    
+    # Window is longer than the in-memory retention: aggregate in the database
     since = datetime.utcnow() - timedelta(hours=hours)
-    records = db.query(SentimentRecord).filter(
-        SentimentRecord.created_at >= since
-    ).all()
+    by_label = dict((await db.execute(
+        select(SentimentRecord.sentiment_label, func.count())
+        .where(SentimentRecord.created_at >= since)
+        .group_by(SentimentRecord.sentiment_label)
+    )).all())
+    source_rows = (await db.execute(
+        select(SentimentRecord.source, func.count(), func.sum(SentimentRecord.sentiment_score))
+        .where(SentimentRecord.created_at >= since)
+        .group_by(SentimentRecord.source)
+    )).all()
     
-    if not records:
+    total = sum(count for _, count, _ in source_rows)
+    if not total:
         return {
             "total": 0,
             "positive": 0,
@@ -228,64 +512,133 @@ async def get_sentiment_stats(
             "by_source": {}
         }
     
-    total = len(records)
-    positive = sum(1 for r in records if r.sentiment_label == "positive")
-    negative = sum(1 for r in records if r.sentiment_label == "negative")
-    neutral = sum(1 for r in records if r.sentiment_label == "neutral")
-    avg_score = sum(r.sentiment_score for r in records) / total
-    
-    # By source
-    by_source = {}
-    for record in records:
-        if record.source not in by_source:
-            by_source[record.source] = {"count": 0, "avg_score": 0, "scores": []}
-        by_source[record.source]["count"] += 1
-        by_source[record.source]["scores"].append(record.sentiment_score)
-    
-    for source in by_source:
-        scores = by_source[source]["scores"]
-        by_source[source]["avg_score"] = sum(scores) / len(scores)
-        del by_source[source]["scores"]
+    avg_score = sum(score_sum or 0 for _, _, score_sum in source_rows) / total
+    by_source = {
+        source: {"count": count, "avg_score": (score_sum or 0) / count}
+        for source, count, score_sum in source_rows
+    }
     
     return {
         "total": total,
-        "positive": positive,
-        "negative": negative,
-        "neutral": neutral,
+        "positive": by_label.get("positive", 0),
+        "negative": by_label.get("negative", 0),
+        "neutral": by_label.get("neutral", 0),
         "average_score": round(avg_score, 3),
         "by_source": by_source
     }
 
+@app.get("/api/terms/top")
+async def get_top_terms(
+    hours: int = Query(24, ge=1, le=settings.term_retention_hours),
+    k: int = Query(20, ge=1, le=200),
+    label: Optional[SentimentLabel] = None
+):
+    """Most frequent terms (counted once per mention) over the last `hours`, optionally for one sentiment label"""
+    return {
+        "hours": hours,
+        "label": label,
+        "terms": get_term_index().top(hours, k=k, label=label)
+    }
+
 @app.get("/api/alerts")
 async def get_alerts(
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
     resolved: bool = None,
-    db: Session = Depends(get_db)
+    cursor: str = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get alerts"""
-    query = db.query(Alert).order_by(Alert.created_at.desc())
+    """Get alerts, newest first. Pass the X-Next-Cursor header back as cursor for the next page"""
+    statement = select(*ALERT_COLUMNS)
     
     if resolved is not None:
-        query = query.filter(Alert.is_resolved == (1 if resolved else 0))
+        statement = statement.where(Alert.is_resolved == (1 if resolved else 0))
     
-    alerts = query.limit(limit).all()
-    return [alert.to_dict() for alert in alerts]
+    return await _page(db, statement, Alert, _alert_encoder, limit, cursor)
+
+@app.get("/api/export")
+async def export_report(
+    kind: str = "sentiments",
+    format: str = "csv",
+    since: datetime = None,
+    until: datetime = None,
+    source: str = None
+):
+    """
+    Stream every sentiment record or alert in [since, until), oldest first, as csv, ndjson or parquet
+    Rows are read off a server-side cursor and encoded chunk by chunk
+    """
+    try:
+        columns, statement = build_export_query(kind, since, until, source)
+        encoder = create_encoder(format, columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    filename = f"sentiguard-{kind}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.{format}"
+    return StreamingResponse(
+        stream_export(SessionLocal, statement, encoder, chunk_size=settings.export_chunk_size),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of stage latencies, counters and queue gauges"""
+    return Response(metrics.render_metrics(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/system/loop-lag")
+async def get_loop_lag():
+    """Event loop scheduling lag, to confirm inference stays off the loop"""
+    return get_loop_monitor().snapshot()
+
+@app.get("/api/system/inference")
+async def get_inference_stats():
+    """Inference executor mode and backlog; in pool mode per-worker CPUs and shared/private memory"""
+    return get_inference_executor().stats()
+
+@app.get("/api/system/cache")
+async def get_cache_stats():
+    """Sentiment result cache counters"""
+    return get_result_cache().stats()
+
+@app.get("/api/system/writes")
+async def get_write_stats():
+    """Write-behind queue depth and group-commit counters"""
+    return write_behind.stats()
+
+@app.get("/api/system/websockets")
+async def get_websocket_stats():
+    """WebSocket fan-out queue counters"""
+    return manager.stats()
+
+@app.get("/api/system/pipeline")
+async def get_pipeline_stats():
+    """Ingest pipeline queue depths and per-stage throughput, plus the dedupe index"""
+    return {
+        **ingest_pipeline.stats(),
+        "dedupe": get_dedupe_index().stats(),
+        "emotion_backfill": emotion_backfill.stats() if emotion_backfill is not None else None
+    }
+
+@app.get("/api/system/workers")
+async def get_worker_stats():
+    """This worker's event bus connection and whether it is the ingestion leader"""
+    return {"pid": os.getpid(), "leader": leader.is_leader, "event_bus": event_bus.stats()}
 
 @app.post("/api/alerts/{alert_id}/resolve")
-async def resolve_alert(alert_id: int, db: Session = Depends(get_db)):
+async def resolve_alert(alert_id: int, db: AsyncSession = Depends(get_db)):
     """Mark an alert as resolved"""
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    alert = await db.get(Alert, alert_id)
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
     
     alert.is_resolved = 1
     alert.resolved_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     return {"message": "Alert resolved", "alert": alert.to_dict()}
 
 @app.post("/api/analyze")
-async def analyze_text(data: dict, db: Session = Depends(get_db)):
+async def analyze_text(data: dict):
     """Manually analyze text"""
     text = data.get("text", "")
     source = data.get("source", "manual")
@@ -294,8 +647,8 @@ async def analyze_text(data: dict, db: Session = Depends(get_db)):
     if not text:
         raise HTTPException(status_code=400, detail="Text is required")
     
-    nlp_service = get_nlp_service()
-    sentiment = nlp_service.analyze_sentiment(text)
+    with stage_timer("inference"):
+        sentiment = await get_inference_executor().analyze_sentiment(text)
     
     # Save to database
     record = SentimentRecord(
@@ -308,30 +661,67 @@ async def analyze_text(data: dict, db: Session = Depends(get_db)):
         emotions=json.dumps(sentiment['emotions']),
         author=author
     )
-    db.add(record)
-    db.commit()
-    db.refresh(record)
+    with stage_timer("persist"):
+        await write_behind.add(record)
+    record_dict = record.to_dict()
+    index_new_records([record_dict])
+    backfill_emotions([record_dict])
     
     # Broadcast
-    await manager.broadcast({
+    await publish({
         'type': 'sentiment',
-        'data': record.to_dict()
+        'data': record_dict
     })
     
-    return record.to_dict()
+    return record_dict
+
+@app.post("/api/analyze/batch")
+async def analyze_batch(request: Request, broadcast: bool = False):
+    """
+    Bulk-analyze mentions from a JSON array or a streamed NDJSON body
+    (Content-Type: application/x-ndjson). Streams back one NDJSON line per item
+    with status ok, duplicate or error, followed by a summary line.
+    """
+    content_type = request.headers.get("content-type", "")
+    
+    async def on_inserted(records):
+        index_new_records(records)
+        backfill_emotions(records)
+        if broadcast:
+            for record in records:
+                await publish({'type': 'sentiment', 'data': record})
+        else:
+            event_bus.publish({'type': 'records', 'data': records})
+    
+    ingestor = BulkIngestor(
+        SessionLocal,
+        get_inference_executor(),
+        chunk_size=settings.ingest_batch_size,
+        on_inserted=on_inserted
+    )
+    
+    async def results():
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            items = iter_ndjson(request.stream())
+        else:
+            items = iter_json_array(await request.body())
+        async for line in ingestor.run(items):
+            yield line
+    
+    return NDJSONStreamingResponse(results())
 
 @app.post("/api/demo/crisis")
-async def trigger_crisis_demo(db: Session = Depends(get_db)):
+async def trigger_crisis_demo():
     """Trigger a crisis scenario for demo purposes"""
     demo_generator = get_demo_generator()
-    nlp_service = get_nlp_service()
+    inference = get_inference_executor()
     alert_service = get_alert_service()
     
     crisis_mentions = demo_generator.generate_crisis_scenario()
     results = []
     
     for mention in crisis_mentions:
-        sentiment = nlp_service.analyze_sentiment(mention['text'])
+        sentiment = await inference.analyze_sentiment(mention['text'])
         
         record = SentimentRecord(
             source=mention['source'],
@@ -344,9 +734,6 @@ async def trigger_crisis_demo(db: Session = Depends(get_db)):
             author=mention['author'],
             created_at=mention['created_at']
         )
-        db.add(record)
-        db.commit()
-        db.refresh(record)
         
         # Create alert
         alert_msg = alert_service.create_alert_message(
@@ -358,20 +745,19 @@ async def trigger_crisis_demo(db: Session = Depends(get_db)):
             severity="critical",
             title=alert_msg['title'],
             message=alert_msg['message'],
-            sentiment_record_id=record.id,
-            suggested_response=nlp_service.generate_response_suggestion(
+            suggested_response=generate_response_suggestion(
                 mention['text'], sentiment['score']
             )
         )
-        db.add(alert)
-        db.commit()
-        db.refresh(alert)
+        await write_behind.add(record, alert)
+        record_dict = record.to_dict()
+        index_new_records([record_dict])
         
         # Broadcast
-        await manager.broadcast({'type': 'sentiment', 'data': record.to_dict()})
-        await manager.broadcast({'type': 'alert', 'data': alert.to_dict()})
+        await publish({'type': 'sentiment', 'data': record_dict})
+        await publish({'type': 'alert', 'data': alert.to_dict()}, source=mention['source'])
         
-        results.append(record.to_dict())
+        results.append(record_dict)
         
         await asyncio.sleep(0.5)  # Stagger the broadcasts
     
@@ -379,15 +765,39 @@ async def trigger_crisis_demo(db: Session = Depends(get_db)):
 
 # WebSocket endpoint
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket, coalesce: bool = None):
+    """
+    Live events. With ?coalesce=true events arrive as periodic 'batch' frames with counter deltas.
+    Clients may narrow the stream by sending
+      {"type": "subscribe", "filters": {"events": [...], "sources": [...], "severities": [...], "labels": [...]}}
+    Any other message is treated as a heartbeat ping.
+    """
+    if coalesce is None:
+        coalesce = settings.ws_coalesce_default
+    await manager.connect(websocket, coalesce=coalesce)
     try:
         while True:
-            # Keep connection alive
             data = await websocket.receive_text()
+            try:
+                message = json.loads(data)
+            except ValueError:
+                message = None
+            
+            if isinstance(message, dict) and message.get("type") == "subscribe":
+                try:
+                    subscription = SubscriptionFilter.from_message(message.get("filters") or {})
+                except ValueError as e:
+                    manager.send(websocket, {"type": "error", "message": str(e)})
+                    continue
+                manager.subscribe(websocket, subscription)
+                manager.send(websocket, {"type": "subscribed", "filters": subscription.to_dict()})
+                continue
+            
             # Echo back for heartbeat
-            await websocket.send_json({"type": "pong"})
+            manager.send(websocket, {"type": "pong"})
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket)
 
 if __name__ == "__main__":
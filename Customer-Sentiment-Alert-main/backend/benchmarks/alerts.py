@@ -0,0 +1,62 @@
+"""
+AlertService benchmark: observe + evaluate per ingested mention
+Replays a deterministic score stream over several sources with advancing timestamps
+
+    python -m benchmarks.alerts --events 200000 --sources 8
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from services.alert_service import AlertService
+
+
+def benchmark(events: int = 200000, sources: int = 8, events_per_second: float = 50.0, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    names = [f"source_{i}" for i in range(sources)]
+    stream = [(names[i % sources], round(rng.uniform(-1, 1), 3)) for i in range(events)]
+    start_ts = datetime.utcnow() - timedelta(seconds=events / events_per_second)
+    step = timedelta(seconds=1 / events_per_second)
+
+    service = AlertService()
+    alerts = 0
+    samples = []
+    start = time.perf_counter()
+    ts = start_ts
+    for i, (source, score) in enumerate(stream):
+        t = time.perf_counter()
+        service.observe(source, score, ts)
+        should_alert, _ = service.evaluate(source, score)
+        if i % 100 == 0:
+            samples.append((time.perf_counter() - t) * 1e6)
+        alerts += should_alert
+        ts += step
+    elapsed = time.perf_counter() - start
+
+    samples.sort()
+    return {
+        "events": events,
+        "sources": sources,
+        "alerts_raised": alerts,
+        "events_per_second": round(events / elapsed),
+        "p99_us": round(samples[int(0.99 * (len(samples) - 1))], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--sources", type=int, default=8)
+    args = parser.parse_args()
+
+    print(json.dumps(benchmark(args.events, args.sources), indent=2))
+
+
+if __name__ == "__main__":
+    main()
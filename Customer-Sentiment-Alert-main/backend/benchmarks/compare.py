@@ -0,0 +1,78 @@
+"""
+Compare two benchmark result files and flag regressions
+Exits with status 1 when any metric got worse by more than the threshold
+
+    python -m benchmarks.compare baseline.json benchmarks/results/latest.json --threshold 0.15
+"""
+import argparse
+import json
+import sys
+from typing import Optional
+
+LOWER_IS_BETTER = ("_ms", "_us", "_seconds")
+HIGHER_IS_BETTER = ("_per_second",)
+
+
+def direction(metric: str) -> Optional[int]:
+    """+1 when higher is better, -1 when lower is better, None for informational values"""
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return None
+
+
+def compare(baseline: dict, current: dict, threshold: float):
+    """Rows of (case, metric, baseline, current, relative change, status)"""
+    rows = []
+    for case, metrics in sorted(current.items()):
+        before = baseline.get(case)
+        if before is None:
+            continue
+        for metric, value in metrics.items():
+            if metric == "consistent":
+                if value is False:
+                    rows.append((case, metric, before.get(metric), value, None, "FAILED"))
+                continue
+            sign = direction(metric)
+            old = before.get(metric)
+            if sign is None or not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or old == 0:
+                continue
+            change = (value - old) / abs(old)
+            if sign * change < -threshold:
+                status = "REGRESSION"
+            elif sign * change > threshold:
+                status = "improved"
+            else:
+                status = "ok"
+            rows.append((case, metric, old, value, change, status))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative change treated as noise (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    rows = compare(baseline["results"], current["results"], args.threshold)
+    print(f"baseline {baseline['meta'].get('commit')} -> current {current['meta'].get('commit')}, threshold {args.threshold:.0%}")
+    for case, metric, old, new, change, status in rows:
+        delta = f"{change:+.1%}" if change is not None else ""
+        print(f"{status:>10}  {case:<32} {metric:<30} {old!s:>12} -> {new!s:<12} {delta}")
+
+    bad = [row for row in rows if row[5] in ("REGRESSION", "FAILED")]
+    if bad:
+        print(f"{len(bad)} regression(s)")
+        sys.exit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+NLPService inference benchmark (stub models by default, no downloads)
+Single-text latency through the micro-batcher, analyze_batch latency, and
+throughput with many concurrent callers, and full vs cascade (emotion model only
+where needed) throughput on mostly-positive traffic
+
+    python -m benchmarks.inference --texts 256 --batch-size 64
+    python -m benchmarks.inference --backend transformers
+    python -m benchmarks.inference --cascade --positive-share 0.9
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import wait
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+from services.inference_backends import create_backend
+from services.nlp_service import NLPService
+from services.result_cache import SentimentCache
+
+SAMPLE_TEXTS = [
+    "Your customer service is absolutely terrible. Been waiting for 3 hours with no response!",
+    "Just tried your new feature and it's incredible! Best update ever!",
+    "The product is okay, nothing special but does the job.",
+    "Refund still hasn't arrived after two weeks. Very disappointed.",
+    "Support fixed my issue in five minutes, thank you so much!",
+    "App crashes every time I open the settings page.",
+]
+
+
+def make_texts(count: int):
+    """Distinct texts, so nothing is served from a cache"""
+    return [f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} #{i}" for i in range(count)]
+
+
+def _percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def benchmark(backend: str = "stub", texts: int = 256, batch_size: int = 64) -> dict:
+    nlp = NLPService(
+        backend=create_backend(backend, settings.model_export_dir),
+        cache=SentimentCache(max_entries=0)  # measure the models, not the cache
+    )
+    try:
+        nlp.warm_up()
+
+        # One caller at a time: each request waits out the batcher's max_wait on its own
+        latencies = []
+        for text in make_texts(min(texts, 100)):
+            start = time.perf_counter()
+            nlp.analyze_sentiment(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        batch = make_texts(batch_size)
+        batch_latencies = []
+        for _ in range(5):
+            start = time.perf_counter()
+            nlp.analyze_batch(batch)
+            batch_latencies.append((time.perf_counter() - start) * 1000)
+
+        # Many callers at once: the scheduler coalesces them into model batches
+        start = time.perf_counter()
+        futures = [nlp.submit(text) for text in make_texts(texts)]
+        wait(futures)
+        concurrent_seconds = time.perf_counter() - start
+
+        return {
+            "backend": backend,
+            "single_p50_ms": round(_percentile(latencies, 50), 3),
+            "single_p99_ms": round(_percentile(latencies, 99), 3),
+            "batch_size": batch_size,
+            "batch_p50_ms": round(_percentile(batch_latencies, 50), 3),
+            "batch_texts_per_second": round(batch_size / (_percentile(batch_latencies, 50) / 1000)),
+            "concurrent_texts_per_second": round(texts / concurrent_seconds),
+        }
+    finally:
+        nlp.batch_scheduler.shutdown()
+
+
+def _mostly_positive(full: NLPService, cascade: NLPService, count: int, positive_share: float):
+    """
+    Distinct texts of which positive_share are ones the cascade skips (positive and confident
+    by the backend's own sentiment pass) and the rest need the emotion model
+    """
+    candidates = make_texts(count * 8)
+    results = full.analyze_batch(candidates)
+    skipped = [text for text, result in zip(candidates, results) if not cascade._needs_emotions(result)]
+    needed = [text for text, result in zip(candidates, results) if cascade._needs_emotions(result)]
+    positives = min(int(round(count * positive_share)), len(skipped))
+    mix = skipped[:positives] + needed[:count - positives]
+    # Interleaved, as live traffic would be
+    return [text for _, text in sorted(enumerate(mix), key=lambda item: (item[0] * 7919) % len(mix))]
+
+
+def cascade_benchmark(backend: str = "stub", texts: int = 256, batch_size: int = 64, positive_share: float = 0.9) -> dict:
+    full, cascade = [
+        NLPService(backend=create_backend(backend, settings.model_export_dir), cache=SentimentCache(max_entries=0))
+        for _ in range(2)
+    ]
+    cascade.emotion_cascade = True
+    try:
+        full.warm_up()
+        cascade.warm_up()
+        mix = _mostly_positive(full, cascade, texts, positive_share)
+        batches = [mix[i:i + batch_size] for i in range(0, len(mix), batch_size)]
+
+        def texts_per_second(nlp: NLPService) -> float:
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                for batch in batches:
+                    nlp.analyze_batch(batch)
+                best = min(best, time.perf_counter() - start)
+            return len(mix) / best
+
+        full_rate = texts_per_second(full)
+        cascade_rate = texts_per_second(cascade)
+        needs_emotions = sum(cascade._needs_emotions(result) for result in full.analyze_batch(mix))
+        return {
+            "backend": backend,
+            "texts": len(mix),
+            "emotion_model_share": round(needs_emotions / len(mix), 3),
+            "full_texts_per_second": round(full_rate),
+            "cascade_texts_per_second": round(cascade_rate),
+            "speedup": round(cascade_rate / full_rate, 2),
+        }
+    finally:
+        full.batch_scheduler.shutdown()
+        cascade.batch_scheduler.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", default="stub", help="stub, transformers, onnx or torchscript")
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--cascade", action="store_true", help="compare full and cascade inference instead")
+    parser.add_argument("--positive-share", type=float, default=0.9, help="share of confident positive texts in the cascade mix")
+    args = parser.parse_args()
+
+    if args.cascade:
+        print(json.dumps(cascade_benchmark(args.backend, args.texts, args.batch_size, args.positive_share), indent=2))
+    else:
+        print(json.dumps(benchmark(args.backend, args.texts, args.batch_size), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Inference pool scaling benchmark: throughput with 1..N forked workers
+The default stub model burns CPU instead of sleeping, so the numbers follow the
+cores actually available; --weights-mb gives it a ballast "model" to show that
+workers share it copy-on-write instead of holding their own copy
+
+    python -m benchmarks.inference_scaling                       # 1, 2, 4 ... up to the CPU count
+    python -m benchmarks.inference_scaling --workers 1,8,16,32 --threads 1
+    python -m benchmarks.inference_scaling --backend transformers --workers 1,4,8 --threads 4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import wait
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+from services.inference_backends import StubBackend, create_backend
+from services.inference_pool import InferencePool
+from services.nlp_service import NLPService
+from services.result_cache import SentimentCache
+
+from benchmarks.inference import make_texts
+
+
+def default_worker_counts():
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    counts, workers = [], 1
+    while workers < cpus:
+        counts.append(workers)
+        workers *= 2
+    return counts + [cpus]
+
+
+def _service_loader(backend: str, weights_mb: int):
+    def load() -> NLPService:
+        # Spinning stub: about 5 ms of CPU per 16-text batch and model
+        model = StubBackend(base_ms=1.0, per_text_ms=0.25, spin=True) if backend == "stub" \
+            else create_backend(backend, settings.model_export_dir)
+        service = NLPService(backend=model, cache=SentimentCache(max_entries=0))
+        if weights_mb:
+            service.ballast = b"\x01" * (weights_mb * 1024 * 1024)  # resident, like real weights
+        return service
+    return load
+
+
+def run_pool(backend: str, workers: int, threads: int, texts: int, batch_size: int, weights_mb: int) -> dict:
+    pool = InferencePool(
+        _service_loader(backend, weights_mb), workers=workers, threads_per_worker=threads, max_batch_size=batch_size
+    )
+    try:
+        pool.start()
+        pool.wait_ready()
+        # Warm pass so the timed run doesn't include first-batch costs
+        pool.analyze_batch(make_texts(batch_size * workers)).result()
+
+        # Many concurrent single texts, as HTTP traffic arrives; workers batch what queues up
+        start = time.perf_counter()
+        futures = [pool.analyze_sentiment(text) for text in make_texts(texts)]
+        wait(futures)
+        elapsed = time.perf_counter() - start
+        stats = pool.stats()
+        return {
+            "workers": workers,
+            "threads_per_worker": threads,
+            "texts_per_second": round(texts / elapsed),
+            "mean_batch": round(stats["texts"] / max(1, stats["batches"]), 1),
+            "pinned": stats["workers"][0]["cpus"] is not None,
+            "worker_private_mb": max((worker.get("private_mb", 0) for worker in stats["workers"]), default=0),
+            "worker_shared_mb": min((worker.get("shared_mb", 0) for worker in stats["workers"]), default=0),
+        }
+    finally:
+        pool.shutdown()
+
+
+def benchmark(backend: str = "stub", worker_counts=None, threads: int = 1, texts: int = 2000,
+              batch_size: int = 16, weights_mb: int = 0) -> dict:
+    runs = [
+        run_pool(backend, workers, threads, texts, batch_size, weights_mb)
+        for workers in (worker_counts or default_worker_counts())
+    ]
+    base = runs[0]["texts_per_second"]
+    for run in runs:
+        run["speedup"] = round(run["texts_per_second"] / base, 2)
+    return {"backend": backend, "cpus": os.cpu_count(), "runs": runs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", default="stub", help="stub (CPU-burning), transformers, onnx or torchscript")
+    parser.add_argument("--workers", help="comma-separated worker counts (default 1, 2, 4 ... CPU count)")
+    parser.add_argument("--threads", type=int, default=1, help="torch threads per worker")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--weights-mb", type=int, default=0, help="ballast per model copy, to check memory sharing")
+    args = parser.parse_args()
+
+    worker_counts = [int(count) for count in args.workers.split(",")] if args.workers else None
+    print(json.dumps(
+        benchmark(args.backend, worker_counts, args.threads, args.texts, args.batch_size, args.weights_mb), indent=2
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Ingest throughput benchmark on a scratch SQLite file
+Compares one commit per record (the original request path, rollback journal)
+against the write-behind queue with WAL and group commit
+
+    python -m benchmarks.ingest_throughput --rows 2000 --producers 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from models.database import init_async_db, get_async_session_maker, SentimentRecord, Alert
+from services.write_behind import WriteBehindQueue
+
+
+def _record(run: str, i: int) -> SentimentRecord:
+    return SentimentRecord(
+        source="twitter",
+        source_id=f"{run}_{i}",
+        text="Your customer service is absolutely terrible. Been waiting for 3 hours with no response!",
+        sentiment_score=-0.91,
+        sentiment_label="negative",
+        confidence=0.99,
+        emotions='{"anger": 0.81, "sadness": 0.03}',
+        author="frustrated_customer",
+        created_at=datetime.utcnow(),
+    )
+
+
+def _alert(i: int):
+    # Roughly one record in ten raises an alert, as in the demo stream
+    if i % 10:
+        return None
+    return Alert(severity="high", title="bench", message="bench", suggested_response="bench")
+
+
+async def _produce(rows: int, producers: int, write_one):
+    async def producer(offset: int):
+        for i in range(offset, rows, producers):
+            await write_one(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(producer(p) for p in range(producers)))
+    elapsed = time.perf_counter() - start
+    return {"rows": rows, "seconds": round(elapsed, 3), "rows_per_second": round(rows / elapsed, 1)}
+
+
+async def run_per_row(path: str, rows: int, producers: int) -> dict:
+    engine = await init_async_db(f"sqlite+aiosqlite:///{path}", sqlite_wal=False)
+    session_factory = get_async_session_maker(engine)
+
+    async def write_one(i: int):
+        async with session_factory() as db:
+            record = _record("per_row", i)
+            db.add(record)
+            await db.commit()
+            await db.refresh(record)
+            alert = _alert(i)
+            if alert is not None:
+                alert.sentiment_record_id = record.id
+                db.add(alert)
+                await db.commit()
+                await db.refresh(alert)
+
+    try:
+        return await _produce(rows, producers, write_one)
+    finally:
+        await engine.dispose()
+
+
+async def run_write_behind(path: str, rows: int, producers: int, batch_size: int, max_delay_ms: float) -> dict:
+    engine = await init_async_db(f"sqlite+aiosqlite:///{path}", sqlite_wal=True)
+    queue = WriteBehindQueue(get_async_session_maker(engine), max_batch_size=batch_size, max_delay_ms=max_delay_ms)
+    queue.start()
+
+    async def write_one(i: int):
+        await queue.add(_record("write_behind", i), _alert(i))
+
+    try:
+        result = await _produce(rows, producers, write_one)
+        await queue.close()
+        result["transactions"] = queue.counts["transactions"]
+        return result
+    finally:
+        await engine.dispose()
+
+
+async def benchmark(rows: int, producers: int, batch_size: int = 200, max_delay_ms: float = 20.0) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        per_row = await run_per_row(os.path.join(tmp, "per_row.db"), rows, producers)
+        write_behind = await run_write_behind(os.path.join(tmp, "write_behind.db"), rows, producers, batch_size, max_delay_ms)
+    return {
+        "producers": producers,
+        "per_row": per_row,
+        "write_behind": write_behind,
+        "speedup": round(write_behind["rows_per_second"] / per_row["rows_per_second"], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--producers", type=int, default=20, help="concurrent writers, like in-flight requests")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--max-delay-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    result = asyncio.run(benchmark(args.rows, args.producers, args.batch_size, args.max_delay_ms))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Run the benchmark suite and write the results as JSON
+Offline by default: models are the deterministic stub backend and databases are scratch SQLite files
+
+    python -m benchmarks.run                                  # all suites -> benchmarks/results/latest.json
+    python -m benchmarks.run --quick --output baseline.json   # small sizes, e.g. for a saved baseline
+    python -m benchmarks.run --suites stats --stats-rows 10000,1000000,10000000
+    python -m benchmarks.run --suites inference --real-models
+    python -m benchmarks.run --suites pool                    # forked worker pool, 1..N cores
+    python -m benchmarks.compare baseline.json benchmarks/results/latest.json
+
+Metric names carry their direction: *_ms / *_us / *_seconds are lower-is-better,
+*_per_second is higher-is-better, anything else is informational.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "results", "latest.json")
+
+
+def run_inference(args) -> dict:
+    from benchmarks import inference
+    backend = settings.inference_backend if args.real_models else "stub"
+    texts = 64 if args.quick else 256
+    cascade = inference.cascade_benchmark(backend, texts=texts)
+    return {
+        "inference": inference.benchmark(backend, texts=texts),
+        "inference.cascade": {key: cascade[key] for key in ("full_texts_per_second", "cascade_texts_per_second", "emotion_model_share")},
+    }
+
+
+def run_pool(args) -> dict:
+    from benchmarks import inference_scaling
+    backend = settings.inference_backend if args.real_models else "stub"
+    result = inference_scaling.benchmark(backend, texts=500 if args.quick else 2000)
+    return {
+        f"inference_pool.workers_{run['workers']}": {
+            key: run[key] for key in ("texts_per_second", "speedup", "worker_private_mb")
+        }
+        for run in result["runs"]
+    }
+
+
+def run_ingest(args) -> dict:
+    from benchmarks import ingest_throughput
+    result = asyncio.run(ingest_throughput.benchmark(rows=500 if args.quick else 2000, producers=20))
+    return {"ingest": {
+        "per_row_rows_per_second": result["per_row"]["rows_per_second"],
+        "write_behind_rows_per_second": result["write_behind"]["rows_per_second"],
+    }}
+
+
+def run_stats(args) -> dict:
+    from benchmarks import stats
+    sizes = [10000] if args.quick else [int(size) for size in args.stats_rows.split(",")]
+    return {f"stats.{name}": result for name, result in stats.benchmark(sizes, args.db_dir).items()}
+
+
+def run_alerts(args) -> dict:
+    from benchmarks import alerts
+    return {"alerts": alerts.benchmark(events=20000 if args.quick else 200000)}
+
+
+def run_websocket(args) -> dict:
+    from benchmarks import ws_fanout
+    clients = 100 if args.quick else args.ws_clients
+    result = asyncio.run(ws_fanout.benchmark(clients, messages=20 if args.quick else 50, slow_fraction=0.01, slow_delay=0.005))
+    queued = result["queued"]
+    return {f"websocket.clients_{clients}": {
+        "worst_broadcast_ms": round(queued["worst_broadcast_ms"], 3),
+        "fast_clients_done_seconds": round(queued["fast_clients_done_seconds"], 3),
+        "dropped": queued["dropped"],
+    }}
+
+
+def run_serialization(args) -> dict:
+    from benchmarks import serialization
+    result = asyncio.run(serialization.benchmark(rows=5000, page_sizes=[50, 500], min_seconds=0.3 if args.quick else 1.0))
+    return {
+        f"serialization.page_{entry['page_size']}": {
+            "orm_rows_per_second": entry["orm_to_dict"]["rows_per_second"],
+            "fast_path_rows_per_second": entry["fast_path"]["rows_per_second"],
+        }
+        for entry in result["results"]
+    }
+
+
+SUITES = {
+    "inference": run_inference,
+    "pool": run_pool,
+    "ingest": run_ingest,
+    "stats": run_stats,
+    "alerts": run_alerts,
+    "websocket": run_websocket,
+    "serialization": run_serialization,
+}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(__file__)
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--suites", default=",".join(SUITES), help=f"comma-separated, from {', '.join(SUITES)}")
+    parser.add_argument("--quick", action="store_true", help="small sizes, a minute or so in total")
+    parser.add_argument("--real-models", action="store_true", help="use INFERENCE_BACKEND instead of stub models for the inference suite")
+    parser.add_argument("--stats-rows", default="10000,1000000", help="seeded database sizes for the stats suite (10M takes a while to seed)")
+    parser.add_argument("--db-dir", help="keep seeded stats databases here and reuse them")
+    parser.add_argument("--ws-clients", type=int, default=1000)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    suites = [name.strip() for name in args.suites.split(",") if name.strip()]
+    unknown = [name for name in suites if name not in SUITES]
+    if unknown:
+        parser.error(f"unknown suites: {unknown}")
+
+    results = {}
+    for name in suites:
+        start = time.perf_counter()
+        print(f"Running {name}...", file=sys.stderr)
+        results.update(SUITES[name](args))
+        print(f"  done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": args.quick,
+            "real_models": args.real_models,
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Wrote {args.output}", file=sys.stderr)
+
+    failed = [case for case, metrics in results.items() if metrics.get("consistent") is False]
+    if failed:
+        print(f"Consistency check failed: {failed}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+List endpoint serialization benchmark on a scratch SQLite file
+Compares ORM hydration + to_dict() + json (the original path) against column
+tuples encoded by RowEncoder, at several page sizes
+
+    python -m benchmarks.serialization --rows 20000 --page-sizes 50,500,5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import insert, select
+
+from models.database import init_async_db, get_async_session_maker, SentimentRecord
+from services.serialization import RECORD_COLUMNS, RowEncoder, orjson
+
+EMOTIONS = json.dumps({"anger": 0.81, "disgust": 0.07, "fear": 0.02, "joy": 0.01, "neutral": 0.05, "sadness": 0.03, "surprise": 0.01})
+
+
+async def _seed(session_factory, rows: int):
+    now = datetime.utcnow()
+    async with session_factory() as db:
+        for start in range(0, rows, 5000):
+            await db.execute(insert(SentimentRecord), [
+                {
+                    "source": "twitter", "source_id": f"bench_{i}",
+                    "text": "Your customer service is absolutely terrible. Been waiting for 3 hours with no response!",
+                    "sentiment_score": -0.91, "sentiment_label": "negative", "confidence": 0.99,
+                    "emotions": EMOTIONS, "author": "frustrated_customer",
+                    "created_at": now - timedelta(seconds=i), "processed_at": now,
+                }
+                for i in range(start, min(rows, start + 5000))
+            ])
+        await db.commit()
+
+
+async def orm_page(db, limit: int) -> bytes:
+    records = (await db.scalars(
+        select(SentimentRecord).order_by(SentimentRecord.created_at.desc(), SentimentRecord.id.desc()).limit(limit)
+    )).all()
+    # What FastAPI's JSONResponse does with a list of dicts
+    return json.dumps([record.to_dict() for record in records], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+async def fast_page(db, limit: int, encoder: RowEncoder) -> bytes:
+    rows = (await db.execute(
+        select(*RECORD_COLUMNS).order_by(SentimentRecord.created_at.desc(), SentimentRecord.id.desc()).limit(limit)
+    )).all()
+    return encoder.encode_array(rows)
+
+
+async def _measure(session_factory, page, limit: int, min_seconds: float) -> dict:
+    pages = 0
+    start = time.perf_counter()
+    while True:
+        async with session_factory() as db:
+            await page(db, limit)
+        pages += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            break
+    return {
+        "ms_per_page": round(elapsed / pages * 1000, 2),
+        "rows_per_second": round(pages * limit / elapsed),
+    }
+
+
+async def benchmark(rows: int, page_sizes, min_seconds: float = 1.0) -> dict:
+    encoder = RowEncoder([column.key for column in RECORD_COLUMNS])
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = await init_async_db(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        session_factory = get_async_session_maker(engine)
+        try:
+            await _seed(session_factory, rows)
+            results = []
+            for limit in page_sizes:
+                orm = await _measure(session_factory, orm_page, limit, min_seconds)
+                fast = await _measure(session_factory, lambda db, n: fast_page(db, n, encoder), limit, min_seconds)
+                results.append({
+                    "page_size": limit,
+                    "orm_to_dict": orm,
+                    "fast_path": fast,
+                    "speedup": round(fast["rows_per_second"] / orm["rows_per_second"], 1),
+                })
+        finally:
+            await engine.dispose()
+    return {"encoder": "orjson" if orjson is not None else "json", "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--page-sizes", default="50,500,5000")
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="time spent per measurement")
+    args = parser.parse_args()
+
+    page_sizes = [int(size) for size in args.page_sizes.split(",")]
+    result = asyncio.run(benchmark(max(args.rows, max(page_sizes)), page_sizes, args.min_seconds))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
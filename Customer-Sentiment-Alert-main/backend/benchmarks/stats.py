@@ -0,0 +1,147 @@
+"""
+/api/sentiments/stats benchmark against seeded SQLite databases
+For each size: app startup (index rebuild), the in-memory aggregator path, the
+SQL GROUP BY path, and a check that both return the same numbers
+
+    python -m benchmarks.stats --rows 10000,1000000
+    python -m benchmarks.stats --rows 10000000 --db-dir /tmp/sentiguard-bench   # keep the seeded file
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from config import settings
+from models.database import init_db
+
+SOURCES = ("twitter", "reddit", "review", "support")
+LABELS = ("positive", "negative", "neutral")
+SEED_CHUNK = 100000
+
+
+def seed_database(path: str, rows: int, seed: int = 42) -> float:
+    """Create the schema and insert `rows` records spread over the last 23 hours. Returns seconds taken"""
+    init_db(f"sqlite:///{path}").dispose()
+    start = time.perf_counter()
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=OFF")
+    for offset in range(0, rows, SEED_CHUNK):
+        batch = []
+        for i in range(offset, min(rows, offset + SEED_CHUNK)):
+            score = round(rng.uniform(-1, 1), 3)
+            created_at = now - timedelta(seconds=rng.uniform(0, 23 * 3600))
+            batch.append((
+                SOURCES[i % len(SOURCES)], f"bench_{i}", "benchmark mention",
+                score, LABELS[0] if score > 0.1 else LABELS[1] if score < -0.1 else LABELS[2],
+                0.9, "{}", "bench", created_at.isoformat(sep=" "), created_at.isoformat(sep=" "),
+            ))
+        connection.executemany(
+            "INSERT INTO sentiment_records (source, source_id, text, sentiment_score, sentiment_label, "
+            "confidence, emotions, author, created_at, processed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            batch
+        )
+        connection.commit()
+    connection.close()
+    return time.perf_counter() - start
+
+
+def _same_stats(a: dict, b: dict, tolerance: float = 1e-6) -> bool:
+    def close(x, y):
+        if isinstance(x, dict) and isinstance(y, dict):
+            return x.keys() == y.keys() and all(close(x[k], y[k]) for k in x)
+        if isinstance(x, (int, float)) and isinstance(y, (int, float)):
+            return math.isclose(x, y, rel_tol=tolerance, abs_tol=tolerance)
+        return x == y
+    return close(a, b)
+
+
+def _time_requests(client, url: str, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        response = client.get(url)
+        samples.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    samples.sort()
+    return round(samples[len(samples) // 2], 3)
+
+
+def benchmark_size(path: str, rows: int, repeats: int = 20) -> dict:
+    # Point the app at the seeded file with stub models and no demo traffic
+    settings.database_url = f"sqlite+aiosqlite:///{path}"
+    settings.inference_backend = "stub"
+    settings.demo_data_enabled = False
+
+    from fastapi.testclient import TestClient
+    import app as app_module
+    from services.stats_aggregator import get_stats_aggregator
+
+    start = time.perf_counter()
+    with TestClient(app_module.app) as client:
+        startup_seconds = time.perf_counter() - start
+
+        url = "/api/sentiments/stats?hours=24"
+        aggregator_ms = _time_requests(client, url, repeats)
+        from_aggregator = client.get(url).json()
+
+        # Same endpoint with the in-memory buckets bypassed, i.e. the GROUP BY fallback
+        aggregator = get_stats_aggregator()
+        retention = aggregator.retention_hours
+        aggregator.retention_hours = 0
+        try:
+            sql_ms = _time_requests(client, url, max(3, repeats // 5) if rows > 1000000 else repeats)
+            from_sql = client.get(url).json()
+        finally:
+            aggregator.retention_hours = retention
+
+    return {
+        "rows": rows,
+        "startup_seconds": round(startup_seconds, 3),
+        "aggregator_p50_ms": aggregator_ms,
+        "sql_p50_ms": sql_ms,
+        "consistent": _same_stats(from_aggregator, from_sql),
+    }
+
+
+def benchmark(sizes, db_dir: str = None, repeats: int = 20) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            path = os.path.join(db_dir or tmp, f"stats_{rows}.db")
+            seed_info = None
+            if not (db_dir and os.path.exists(path)):
+                if os.path.exists(path):
+                    os.remove(path)
+                seed_info = round(seed_database(path, rows), 1)
+            result = benchmark_size(path, rows, repeats)
+            result["seeded_in"] = seed_info
+            results[f"rows_{rows}"] = result
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", default="10000,1000000", help="comma-separated database sizes")
+    parser.add_argument("--db-dir", help="keep seeded databases here and reuse them on later runs")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    sizes = [int(size) for size in args.rows.split(",")]
+    print(json.dumps(benchmark(sizes, args.db_dir, args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+WebSocket fan-out benchmark with simulated local clients
+Compares the queued per-client writers against sequential send_json
+
+    python -m benchmarks.ws_fanout --clients 1000 --messages 50 --slow 0.01
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from services.connection_manager import ConnectionManager
+
+SAMPLE_MESSAGE = {
+    "type": "sentiment",
+    "data": {
+        "id": 1, "source": "twitter", "source_id": "twitter_bench_1",
+        "text": "Your customer service is absolutely terrible. Been waiting for 3 hours with no response!",
+        "sentiment_score": -0.91, "sentiment_label": "negative", "confidence": 0.99,
+        "emotions": {"anger": 0.81, "disgust": 0.07, "fear": 0.02, "joy": 0.01, "neutral": 0.05, "sadness": 0.03, "surprise": 0.01},
+        "author": "frustrated_customer", "created_at": "2024-01-01T00:00:00", "processed_at": "2024-01-01T00:00:00",
+    },
+}
+
+
+class SimulatedWebSocket:
+    """Stands in for a browser tab; slow clients take `delay` seconds per frame"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.received = 0
+        self.done = asyncio.Event()
+        self.expected = 0
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000):
+        self.done.set()
+
+    async def _receive(self):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        else:
+            await asyncio.sleep(0)
+        self.received += 1
+        if self.received >= self.expected:
+            self.done.set()
+
+    async def send_text(self, payload: str):
+        await self._receive()
+
+    async def send_json(self, message: dict):
+        json.dumps(message)
+        await self._receive()
+
+
+def _make_clients(count: int, messages: int, slow_fraction: float, slow_delay: float):
+    slow_every = int(1 / slow_fraction) if slow_fraction > 0 else 0
+    clients = []
+    for i in range(count):
+        ws = SimulatedWebSocket(slow_delay if slow_every and i % slow_every == 0 else 0.0)
+        ws.expected = messages
+        clients.append(ws)
+    return clients
+
+
+async def run_sequential(clients, messages: int) -> dict:
+    """The original ConnectionManager.broadcast: await each send in turn"""
+    start = time.perf_counter()
+    worst_broadcast = 0.0
+    for _ in range(messages):
+        t = time.perf_counter()
+        for ws in clients:
+            await ws.send_json(SAMPLE_MESSAGE)
+        worst_broadcast = max(worst_broadcast, time.perf_counter() - t)
+    fast = [ws for ws in clients if not ws.delay]
+    return {
+        "total_seconds": time.perf_counter() - start,
+        "worst_broadcast_ms": worst_broadcast * 1000,
+        "fast_clients_done_seconds": time.perf_counter() - start if fast else 0.0,
+    }
+
+
+async def run_queued(clients, messages: int, queue_size: int, policy: str) -> dict:
+    manager = ConnectionManager(max_queue_size=queue_size, slow_consumer_policy=policy)
+    for ws in clients:
+        await manager.connect(ws)
+
+    start = time.perf_counter()
+    worst_broadcast = 0.0
+    for _ in range(messages):
+        t = time.perf_counter()
+        await manager.broadcast(SAMPLE_MESSAGE)
+        worst_broadcast = max(worst_broadcast, time.perf_counter() - t)
+        await asyncio.sleep(0)
+
+    fast = [ws for ws in clients if not ws.delay]
+    await asyncio.gather(*(ws.done.wait() for ws in fast))
+    fast_done = time.perf_counter() - start
+    stats = manager.stats()
+    await manager.close_all()
+    return {
+        "total_seconds": time.perf_counter() - start,
+        "worst_broadcast_ms": worst_broadcast * 1000,
+        "fast_clients_done_seconds": fast_done,
+        "dropped": stats["dropped"],
+    }
+
+
+async def benchmark(clients: int, messages: int, slow_fraction: float, slow_delay: float,
+                    queue_size: int = 64, policy: str = "drop_oldest") -> dict:
+    sequential = await run_sequential(_make_clients(clients, messages, slow_fraction, slow_delay), messages)
+    queued = await run_queued(_make_clients(clients, messages, slow_fraction, slow_delay), messages, queue_size, policy)
+    return {"clients": clients, "messages": messages, "sequential": sequential, "queued": queued}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=50)
+    parser.add_argument("--slow", type=float, default=0.01, help="fraction of slow clients")
+    parser.add_argument("--slow-delay", type=float, default=0.005, help="seconds per frame for slow clients")
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--policy", default="drop_oldest")
+    args = parser.parse_args()
+
+    result = asyncio.run(benchmark(args.clients, args.messages, args.slow, args.slow_delay, args.queue_size, args.policy))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -17,17 +17,101 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
     
+    # Generate a demo mention every 10-30 seconds
+    demo_data_enabled: bool = True
+    
     # Alert Thresholds
     negative_threshold: float = 0.3
     critical_threshold: float = 0.2
     alert_window_minutes: int = 15
     
-    # Database
+    # Inference backend: transformers, onnx, torchscript, or stub (deterministic fake models, no downloads)
+    inference_backend: str = "transformers"
+    model_export_dir: str = "./exported_models"
+    
+    # Inference batching
+    inference_max_batch_size: int = 16
+    inference_max_wait_ms: float = 10.0
+    inference_executor: str = "thread"  # thread, process, or pool (forked workers sharing one model copy)
+    inference_workers: int = 2
+    # pool only: torch/OpenMP threads per worker, and pinning each worker to its own CPUs
+    inference_threads_per_worker: int = 1
+    inference_pin_cpus: bool = True
+    
+    # Cascade: run the emotion model only for negative or low-confidence sentiment results;
+    # skipped records get their emotions filled in by a background backfill when traffic is idle
+    emotion_cascade: bool = False
+    emotion_cascade_max_score: float = -0.1
+    emotion_cascade_min_confidence: float = 0.75
+    emotion_backfill: bool = True
+    emotion_backfill_batch_size: int = 32
+    emotion_backfill_queue_size: int = 10000
+    
+    # Sentiment result cache (size 0 disables, path enables the on-disk tier)
+    result_cache_size: int = 10000
+    result_cache_ttl_seconds: float = 86400
+    result_cache_path: Optional[str] = None
+    
+    # In-memory stats buckets cover this many hours; longer windows query the DB
+    stats_retention_hours: int = 168
+    
+    # Word-cloud term counts: hourly buckets kept this long, long tail trimmed past the per-bucket cap
+    term_retention_hours: int = 72
+    term_max_per_bucket: int = 5000
+    
+    # Bulk ingestion
+    ingest_batch_size: int = 256
+    
+    # Report export: rows fetched and encoded per chunk
+    export_chunk_size: int = 5000
+    
+    # WebSocket fan-out: per-client queue size and what to do when it fills
+    ws_max_queue_size: int = 256
+    ws_slow_consumer_policy: str = "drop_oldest"  # drop_oldest or disconnect
+    # Coalescing clients get one batch frame per interval (opt in with /ws?coalesce=true)
+    ws_coalesce_interval_ms: float = 250.0
+    ws_coalesce_default: bool = False
+    
+    # Database (async driver: sqlite+aiosqlite or postgresql+asyncpg)
     database_url: str = "sqlite+aiosqlite:///./sentiguard.db"
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    # SQLite only: WAL journal with synchronous=NORMAL (durable across app crashes, not power loss)
+    sqlite_wal: bool = True
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kb: int = 65536
+    
+    # Write-behind persistence: one transaction per batch of rows or per delay, whichever comes first
+    write_batch_size: int = 200
+    write_max_delay_ms: float = 20.0
+    write_queue_size: int = 10000
+    
+    # Ingest pipeline: bounded queue per stage (backpressure), batch size and worker tasks per stage
+    pipeline_queue_size: int = 1000
+    pipeline_batch_size: int = 32
+    pipeline_max_wait_ms: float = 20.0
+    pipeline_inference_concurrency: int = 2
+    pipeline_persist_concurrency: int = 2
+    
+    # source_id dedupe: recency map (size / TTL bounded) in front of a rotating pair of Bloom filters
+    # (about 1.8 MB per million IDs at 0.1% false positives; capacity 0 disables them)
+    dedupe_max_entries: int = 100000
+    dedupe_ttl_hours: float = 24
+    dedupe_bloom_capacity: int = 1000000
+    dedupe_bloom_error_rate: float = 0.001
+    
+    # Multi-worker: event bus between workers (local = single process, unix = broker on a Unix socket)
+    # and the lock file that elects the one worker running background ingestion
+    event_bus: str = "local"
+    event_bus_socket: str = "/tmp/sentiguard-bus.sock"
+    leader_lock_path: str = "/tmp/sentiguard-leader.lock"
     
     class Config:
         env_file = ".env"
         case_sensitive = False
+        protected_namespaces = ("settings_",)
 
 
 settings = Settings()
@@ -0,0 +1,155 @@
+"""
+Export the sentiment and emotion models for the ONNX Runtime and TorchScript backends
+Run once offline, then set INFERENCE_BACKEND=onnx (or torchscript)
+
+    python export_models.py --format all
+    python export_models.py --format onnx --verify
+"""
+import argparse
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from config import settings
+from services.inference_backends import (
+    EMOTION_MODEL, SENTIMENT_MODEL, MAX_LENGTH,
+    OnnxBackend, TorchScriptBackend, TransformersBackend, model_dir_name
+)
+
+PARITY_TEXTS = [
+    "Your customer service is absolutely terrible. Been waiting for 3 hours with no response!",
+    "Just tried the new feature. It's okay, nothing special but works as expected.",
+    "Absolutely love this product! Best purchase I've made this year!",
+    "The new update deleted all my data. Years of work gone!",
+]
+
+
+def _load_model(model_name: str, torchscript: bool = False):
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name, torchscript=torchscript)
+    model.eval()
+    return tokenizer, model
+
+
+def _sample_inputs(tokenizer):
+    encoded = tokenizer(PARITY_TEXTS[:2], padding=True, truncation=True, max_length=MAX_LENGTH, return_tensors="pt")
+    return encoded["input_ids"], encoded["attention_mask"]
+
+
+def export_onnx(model_name: str, output_dir: str):
+    import torch
+    tokenizer, model = _load_model(model_name)
+    target = os.path.join(output_dir, model_dir_name(model_name))
+    os.makedirs(target, exist_ok=True)
+
+    input_ids, attention_mask = _sample_inputs(tokenizer)
+    torch.onnx.export(
+        model,
+        (input_ids, attention_mask),
+        os.path.join(target, OnnxBackend.model_file),
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "logits": {0: "batch"},
+        },
+        opset_version=14,
+    )
+    tokenizer.save_pretrained(target)
+    model.config.save_pretrained(target)
+    print(f"  ✓ {model_name} -> {target}/{OnnxBackend.model_file}")
+
+
+def export_torchscript(model_name: str, output_dir: str):
+    import torch
+    tokenizer, model = _load_model(model_name, torchscript=True)
+    target = os.path.join(output_dir, model_dir_name(model_name))
+    os.makedirs(target, exist_ok=True)
+
+    with torch.no_grad():
+        traced = torch.jit.trace(model, _sample_inputs(tokenizer), strict=False)
+    traced.save(os.path.join(target, TorchScriptBackend.model_file))
+    tokenizer.save_pretrained(target)
+    model.config.save_pretrained(target)
+    print(f"  ✓ {model_name} -> {target}/{TorchScriptBackend.model_file}")
+
+
+def _scores(classifier, texts, all_labels: bool):
+    outputs = classifier(texts)
+    if all_labels:
+        return [{item['label']: item['score'] for item in output} for output in outputs]
+    return [{output['label']: output['score']} for output in outputs]
+
+
+def reference_scores():
+    """Scores of the transformers pipelines on PARITY_TEXTS, the baseline for every exported backend"""
+    reference = TransformersBackend()
+    return {
+        "sentiment": _scores(reference.load_sentiment_model(), PARITY_TEXTS, all_labels=False),
+        "emotions": _scores(reference.load_emotion_model(), PARITY_TEXTS, all_labels=True),
+    }
+
+
+def parity_errors(backend, expected, tolerance: float) -> list:
+    """Differences between one backend's scores and the reference beyond the tolerance (empty if it matches)"""
+    actual = {
+        "sentiment": _scores(backend.load_sentiment_model(), PARITY_TEXTS, all_labels=False),
+        "emotions": _scores(backend.load_emotion_model(), PARITY_TEXTS, all_labels=True),
+    }
+    errors = []
+    for task in ("sentiment", "emotions"):
+        for text, want, got in zip(PARITY_TEXTS, expected[task], actual[task]):
+            if set(want) != set(got):
+                errors.append(f"{task}: labels differ for {text[:40]!r}: {got} vs {want}")
+                continue
+            drift = max(abs(want[label] - got[label]) for label in want)
+            if drift > tolerance:
+                errors.append(f"{task}: score drift {drift:.5f} for {text[:40]!r}")
+    return errors
+
+
+def verify_parity(output_dir: str, formats, tolerance: float) -> bool:
+    """Check every exported backend against the transformers pipelines within a tolerance"""
+    expected = reference_scores()
+    failed = []
+    for backend in [OnnxBackend(output_dir) if f == "onnx" else TorchScriptBackend(output_dir) for f in formats]:
+        errors = parity_errors(backend, expected, tolerance)
+        for error in errors:
+            print(f"  ✗ {backend.name} {error}")
+        if errors:
+            failed.append(backend.name)
+        else:
+            print(f"  ✓ {backend.name} matches transformers within {tolerance}")
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export SentiGuard models for faster CPU inference")
+    parser.add_argument("--format", choices=["onnx", "torchscript", "all"], default="all")
+    parser.add_argument("--output-dir", default=settings.model_export_dir)
+    parser.add_argument("--verify", action="store_true", help="compare exported scores against transformers")
+    parser.add_argument("--tolerance", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    formats = ["onnx", "torchscript"] if args.format == "all" else [args.format]
+    exporters = {"onnx": export_onnx, "torchscript": export_torchscript}
+
+    for fmt in formats:
+        print(f"📦 Exporting {fmt} models to {args.output_dir}...")
+        for model_name in (SENTIMENT_MODEL, EMOTION_MODEL):
+            exporters[fmt](model_name, args.output_dir)
+
+    if args.verify:
+        print("🔍 Checking backend parity...")
+        if not verify_parity(args.output_dir, formats, args.tolerance):
+            sys.exit(1)
+
+    print("✅ Export complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,24 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, create_engine
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index, create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.exc import OperationalError
 from datetime import datetime
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
 
 class SentimentRecord(Base):
     __tablename__ = "sentiment_records"
+    __table_args__ = (
+        # Keyset pagination filtered by source
+        Index("ix_sentiment_records_source_created_at", "source", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     source = Column(String(50), index=True)  # twitter, reddit, review, support
@@ -40,6 +50,10 @@ class SentimentRecord(Base):
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        # Keyset pagination filtered by resolved state
+        Index("ix_alerts_is_resolved_created_at", "is_resolved", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     severity = Column(String(20))  # low, medium, high, critical
@@ -65,15 +79,147 @@ class Alert(Base):
         }
 
 
-# Database initialization
+# Full-text index over SentimentRecord.text (see services/search.py)
+FTS_TABLE = "sentiment_records_fts"
+
+_SQLITE_FTS_DDL = [
+    # External-content table: the index stores only tokens, the text stays in sentiment_records
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        text, content='sentiment_records', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS sentiment_records_fts_insert AFTER INSERT ON sentiment_records BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS sentiment_records_fts_delete AFTER DELETE ON sentiment_records BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS sentiment_records_fts_update AFTER UPDATE OF text ON sentiment_records BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END""",
+]
+
+_POSTGRES_FTS_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_sentiment_records_text_tsv "
+    "ON sentiment_records USING GIN (to_tsvector('english', coalesce(text, '')))",
+]
+
+
+def _create_fulltext_index(connection):
+    """FTS5 table kept in sync by triggers on SQLite, a GIN expression index on PostgreSQL"""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        for statement in _POSTGRES_FTS_DDL:
+            connection.exec_driver_sql(statement)
+        return
+    if dialect != "sqlite":
+        return
+
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+    ).first()
+    try:
+        if not exists:
+            connection.exec_driver_sql(_SQLITE_FTS_DDL[0])
+            # Index rows written before the table existed
+            connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        for statement in _SQLITE_FTS_DDL[1:]:
+            connection.exec_driver_sql(statement)
+    except OperationalError as e:
+        logger.warning(f"Full-text search disabled, SQLite was built without FTS5: {e}")
+
+
+def _create_schema(connection):
+    # Several workers may start at once against a fresh database: take the write
+    # lock first so the others wait and then find the tables already there
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+    elif connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("SELECT pg_advisory_xact_lock(727401)")
+    Base.metadata.create_all(bind=connection)
+    # create_all skips indexes on tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+    _create_fulltext_index(connection)
+
+
+# Database initialization (synchronous, for scripts such as reset_demo_data.py)
 def init_db(database_url: str):
+    # Same database through the sync drivers: sqlite3 and psycopg2 (see requirements.txt)
     engine = create_engine(
-        database_url.replace("+aiosqlite", ""),
+        database_url.replace("+aiosqlite", "").replace("+asyncpg", "+psycopg2"),
         connect_args={"check_same_thread": False} if "sqlite" in database_url else {}
     )
-    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        _create_schema(connection)
     return engine
 
 
 def get_session_maker(engine):
     return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _install_sqlite_pragmas(engine: AsyncEngine, wal: bool, busy_timeout_ms: int, cache_size_kb: int):
+    """Apply connection pragmas as each pooled SQLite connection is opened"""
+    pragmas = [
+        f"PRAGMA busy_timeout={int(busy_timeout_ms)}",
+        f"PRAGMA cache_size=-{int(cache_size_kb)}",  # negative means KiB rather than pages
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if wal:
+        # Readers no longer block the writer; NORMAL only fsyncs at checkpoints in WAL mode
+        pragmas += ["PRAGMA journal_mode=WAL", "PRAGMA synchronous=NORMAL"]
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+# Async database initialization (for the API server)
+async def init_async_db(
+    database_url: str,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30,
+    pool_recycle: int = 1800,
+    sqlite_wal: bool = True,
+    sqlite_busy_timeout_ms: int = 5000,
+    sqlite_cache_size_kb: int = 65536,
+) -> AsyncEngine:
+    """
+    Create an async engine (sqlite+aiosqlite or postgresql+asyncpg) and the schema
+    In-memory SQLite keeps its default pool, since each connection would see a different database
+    """
+    options = {}
+    if ":memory:" not in database_url:
+        options = {
+            "pool_size": pool_size,
+            "max_overflow": max_overflow,
+            "pool_timeout": pool_timeout,
+            "pool_recycle": pool_recycle,
+            "pool_pre_ping": not database_url.startswith("sqlite"),
+        }
+        if database_url.startswith("sqlite"):
+            # aiosqlite defaults to NullPool, which reopens the file for every session
+            options["poolclass"] = AsyncAdaptedQueuePool
+    engine = create_async_engine(database_url, **options)
+    if database_url.startswith("sqlite"):
+        _install_sqlite_pragmas(
+            engine,
+            wal=sqlite_wal and ":memory:" not in database_url,
+            busy_timeout_ms=sqlite_busy_timeout_ms,
+            cache_size_kb=sqlite_cache_size_kb,
+        )
+    async with engine.begin() as connection:
+        await connection.run_sync(_create_schema)
+    return engine
+
+
+def get_async_session_maker(engine: AsyncEngine):
+    # Keep attributes loaded after commit: handlers serialize records once the transaction ends
+    return async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
@@ -1,22 +1,121 @@
+from collections import deque
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Deque, Iterable, List, Dict, Optional, Tuple
 import logging
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+SEVERITIES = ("low", "medium", "high", "critical")
+
+
+class SlidingWindow:
+    """
+    Time-ordered scores for one source over the alert window
+    Each entry stores the running total up to and including itself, so the sum of
+    the last k scores is a difference of two totals: O(1) per event and per query
+    """
+    __slots__ = ("span", "events", "base")
+    
+    def __init__(self, span: timedelta):
+        self.span = span
+        self.events: Deque[Tuple[datetime, float]] = deque()  # (timestamp, running total)
+        self.base = 0.0  # running total just before the oldest retained event
+    
+    def add(self, score: float, timestamp: datetime):
+        total = self.events[-1][1] if self.events else self.base
+        self.events.append((timestamp, total + score))
+    
+    def expire(self, now: datetime):
+        cutoff = now - self.span
+        while self.events and self.events[0][0] < cutoff:
+            self.base = self.events.popleft()[1]
+        if not self.events:
+            self.base = 0.0  # keep the running totals small
+    
+    def remove(self, score: float, timestamp: datetime) -> bool:
+        """Take back one sample, newest match first; O(window), for the rare record that never got stored"""
+        events = self.events
+        for i in range(len(events) - 1, -1, -1):
+            before = events[i - 1][1] if i else self.base
+            if events[i][0] == timestamp and abs(events[i][1] - before - score) < 1e-9:
+                del events[i]
+                for j in range(i, len(events)):
+                    events[j] = (events[j][0], events[j][1] - score)
+                if not events:
+                    self.base = 0.0
+                return True
+        return False
+    
+    def __len__(self) -> int:
+        return len(self.events)
+    
+    def trailing_average(self, k: int) -> float:
+        """Average of the last k scores (or all of them if fewer)"""
+        n = min(k, len(self.events))
+        if n == 0:
+            return 0.0
+        before = self.events[-n - 1][1] if n < len(self.events) else self.base
+        return (self.events[-1][1] - before) / n
+
 
 class AlertService:
     def __init__(self):
         self.negative_threshold = settings.negative_threshold
         self.critical_threshold = settings.critical_threshold
         self.alert_window = timedelta(minutes=settings.alert_window_minutes)
+        self.windows: Dict[str, SlidingWindow] = {}
+    
+    def observe(self, source: str, sentiment_score: float, timestamp: Optional[datetime] = None):
+        """Add an ingested score to its source's window and drop the samples it pushes out"""
+        window = self.windows.get(source)
+        if window is None:
+            window = self.windows[source] = SlidingWindow(self.alert_window)
+        timestamp = timestamp or datetime.utcnow()
+        window.add(sentiment_score, timestamp)
+        # Not every worker evaluates alerts, so observing alone must keep the window bounded
+        window.expire(timestamp)
+    
+    def forget(self, source: str, sentiment_score: float, timestamp: datetime):
+        """Undo observe() for a sample whose record was never stored (no-op once it has expired)"""
+        window = self.windows.get(source)
+        if window is not None:
+            window.remove(sentiment_score, timestamp)
+    
+    def seed(self, rows: Iterable[Tuple[str, float, datetime]]):
+        """Load (source, score, timestamp) rows, oldest first, e.g. from the DB at startup"""
+        self.windows = {}
+        for source, score, timestamp in rows:
+            self.observe(source, score or 0.0, timestamp)
+        now = datetime.utcnow()
+        for window in self.windows.values():
+            window.expire(now)
+        logger.info(f"Seeded alert windows for {len(self.windows)} sources")
+    
+    def evaluate(self, source: str, sentiment_score: float) -> Tuple[bool, str]:
+        """
+        Alert decision for a score already observed in its source's window
+        Uses only in-memory state: no database reads
+        """
+        window = self.windows.get(source)
+        if window is None:
+            return self._decide(sentiment_score, 0, 0.0, 0.0)
+        window.expire(datetime.utcnow())
+        return self._decide(
+            sentiment_score, len(window), window.trailing_average(5), window.trailing_average(10)
+        )
     
     def should_create_alert(self, sentiment_score: float, recent_sentiments: List[float]) -> tuple[bool, str]:
         """
         Determine if an alert should be created based on sentiment
         Returns: (should_alert, severity)
         """
+        count = len(recent_sentiments)
+        avg5 = sum(recent_sentiments[-5:]) / min(count, 5) if count else 0.0
+        avg10 = sum(recent_sentiments[-10:]) / min(count, 10) if count else 0.0
+        return self._decide(sentiment_score, count, avg5, avg10)
+    
+    def _decide(self, sentiment_score: float, recent_count: int, recent_avg5: float, recent_avg10: float) -> Tuple[bool, str]:
         # Critical: Single very negative mention
         if sentiment_score <= self.critical_threshold:
             return True, "critical"
@@ -24,17 +123,13 @@ class AlertService:
         # High: Negative mention
         if sentiment_score <= self.negative_threshold:
             # Check if there's a trend of negative sentiment
-            if len(recent_sentiments) >= 3:
-                recent_avg = sum(recent_sentiments[-5:]) / min(len(recent_sentiments), 5)
-                if recent_avg <= self.negative_threshold:
-                    return True, "high"
+            if recent_count >= 3 and recent_avg5 <= self.negative_threshold:
+                return True, "high"
             return True, "medium"
         
         # Medium: Multiple slightly negative mentions
-        if len(recent_sentiments) >= 5:
-            recent_avg = sum(recent_sentiments[-10:]) / min(len(recent_sentiments), 10)
-            if recent_avg <= 0.4:
-                return True, "low"
+        if recent_count >= 5 and recent_avg10 <= 0.4:
+            return True, "low"
         
         return False, "none"
     
@@ -0,0 +1,240 @@
+"""
+Bulk ingestion of mentions
+Accepts a JSON array or a streamed NDJSON body, runs inference per chunk,
+dedupes on source_id in bulk and writes each chunk with one INSERT
+"""
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.database import SentimentRecord
+
+logger = logging.getLogger(__name__)
+
+# Dialects whose INSERT can skip rows that conflict on source_id
+_CONFLICT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+class ParseError:
+    def __init__(self, message: str):
+        self.message = message
+
+
+async def iter_ndjson(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (index, object) for each non-blank line as the body arrives"""
+    buffer = b""
+    index = 0
+
+    def parse(line: bytes):
+        try:
+            return json.loads(line)
+        except ValueError as e:
+            return ParseError(f"Invalid JSON: {e}")
+
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield index, parse(line)
+                index += 1
+
+    if buffer.strip():
+        yield index, parse(buffer)
+
+
+async def iter_json_array(body: bytes) -> AsyncIterator[Tuple[int, Any]]:
+    try:
+        items = json.loads(body)
+    except ValueError as e:
+        yield 0, ParseError(f"Invalid JSON: {e}")
+        return
+    if not isinstance(items, list):
+        yield 0, ParseError("Body must be a JSON array of mentions")
+        return
+    for index, item in enumerate(items):
+        yield index, item
+
+
+def _parse_mention(item: Any) -> Dict:
+    """Validate one input item and fill defaults, raising ValueError on bad input"""
+    if isinstance(item, ParseError):
+        raise ValueError(item.message)
+    if not isinstance(item, dict):
+        raise ValueError("Each mention must be a JSON object")
+
+    text = item.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError("Text is required")
+
+    source = str(item.get("source") or "manual")
+    created_at = item.get("created_at")
+    if created_at:
+        try:
+            created_at = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"Invalid created_at: {created_at}")
+        # Stored timestamps are naive UTC; convert offsets rather than dropping them
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return {
+        "source": source,
+        "source_id": str(item.get("source_id") or f"{source}_{uuid.uuid4().hex}"),
+        "text": text,
+        "author": str(item.get("author") or "anonymous"),
+        "created_at": created_at or datetime.utcnow(),
+    }
+
+
+def _line(payload: Dict) -> bytes:
+    return (json.dumps(payload) + "\n").encode("utf-8")
+
+
+class BulkIngestor:
+    def __init__(
+        self,
+        session_factory,
+        inference,
+        chunk_size: int = 256,
+        on_inserted: Optional[Callable[[List[Dict]], Awaitable[None]]] = None,
+    ):
+        self.session_factory = session_factory
+        self.inference = inference
+        self.chunk_size = max(1, chunk_size)
+        self.on_inserted = on_inserted
+        self.counts = {"processed": 0, "inserted": 0, "duplicates": 0, "errors": 0}
+
+    async def run(self, items: AsyncIterator[Tuple[int, Any]]) -> AsyncIterator[bytes]:
+        """Process items chunk by chunk, yielding one NDJSON result line per item and a summary"""
+        chunk: List[Tuple[int, Any]] = []
+        async for index, item in items:
+            chunk.append((index, item))
+            if len(chunk) >= self.chunk_size:
+                for line in await self._process_chunk(chunk):
+                    yield line
+                chunk = []
+
+        if chunk:
+            for line in await self._process_chunk(chunk):
+                yield line
+
+        yield _line({"status": "done", **self.counts})
+
+    async def _process_chunk(self, chunk: List[Tuple[int, Any]]) -> List[bytes]:
+        results: Dict[int, Dict] = {}
+        mentions: List[Tuple[int, Dict]] = []
+        seen = set()
+
+        for index, item in chunk:
+            try:
+                mention = _parse_mention(item)
+            except ValueError as e:
+                results[index] = {"index": index, "status": "error", "error": str(e)}
+                continue
+            # Duplicates inside the same chunk
+            if mention["source_id"] in seen:
+                results[index] = {"index": index, "status": "duplicate", "source_id": mention["source_id"]}
+                continue
+            seen.add(mention["source_id"])
+            mentions.append((index, mention))
+
+        if mentions:
+            existing = await self._existing_source_ids(list(seen))
+            fresh = []
+            for index, mention in mentions:
+                if mention["source_id"] in existing:
+                    results[index] = {"index": index, "status": "duplicate", "source_id": mention["source_id"]}
+                else:
+                    fresh.append((index, mention))
+
+            if fresh:
+                await self._analyze_and_insert(fresh, results)
+
+        self.counts["processed"] += len(chunk)
+        for result in results.values():
+            if result["status"] == "duplicate":
+                self.counts["duplicates"] += 1
+            elif result["status"] == "error":
+                self.counts["errors"] += 1
+        return [_line(results[index]) for index, _ in chunk]
+
+    async def _analyze_and_insert(self, fresh: List[Tuple[int, Dict]], results: Dict[int, Dict]):
+        try:
+            sentiments = await self.inference.analyze_batch([mention["text"] for _, mention in fresh])
+        except Exception as e:
+            logger.error(f"Bulk inference failed: {e}")
+            for index, _ in fresh:
+                results[index] = {"index": index, "status": "error", "error": "Inference failed"}
+            return
+
+        processed_at = datetime.utcnow()
+        rows = [
+            {
+                **mention,
+                "sentiment_score": sentiment["score"],
+                "sentiment_label": sentiment["label"],
+                "confidence": sentiment["confidence"],
+                "emotions": json.dumps(sentiment["emotions"]),
+                "processed_at": processed_at,
+            }
+            for (_, mention), sentiment in zip(fresh, sentiments)
+        ]
+
+        try:
+            ids = await self._insert_rows(rows)
+        except SQLAlchemyError as e:
+            logger.error(f"Bulk insert failed: {e}")
+            for index, _ in fresh:
+                results[index] = {"index": index, "status": "error", "error": "Database insert failed"}
+            return
+
+        records = []
+        for (index, _), row in zip(fresh, rows):
+            if row["source_id"] not in ids:
+                # Another writer stored it after the duplicate check
+                results[index] = {"index": index, "status": "duplicate", "source_id": row["source_id"]}
+                continue
+            record = {
+                "id": ids[row["source_id"]],
+                **row,
+                "emotions": json.loads(row["emotions"]),
+                "created_at": row["created_at"].isoformat(),
+                "processed_at": row["processed_at"].isoformat(),
+            }
+            results[index] = {"index": index, "status": "ok", "record": record}
+            records.append(record)
+        self.counts["inserted"] += len(records)
+
+        if self.on_inserted is not None:
+            await self.on_inserted(records)
+
+    async def _existing_source_ids(self, source_ids: List[str]) -> set:
+        """One IN query for the whole chunk instead of a lookup per row"""
+        async with self.session_factory() as db:
+            return set(await db.scalars(
+                select(SentimentRecord.source_id).where(SentimentRecord.source_id.in_(source_ids))
+            ))
+
+    async def _insert_rows(self, rows: List[Dict]) -> Dict[str, int]:
+        """Insert the chunk; rows skipped as conflicting duplicates are missing from the result"""
+        async with self.session_factory() as db:
+            conflict_insert = _CONFLICT_INSERTS.get(db.bind.dialect.name)
+            statement = insert(SentimentRecord) if conflict_insert is None else \
+                conflict_insert(SentimentRecord).on_conflict_do_nothing(index_elements=["source_id"])
+            try:
+                inserted = (await db.execute(
+                    statement.returning(SentimentRecord.id, SentimentRecord.source_id),
+                    rows
+                )).all()
+                await db.commit()
+            except SQLAlchemyError:
+                await db.rollback()
+                raise
+            return {source_id: record_id for record_id, source_id in inserted}
@@ -0,0 +1,356 @@
+"""
+WebSocket connection manager
+Each message is serialized once and pushed into a bounded queue per client;
+a writer task per client drains its own queue so one slow socket never
+delays the others. Clients can opt into coalescing, where events are
+buffered for an interval and sent as a single batch frame with counter deltas,
+and can subscribe to a filter so they only receive matching events.
+"""
+import asyncio
+import json
+import logging
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from fastapi import WebSocket
+
+from config import settings
+from services.alert_service import SEVERITIES
+from services.metrics import stage_timer
+from services.stats_aggregator import LABELS
+
+logger = logging.getLogger(__name__)
+
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "disconnect")
+
+FILTER_FIELDS = ("events", "sources", "severities", "labels")
+
+# Allowed values per field; sources are open-ended (bulk ingest and /api/analyze accept any)
+FILTER_VALUES = {
+    "events": ("sentiment", "alert"),
+    "severities": SEVERITIES,
+    "labels": LABELS,
+}
+
+
+class SubscriptionFilter:
+    """
+    Which events a client wants. An empty field matches everything, and a field
+    only constrains events that carry that attribute (alerts have no label,
+    sentiments have no severity).
+    """
+    __slots__ = ("events", "sources", "severities", "labels")
+
+    def __init__(self, events=None, sources=None, severities=None, labels=None):
+        self.events: FrozenSet[str] = frozenset(events or ())
+        self.sources: FrozenSet[str] = frozenset(sources or ())
+        self.severities: FrozenSet[str] = frozenset(severities or ())
+        self.labels: FrozenSet[str] = frozenset(labels or ())
+
+    @classmethod
+    def from_message(cls, filters: dict) -> "SubscriptionFilter":
+        """Build from a subscribe message's filters, raising ValueError on bad input"""
+        if not isinstance(filters, dict):
+            raise ValueError("filters must be an object")
+        unknown = set(filters) - set(FILTER_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown filter fields: {sorted(unknown)}")
+        values = {}
+        for field in FILTER_FIELDS:
+            value = filters.get(field) or []
+            if isinstance(value, str):
+                value = [value]
+            if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+                raise ValueError(f"{field} must be a list of strings")
+            values[field] = [v.lower() for v in value]
+            invalid = set(values[field]) - set(FILTER_VALUES.get(field, values[field]))
+            if invalid:
+                raise ValueError(f"Unknown {field}: {sorted(invalid)}, expected any of {list(FILTER_VALUES[field])}")
+        return cls(**values)
+
+    @property
+    def key(self) -> Tuple[FrozenSet[str], ...]:
+        return (self.events, self.sources, self.severities, self.labels)
+
+    def matches(self, attributes: Dict[str, Optional[str]]) -> bool:
+        for field, allowed in zip(FILTER_FIELDS, self.key):
+            if not allowed:
+                continue
+            value = attributes.get(field)
+            if value is not None and value not in allowed:
+                return False
+        return True
+
+    def to_dict(self) -> Dict:
+        return {field: sorted(values) for field, values in zip(FILTER_FIELDS, self.key)}
+
+
+def event_attributes(message: dict, source: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """Attributes subscription filters match on. Alerts don't carry their source, so callers pass it."""
+    data = message.get("data") or {}
+    return {
+        "events": message.get("type"),
+        "sources": source or data.get("source"),
+        "severities": data.get("severity"),
+        "labels": data.get("sentiment_label"),
+    }
+
+
+def batch_deltas(events: List[dict]) -> Dict:
+    """Counter changes carried by a batch frame so clients can update stats without re-querying"""
+    deltas = {
+        "total": 0, "positive": 0, "negative": 0, "neutral": 0,
+        "score_sum": 0.0, "by_source": {}, "alerts": {}
+    }
+    for event in events:
+        data = event.get("data") or {}
+        if event.get("type") == "sentiment":
+            label = data.get("sentiment_label")
+            score = data.get("sentiment_score") or 0.0
+            deltas["total"] += 1
+            if label in ("positive", "negative", "neutral"):
+                deltas[label] += 1
+            deltas["score_sum"] += score
+            source = deltas["by_source"].setdefault(data.get("source"), {"count": 0, "score_sum": 0.0})
+            source["count"] += 1
+            source["score_sum"] += score
+        elif event.get("type") == "alert":
+            severity = data.get("severity")
+            deltas["alerts"][severity] = deltas["alerts"].get(severity, 0) + 1
+    deltas["score_sum"] = round(deltas["score_sum"], 6)
+    return deltas
+
+
+class ClientConnection:
+    def __init__(self, websocket: WebSocket, max_queue_size: int, policy: str, coalesce: bool = False,
+                 on_drop: Optional[Callable[[], None]] = None):
+        self.websocket = websocket
+        self.policy = policy
+        self.coalesce = coalesce
+        self.filter = SubscriptionFilter()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.dropped = 0
+        self.on_drop = on_drop
+        self.writer_task: Optional[asyncio.Task] = None
+
+    def enqueue(self, payload: str) -> bool:
+        """Queue a serialized frame. Returns False if the client should be disconnected."""
+        try:
+            self.queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.policy == "disconnect":
+            return False
+
+        # drop_oldest: the newest event matters more than a stale one
+        try:
+            self.queue.get_nowait()
+            self.dropped += 1
+            if self.on_drop is not None:
+                self.on_drop()
+        except asyncio.QueueEmpty:
+            pass
+        self.queue.put_nowait(payload)
+        return True
+
+    async def run_writer(self):
+        while True:
+            payload = await self.queue.get()
+            await self.websocket.send_text(payload)
+
+
+class _SubscriberGroup:
+    """Clients sharing one filter and delivery mode; each event is matched once per group"""
+
+    def __init__(self, subscription: SubscriptionFilter, coalesce: bool):
+        self.filter = subscription
+        self.coalesce = coalesce
+        self.clients: Set[ClientConnection] = set()
+        # Events waiting for the next batch frame, flushed at most once per interval
+        self.pending: List[dict] = []
+        self.flush_task: Optional[asyncio.Task] = None
+
+
+class ConnectionManager:
+    def __init__(
+        self,
+        max_queue_size: int = 256,
+        slow_consumer_policy: str = "drop_oldest",
+        coalesce_interval_ms: float = 250.0,
+    ):
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {slow_consumer_policy}")
+        self.max_queue_size = max_queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.coalesce_interval = coalesce_interval_ms / 1000.0
+        self.clients: Dict[WebSocket, ClientConnection] = {}
+        # (filter key, coalesce) -> subscribers
+        self.groups: Dict[Tuple, _SubscriberGroup] = {}
+        self.batches_sent = 0
+        # Cumulative across disconnects, unlike the per-client counts
+        self.dropped_total = 0
+
+    @property
+    def active_connections(self):
+        return list(self.clients)
+
+    async def connect(self, websocket: WebSocket, coalesce: bool = False) -> ClientConnection:
+        await websocket.accept()
+        client = ClientConnection(
+            websocket, self.max_queue_size, self.slow_consumer_policy, coalesce, on_drop=self._count_drop
+        )
+        client.writer_task = asyncio.create_task(self._write(client))
+        self.clients[websocket] = client
+        self._join(client)
+        logger.info(f"Client connected. Total connections: {len(self.clients)}")
+        return client
+
+    def disconnect(self, websocket: WebSocket):
+        client = self.clients.pop(websocket, None)
+        if client is None:
+            return
+        self._leave(client)
+        if client.writer_task is not None and client.writer_task is not asyncio.current_task():
+            client.writer_task.cancel()
+        logger.info(f"Client disconnected. Total connections: {len(self.clients)}")
+
+    def subscribe(self, websocket: WebSocket, subscription: SubscriptionFilter):
+        """Replace a client's filter; an empty filter subscribes to everything"""
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        self._leave(client)
+        client.filter = subscription
+        self._join(client)
+
+    def _join(self, client: ClientConnection):
+        key = (client.filter.key, client.coalesce)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = _SubscriberGroup(client.filter, client.coalesce)
+        group.clients.add(client)
+
+    def _leave(self, client: ClientConnection):
+        key = (client.filter.key, client.coalesce)
+        group = self.groups.get(key)
+        if group is None:
+            return
+        group.clients.discard(client)
+        if not group.clients:
+            if group.flush_task is not None:
+                group.flush_task.cancel()
+            del self.groups[key]
+
+    def send(self, websocket: WebSocket, message: dict):
+        """Queue a message for one client (replies go through the writer too, never a second sender)"""
+        client = self.clients.get(websocket)
+        if client is not None and not client.enqueue(json.dumps(message)):
+            self._drop_slow_client(client)
+
+    async def broadcast(self, message: dict, source: Optional[str] = None):
+        """Deliver an event to every client whose filter matches it"""
+        with stage_timer("broadcast"):
+            attributes = event_attributes(message, source)
+            payload = None
+
+            for group in list(self.groups.values()):
+                if not group.filter.matches(attributes):
+                    continue
+                if group.coalesce:
+                    group.pending.append(message)
+                    if group.flush_task is None:
+                        group.flush_task = asyncio.create_task(self._flush_after_interval(group))
+                    continue
+                if payload is None:
+                    payload = json.dumps(message)  # serialized once for every client
+                self._deliver(group, payload)
+
+    async def _flush_after_interval(self, group: _SubscriberGroup):
+        # One timer per batch caps coalescing clients at 1 / interval frames per second
+        try:
+            await asyncio.sleep(self.coalesce_interval)
+        finally:
+            group.flush_task = None
+        self._flush(group)
+
+    def flush(self):
+        """Send every buffered batch frame now"""
+        for group in list(self.groups.values()):
+            if group.flush_task is not None:
+                group.flush_task.cancel()
+                group.flush_task = None
+            self._flush(group)
+
+    def _flush(self, group: _SubscriberGroup):
+        events, group.pending = group.pending, []
+        if not events:
+            return
+        payload = json.dumps({
+            "type": "batch",
+            "data": {"events": events, "deltas": batch_deltas(events)}
+        })
+        self.batches_sent += 1
+        self._deliver(group, payload)
+
+    def _deliver(self, group: _SubscriberGroup, payload: str):
+        for client in list(group.clients):
+            if not client.enqueue(payload):
+                self._drop_slow_client(client)
+
+    async def close_all(self):
+        self.flush()
+        for websocket in list(self.clients):
+            self.disconnect(websocket)
+            try:
+                await websocket.close()
+            except Exception:
+                pass
+
+    async def _write(self, client: ClientConnection):
+        try:
+            await client.run_writer()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Dropping failed WebSocket client: {e}")
+            self.disconnect(client.websocket)
+
+    def _drop_slow_client(self, client: ClientConnection):
+        logger.warning("Disconnecting slow WebSocket client: send queue full")
+        self.disconnect(client.websocket)
+        asyncio.create_task(self._close(client.websocket, code=1013))
+
+    def _count_drop(self):
+        self.dropped_total += 1
+
+    async def _close(self, websocket: WebSocket, code: int):
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    def stats(self) -> Dict:
+        return {
+            "clients": len(self.clients),
+            "subscriber_groups": len(self.groups),
+            "queued": sum(client.queue.qsize() for client in self.clients.values()),
+            "dropped": self.dropped_total,
+            "coalescing_clients": sum(1 for client in self.clients.values() if client.coalesce),
+            "batches_sent": self.batches_sent,
+            "policy": self.slow_consumer_policy,
+        }
+
+
+# Singleton instance
+_connection_manager = None
+
+def get_connection_manager() -> ConnectionManager:
+    global _connection_manager
+    if _connection_manager is None:
+        _connection_manager = ConnectionManager(
+            max_queue_size=settings.ws_max_queue_size,
+            slow_consumer_policy=settings.ws_slow_consumer_policy,
+            coalesce_interval_ms=settings.ws_coalesce_interval_ms
+        )
+    return _connection_manager
@@ -0,0 +1,196 @@
+"""
+In-memory source_id dedupe index
+Recently seen IDs sit in a size- and TTL-bounded recency map, and every ID also
+goes into a rotating pair of Bloom filters. A lookup is a known duplicate (recent),
+definitely new (not in either filter, no DB lookup needed), or unknown (a filter
+says maybe), and only the unknowns go to the database.
+IDs are kept as 64-bit hashes, so memory is fixed by the settings regardless of
+how many IDs arrive per day. IDs older than both filter generations count as new;
+the unique constraint on source_id still catches those rare re-deliveries.
+Until it has been seeded from the database, the index only recognizes the IDs added
+since, and everything else is unknown.
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+from config import settings
+
+# IDs hashed per lock hold while seeding
+SEED_CHUNK = 10000
+
+
+def _hash(source_id: str) -> Tuple[int, int]:
+    digest = hashlib.blake2b(source_id.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / self.capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    # Double hashing: the k positions are (h1 + i * h2) mod bits for two independent 64-bit hashes
+
+    def add(self, h1: int, h2: int) -> bool:
+        """Set the bits for an item; returns whether they were all set already"""
+        array, bits = self._array, self.bits
+        present = True
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % bits
+            mask = 1 << (position & 7)
+            if not array[position >> 3] & mask:
+                array[position >> 3] |= mask
+                present = False
+        if not present:
+            self.count += 1
+        return present
+
+    def contains(self, h1: int, h2: int) -> bool:
+        array, bits = self._array, self.bits
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % bits
+            if not array[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._array)
+
+
+class DedupeIndex:
+    def __init__(
+        self,
+        max_entries: int = 100000,
+        ttl_seconds: float = 86400,
+        bloom_capacity: int = 1000000,
+        bloom_error_rate: float = 0.001,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self._recent: "OrderedDict[int, float]" = OrderedDict()  # id hash -> last seen (monotonic)
+        self._current = BloomFilter(bloom_capacity, bloom_error_rate) if bloom_capacity > 0 else None
+        self._previous: Optional[BloomFilter] = None
+        self._lock = threading.Lock()
+        self.seeded = False
+        self.counts = {"duplicate": 0, "new": 0, "unknown": 0}
+
+    def seen(self, source_id: str) -> Optional[bool]:
+        """True for a recent duplicate, False when certainly new, None when only the DB can tell"""
+        h1, h2 = _hash(source_id)
+        with self._lock:
+            self._expire()
+            if h1 in self._recent:
+                self.counts["duplicate"] += 1
+                return True
+            if not self.seeded or self._current is None or self._maybe_in_filters(h1, h2):
+                self.counts["unknown"] += 1
+                return None
+            self.counts["new"] += 1
+            return False
+
+    def add(self, source_id: str):
+        h1, h2 = _hash(source_id)
+        with self._lock:
+            self._remember(h1, h2)
+
+    def discard(self, source_id: str):
+        """Forget a recent ID whose insert failed (the Bloom filters can't forget; that only costs a DB lookup)"""
+        h1, _ = _hash(source_id)
+        with self._lock:
+            self._recent.pop(h1, None)
+
+    def seed(self, source_ids: Sequence[str]):
+        """
+        Load IDs from the database, oldest first; only the newest go into the recency map.
+        Slow for millions of IDs, so run it in a thread: lookups carry on between chunks
+        """
+        recent_from = len(source_ids) - self.max_entries
+        for start in range(0, len(source_ids), SEED_CHUNK):
+            with self._lock:
+                for position in range(start, min(start + SEED_CHUNK, len(source_ids))):
+                    source_id = source_ids[position]
+                    if not source_id:
+                        continue
+                    h1, h2 = _hash(source_id)
+                    if position >= recent_from:
+                        self._remember(h1, h2)
+                    elif self._current is not None:
+                        self._add_to_filters(h1, h2)
+        self.seeded = True
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+            if self._current is not None:
+                self._current = BloomFilter(self.bloom_capacity, self.bloom_error_rate)
+            self._previous = None
+            self.seeded = False
+
+    def _maybe_in_filters(self, h1: int, h2: int) -> bool:
+        return self._current.contains(h1, h2) or (self._previous is not None and self._previous.contains(h1, h2))
+
+    def _remember(self, h1: int, h2: int):
+        self._recent[h1] = time.monotonic()
+        self._recent.move_to_end(h1)
+        while len(self._recent) > self.max_entries:
+            self._recent.popitem(last=False)
+
+        if self._current is not None:
+            self._add_to_filters(h1, h2)
+
+    def _add_to_filters(self, h1: int, h2: int):
+        if self._current.full:
+            # Keep one previous generation so IDs don't vanish the moment a filter fills
+            self._previous = self._current
+            self._current = BloomFilter(self.bloom_capacity, self.bloom_error_rate)
+        self._current.add(h1, h2)
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.ttl_seconds
+        while self._recent:
+            _, seen_at = next(iter(self._recent.items()))
+            if seen_at >= cutoff:
+                break
+            self._recent.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            filters = [bloom for bloom in (self._current, self._previous) if bloom is not None]
+            return {
+                "recent": len(self._recent),
+                "max_entries": self.max_entries,
+                "bloom_enabled": self._current is not None,
+                "seeded": self.seeded,
+                "bloom_items": sum(bloom.count for bloom in filters),
+                "bloom_bytes": sum(bloom.size_bytes for bloom in filters),
+                **self.counts,
+            }
+
+
+# Singleton instance
+_dedupe_index = None
+
+def get_dedupe_index() -> DedupeIndex:
+    global _dedupe_index
+    if _dedupe_index is None:
+        _dedupe_index = DedupeIndex(
+            max_entries=settings.dedupe_max_entries,
+            ttl_seconds=settings.dedupe_ttl_hours * 3600,
+            bloom_capacity=settings.dedupe_bloom_capacity,
+            bloom_error_rate=settings.dedupe_bloom_error_rate
+        )
+    return _dedupe_index
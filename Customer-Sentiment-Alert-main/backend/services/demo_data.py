@@ -4,14 +4,18 @@ Simulates realistic customer feedback from various sources
 """
 import random
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import List, Dict, Set
+from typing import List, Dict
+
+# Most recent author+text combinations remembered
+MAX_USED_PAIRS = 500
 
 
 class DemoDataGenerator:
     def __init__(self):
-        # Track used author+text combinations globally
-        self.used_pairs: Set[str] = set()
+        # Track used author+text combinations globally, oldest first
+        self.used_pairs: "OrderedDict[str, None]" = OrderedDict()
         
         self.demo_tweets = [
             # Negative
@@ -116,12 +120,7 @@ class DemoDataGenerator:
                 
                 if pair_key not in self.used_pairs:
                     # Found unused combination!
-                    self.used_pairs.add(pair_key)
-                    
-                    # Auto-cleanup if too many stored (prevent memory issues)
-                    if len(self.used_pairs) > 500:
-                        # Keep only recent half
-                        self.used_pairs = set(list(self.used_pairs)[-250:])
+                    self._mark_used(pair_key)
                     
                     # Generate truly unique ID
                     unique_id = str(uuid.uuid4())[:8]
@@ -144,6 +143,13 @@ class DemoDataGenerator:
         self.used_pairs.clear()
         return self.generate_demo_mention()
     
+    def _mark_used(self, pair_key: str):
+        """Remember a combination, forgetting the oldest once over the cap (prevent memory issues)"""
+        self.used_pairs[pair_key] = None
+        self.used_pairs.move_to_end(pair_key)
+        while len(self.used_pairs) > MAX_USED_PAIRS:
+            self.used_pairs.popitem(last=False)
+    
     def generate_batch(self, count: int = 10) -> List[Dict]:
         """Generate multiple demo mentions"""
         return [self.generate_demo_mention() for _ in range(count)]
@@ -168,8 +174,7 @@ class DemoDataGenerator:
             source_id = f"{source}_crisis_{author}_{unique_id}"
             
             # Mark as used
-            pair_key = f"{author}||{text}"
-            self.used_pairs.add(pair_key)
+            self._mark_used(f"{author}||{text}")
             
             mentions.append({
                 "source": source,
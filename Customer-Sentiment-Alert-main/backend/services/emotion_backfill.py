@@ -0,0 +1,100 @@
+"""
+Background emotion backfill for cascade inference
+With EMOTION_CASCADE on, positive confident mentions are stored without emotions.
+Their IDs queue up here and the emotion model fills them in later, in batches, while
+live ingestion is idle, so the backfill never competes with new mentions for the model.
+"""
+import asyncio
+import json
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import update
+
+from models.database import SentimentRecord
+
+logger = logging.getLogger(__name__)
+
+# How long to wait before checking again whenever live traffic is using the model
+IDLE_POLL_SECONDS = 0.25
+
+
+class EmotionBackfill:
+    def __init__(
+        self,
+        session_factory,
+        inference,
+        batch_size: int = 32,
+        max_queue_size: int = 10000,
+        is_busy: Optional[Callable[[], bool]] = None,
+    ):
+        self.session_factory = session_factory
+        self.inference = inference
+        self.batch_size = max(1, batch_size)
+        self.is_busy = is_busy or (lambda: False)
+        # Bounded: under a sustained flood the overflow keeps no emotions rather than growing memory
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self.counts = {"enqueued": 0, "filled": 0, "dropped": 0, "failed": 0}
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop without draining; records still queued simply keep empty emotions"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def enqueue(self, record_id: int, text: str):
+        try:
+            self._queue.put_nowait((record_id, text))
+        except asyncio.QueueFull:
+            self.counts["dropped"] += 1
+            return
+        self.counts["enqueued"] += 1
+
+    def enqueue_missing(self, records: Iterable[Dict]):
+        """Queue the freshly inserted records (as dicts) that were stored without emotions"""
+        for record in records:
+            if not record.get("emotions") and record.get("id") is not None:
+                self.enqueue(record["id"], record["text"])
+
+    async def _take_batch(self) -> List[Tuple[int, str]]:
+        batch = [await self._queue.get()]
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._take_batch()
+            while self.is_busy():
+                await asyncio.sleep(IDLE_POLL_SECONDS)
+            try:
+                await self._fill(batch)
+            except Exception as e:
+                self.counts["failed"] += len(batch)
+                logger.error(f"Emotion backfill failed for {len(batch)} records: {e}")
+
+    async def _fill(self, batch: List[Tuple[int, str]]):
+        emotions = await self.inference.analyze_emotions([text for _, text in batch])
+        # An empty result means the model failed or isn't loaded; leave those rows as they are
+        rows = [
+            {"id": record_id, "emotions": json.dumps(result)}
+            for (record_id, _), result in zip(batch, emotions) if result
+        ]
+        if not rows:
+            return
+        async with self.session_factory() as db:
+            await db.execute(update(SentimentRecord), rows)
+            await db.commit()
+        self.counts["filled"] += len(rows)
+
+    def stats(self) -> Dict:
+        return {"pending": self._queue.qsize(), **self.counts}
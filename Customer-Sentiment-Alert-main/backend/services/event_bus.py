@@ -0,0 +1,266 @@
+"""
+Cross-process event bus and leader election for multi-worker deployments
+Each worker handles its own clients and indexes its own inserts directly, and
+publishes the same events to the bus so the other workers can relay them to
+their sockets and keep their in-memory indexes current.
+
+Backends:
+  local - single process, there are no peers so publishing is a no-op
+  unix  - a small pub/sub broker on a Unix domain socket, hosted by whichever
+          worker holds the broker lock; the others connect to it and take over
+          if it goes away (a local stand-in for Redis pub/sub)
+Delivery is best effort: events published while a worker is reconnecting are
+lost, and the database stays the source of truth.
+"""
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from services.serialization import dumps
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; leader election degrades to "always leader"
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+EVENT_BUS_BACKENDS = ("local", "unix")
+
+Handler = Callable[[dict, Optional[str]], Awaitable[None]]
+
+# A peer that lets this much pile up in its socket buffer misses messages until it catches up
+MAX_PEER_BUFFER_BYTES = 4 * 1024 * 1024
+RECONNECT_DELAY = 0.5
+
+
+class LeaderLock:
+    """
+    Exclusive flock on a file. The kernel drops it when the holder exits,
+    so a standby worker polling acquire() takes over after a crash.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._file is not None or fcntl is None
+
+    def try_acquire(self) -> bool:
+        if self.is_leader:
+            return True
+        lock_file = open(self.path, "a+")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._file = lock_file
+        return True
+
+    async def acquire(self, poll_interval: float = 1.0):
+        """Wait until this process holds the lock"""
+        while not self.try_acquire():
+            await asyncio.sleep(poll_interval)
+
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+class EventBus:
+    name = ""
+
+    def __init__(self):
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.handlers: List[Handler] = []
+        self.counts = {"published": 0, "received": 0, "dropped": 0}
+
+    def subscribe(self, handler: Handler):
+        """Call `handler(message, source)` for every event published by another worker"""
+        self.handlers.append(handler)
+
+    async def start(self):
+        pass
+
+    def publish(self, message: dict, source: Optional[str] = None):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    async def _dispatch(self, message: dict, source: Optional[str]):
+        self.counts["received"] += 1
+        for handler in self.handlers:
+            try:
+                await handler(message, source)
+            except Exception as e:
+                logger.error(f"Event bus handler failed: {e}")
+
+    def stats(self) -> Dict:
+        return {"backend": self.name, "worker_id": self.worker_id, **self.counts}
+
+
+class LocalEventBus(EventBus):
+    name = "local"
+
+    def publish(self, message: dict, source: Optional[str] = None):
+        self.counts["published"] += 1
+
+
+class _Broker:
+    """Relays every line it receives to all other connected workers"""
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.peers: Set[asyncio.StreamWriter] = set()
+        self.dropped = 0
+        self._connections: Set[asyncio.Task] = set()
+        self._server = None
+
+    async def start(self):
+        # Only the broker lock holder gets here, so an existing socket file is stale
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(
+            self._handle, path=self.socket_path, limit=MAX_PEER_BUFFER_BYTES
+        )
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.peers.add(writer)
+        self._connections.add(asyncio.current_task())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                for peer in list(self.peers):
+                    if peer is writer or peer.is_closing():
+                        continue
+                    if peer.transport.get_write_buffer_size() > MAX_PEER_BUFFER_BYTES:
+                        self.dropped += 1
+                        continue
+                    peer.write(line)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self.peers.discard(writer)
+            self._connections.discard(asyncio.current_task())
+            writer.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            for peer in list(self.peers):
+                peer.close()
+            # Let the connection handlers see the close and exit instead of being cancelled
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+class UnixSocketEventBus(EventBus):
+    name = "unix"
+
+    def __init__(self, socket_path: str):
+        super().__init__()
+        if fcntl is None or not hasattr(asyncio, "start_unix_server"):
+            raise ValueError("The unix event bus needs a POSIX system")
+        self.socket_path = socket_path
+        self.broker_lock = LeaderLock(f"{socket_path}.lock")
+        self._broker: Optional[_Broker] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._connected = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            # Give the first connection a moment so startup events are not dropped
+            try:
+                await asyncio.wait_for(self._connected.wait(), timeout=2.0)
+            except asyncio.TimeoutError:
+                logger.warning(f"Event bus not connected yet at {self.socket_path}")
+
+    def publish(self, message: dict, source: Optional[str] = None):
+        self.counts["published"] += 1
+        writer = self._writer
+        if writer is None or writer.is_closing() or writer.transport.get_write_buffer_size() > MAX_PEER_BUFFER_BYTES:
+            self.counts["dropped"] += 1
+            return
+        writer.write(dumps({"origin": self.worker_id, "source": source, "message": message}) + b"\n")
+
+    async def _run(self):
+        while True:
+            if self._broker is None and self.broker_lock.try_acquire():
+                self._broker = _Broker(self.socket_path)
+                await self._broker.start()
+                logger.info(f"Hosting event bus broker at {self.socket_path}")
+            try:
+                reader, writer = await asyncio.open_unix_connection(
+                    self.socket_path, limit=MAX_PEER_BUFFER_BYTES
+                )
+            except (FileNotFoundError, ConnectionRefusedError):
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+
+            self._writer = writer
+            self._connected.set()
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    envelope = json.loads(line)
+                    if envelope.get("origin") != self.worker_id:
+                        await self._dispatch(envelope["message"], envelope.get("source"))
+            except (ConnectionError, ValueError) as e:
+                logger.warning(f"Event bus connection lost: {e}")
+            finally:
+                self._connected.clear()
+                writer.close()
+                self._writer = None
+            logger.warning("Event bus broker went away, reconnecting")
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._broker is not None:
+            await self._broker.close()
+            self._broker = None
+        self.broker_lock.release()
+
+    def stats(self) -> Dict:
+        return {
+            **super().stats(),
+            "connected": self._connected.is_set(),
+            "broker": self._broker is not None,
+            "broker_peers": len(self._broker.peers) if self._broker else None,
+            "broker_dropped": self._broker.dropped if self._broker else None,
+        }
+
+
+def create_event_bus(name: str, socket_path: str = "/tmp/sentiguard-bus.sock") -> EventBus:
+    if name == "local":
+        return LocalEventBus()
+    if name == "unix":
+        return UnixSocketEventBus(socket_path)
+    raise ValueError(f"Unknown event bus backend: {name} (expected one of {', '.join(EVENT_BUS_BACKENDS)})")
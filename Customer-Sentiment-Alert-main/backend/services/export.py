@@ -0,0 +1,176 @@
+"""
+Streaming report export (CSV, NDJSON, Parquet)
+Rows come off a server-side cursor in chunks and are encoded chunk by chunk,
+so memory stays flat no matter how many rows match
+"""
+import csv
+import io
+import logging
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Sequence
+
+from sqlalchemy import DateTime, Float, Integer, select
+
+from models.database import SentimentRecord, Alert
+from services.serialization import RowEncoder
+
+logger = logging.getLogger(__name__)
+
+EXPORT_KINDS = {"sentiments": SentimentRecord, "alerts": Alert}
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class _CSVEncoder:
+    def __init__(self, columns: List):
+        self.names = [column.key for column in columns]
+
+    def header(self) -> bytes:
+        return self._encode([self.names])
+
+    def rows(self, rows: Sequence) -> bytes:
+        return self._encode([[_value(value) for value in row] for row in rows])
+
+    def footer(self) -> bytes:
+        return b""
+
+    def _encode(self, rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+
+
+class _NDJSONEncoder:
+    def __init__(self, columns: List):
+        # Emotions JSON is spliced in as stored, so it comes out as an object like in the REST API
+        self.encoder = RowEncoder([column.key for column in columns])
+
+    def header(self) -> bytes:
+        return b""
+
+    def rows(self, rows: Sequence) -> bytes:
+        return self.encoder.encode_lines(rows)
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands over whatever the Parquet writer has produced so far"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class _ParquetEncoder:
+    """Each chunk becomes one row group, flushed to the client as soon as it is written"""
+
+    def __init__(self, columns: List):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export requires pyarrow (pip install pyarrow)")
+        self.pa = pa
+        self.names = [column.key for column in columns]
+        self.schema = pa.schema([(column.key, self._arrow_type(column.type)) for column in columns])
+        self.sink = _ChunkSink()
+        self.writer = pq.ParquetWriter(self.sink, self.schema, compression="snappy")
+
+    def _arrow_type(self, column_type):
+        if isinstance(column_type, Integer):
+            return self.pa.int64()
+        if isinstance(column_type, Float):
+            return self.pa.float64()
+        if isinstance(column_type, DateTime):
+            return self.pa.timestamp("us")
+        return self.pa.string()
+
+    def header(self) -> bytes:
+        return self.sink.drain()
+
+    def rows(self, rows: Sequence) -> bytes:
+        columns = list(zip(*rows))
+        table = self.pa.Table.from_arrays(
+            [self.pa.array(values, type=field.type) for values, field in zip(columns, self.schema)],
+            schema=self.schema
+        )
+        self.writer.write_table(table)
+        return self.sink.drain()
+
+    def footer(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+
+ENCODERS = {"csv": _CSVEncoder, "ndjson": _NDJSONEncoder, "parquet": _ParquetEncoder}
+
+
+def build_export_query(kind: str, since: Optional[datetime] = None, until: Optional[datetime] = None, source: Optional[str] = None):
+    """Columns and SELECT for an export, oldest first. Raises ValueError on an unknown kind"""
+    model = EXPORT_KINDS.get(kind)
+    if model is None:
+        raise ValueError(f"Unknown export kind '{kind}', expected one of {sorted(EXPORT_KINDS)}")
+    columns = list(model.__table__.columns)
+    statement = select(*columns)
+    if source:
+        if model is Alert:
+            # Alerts carry no source of their own; filter through the record that raised them
+            statement = statement.join(SentimentRecord, SentimentRecord.id == Alert.sentiment_record_id)
+        statement = statement.where(SentimentRecord.source == source)
+    if since is not None:
+        statement = statement.where(model.created_at >= since)
+    if until is not None:
+        statement = statement.where(model.created_at < until)
+    return columns, statement.order_by(model.created_at, model.id)
+
+
+def create_encoder(fmt: str, columns: List):
+    """Raises ValueError on an unknown format or a missing optional dependency"""
+    encoder = ENCODERS.get(fmt)
+    if encoder is None:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {sorted(ENCODERS)}")
+    return encoder(columns)
+
+
+async def stream_export(session_factory, statement, encoder, chunk_size: int = 5000) -> AsyncIterator[bytes]:
+    """Encode the query result chunk by chunk off a server-side cursor"""
+    exported = 0
+    async with session_factory() as db:
+        result = await db.stream(statement.execution_options(yield_per=chunk_size))
+        data = encoder.header()
+        if data:
+            yield data
+        async for partition in result.partitions():
+            exported += len(partition)
+            yield encoder.rows(partition)
+    data = encoder.footer()
+    if data:
+        yield data
+    logger.info(f"Exported {exported} rows")
@@ -0,0 +1,258 @@
+"""
+Inference backends for the sentiment and emotion models
+Every backend returns the same shape as the HuggingFace pipelines:
+  sentiment: [{'label': 'POSITIVE', 'score': 0.98}, ...]       (top label per text)
+  emotions:  [[{'label': 'anger', 'score': 0.71}, ...], ...]   (all labels per text, best first)
+Heavy libraries are imported inside the backend that needs them.
+"""
+import logging
+import os
+import sys
+import time
+import zlib
+from typing import Callable, Dict, List
+
+from services.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+SENTIMENT_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+EMOTION_MODEL = "j-hartmann/emotion-english-distilroberta-base"
+
+MAX_LENGTH = 512
+
+Classifier = Callable[[List[str]], List]
+
+
+def model_dir_name(model_name: str) -> str:
+    """Local directory name for an exported model"""
+    return model_name.replace("/", "__")
+
+
+def _softmax(logits):
+    import numpy as np
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def _format_outputs(probabilities, id2label: Dict[int, str], top_k_all: bool) -> List:
+    results = []
+    for row in probabilities:
+        scored = sorted(
+            ({'label': id2label[i], 'score': float(score)} for i, score in enumerate(row)),
+            key=lambda item: item['score'],
+            reverse=True
+        )
+        results.append(scored if top_k_all else scored[0])
+    return results
+
+
+def limit_threads(threads: int):
+    """Cap intra-op threads for the numeric libraries in this process (torch, OpenMP, MKL)"""
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    torch = sys.modules.get("torch")  # only if a backend already imported it
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+
+class InferenceBackend:
+    name = "base"
+    # Loaded models keep working in a forked child (no runtime threads started at load time)
+    fork_safe = True
+    # Intra-op threads for runtimes configured at load time; 0 keeps the library default
+    num_threads = 0
+
+    def load_sentiment_model(self) -> Classifier:
+        """Returns a callable mapping a list of texts to one top label per text"""
+        raise NotImplementedError
+
+    def load_emotion_model(self) -> Classifier:
+        """Returns a callable mapping a list of texts to all emotion labels per text"""
+        raise NotImplementedError
+
+    @property
+    def version(self) -> str:
+        return f"{self.name}:{SENTIMENT_MODEL}:{EMOTION_MODEL}"
+
+
+class TransformersBackend(InferenceBackend):
+    """HuggingFace transformers pipelines (the original implementation)"""
+    name = "transformers"
+
+    def __init__(self):
+        import torch
+        self.device = 0 if torch.cuda.is_available() else -1
+        logger.info(f"Initializing NLP models on device: {'GPU' if self.device == 0 else 'CPU'}")
+
+    def load_sentiment_model(self) -> Classifier:
+        from transformers import pipeline
+        analyzer = pipeline("sentiment-analysis", model=SENTIMENT_MODEL, device=self.device)
+        return lambda texts: analyzer(texts, batch_size=len(texts), truncation=True)
+
+    def load_emotion_model(self) -> Classifier:
+        from transformers import pipeline
+        analyzer = pipeline("text-classification", model=EMOTION_MODEL, device=self.device, top_k=None)
+        return lambda texts: analyzer(texts, batch_size=len(texts), truncation=True)
+
+
+class _ExportedBackend(InferenceBackend):
+    """Shared tokenizer and label handling for models written by export_models.py"""
+    model_file = ""
+    tensor_type = "np"
+
+    def __init__(self, export_dir: str):
+        self.export_dir = export_dir
+
+    def _model_path(self, model_name: str) -> str:
+        path = os.path.join(self.export_dir, model_dir_name(model_name))
+        if not os.path.exists(os.path.join(path, self.model_file)):
+            raise FileNotFoundError(
+                f"No exported {self.name} model in {path}. Run: python export_models.py --format {self.name}"
+            )
+        return path
+
+    def _load(self, model_name: str, top_k_all: bool, stage: str) -> Classifier:
+        from transformers import AutoConfig, AutoTokenizer
+        path = self._model_path(model_name)
+        tokenizer = AutoTokenizer.from_pretrained(path)
+        id2label = {int(i): label for i, label in AutoConfig.from_pretrained(path).id2label.items()}
+        run_logits = self._load_runner(path)
+
+        def classify(texts: List[str]) -> List:
+            # Tokenization is timed on its own; the model stage timer in NLPService covers both
+            with stage_timer(f"{stage}_tokenize"):
+                encoded = tokenizer(
+                    texts, padding=True, truncation=True, max_length=MAX_LENGTH, return_tensors=self.tensor_type
+                )
+            logits = run_logits(encoded)
+            return _format_outputs(_softmax(logits), id2label, top_k_all)
+
+        logger.info(f"Loaded {self.name} model from {path}")
+        return classify
+
+    def _load_runner(self, path: str):
+        raise NotImplementedError
+
+    def load_sentiment_model(self) -> Classifier:
+        return self._load(SENTIMENT_MODEL, top_k_all=False, stage="sentiment")
+
+    def load_emotion_model(self) -> Classifier:
+        return self._load(EMOTION_MODEL, top_k_all=True, stage="emotion")
+
+
+class OnnxBackend(_ExportedBackend):
+    """ONNX Runtime session over an exported graph"""
+    name = "onnx"
+    model_file = "model.onnx"
+    fork_safe = False  # sessions start their thread pool on creation
+
+    def _load_runner(self, path: str):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+        session = ort.InferenceSession(
+            os.path.join(path, self.model_file), options, providers=["CPUExecutionProvider"]
+        )
+        input_names = {i.name for i in session.get_inputs()}
+
+        def run(encoded):
+            feeds = {name: value.astype("int64") for name, value in encoded.items() if name in input_names}
+            return session.run(None, feeds)[0]
+
+        return run
+
+
+class TorchScriptBackend(_ExportedBackend):
+    """Traced TorchScript graph"""
+    name = "torchscript"
+    model_file = "model.pt"
+    tensor_type = "pt"
+
+    def _load_runner(self, path: str):
+        import torch
+        module = torch.jit.load(os.path.join(path, self.model_file), map_location="cpu")
+        module.eval()
+
+        def run(encoded):
+            with torch.inference_mode():
+                outputs = module(encoded["input_ids"], encoded["attention_mask"])
+            logits = outputs[0] if isinstance(outputs, (tuple, list)) else outputs
+            return logits.numpy()
+
+        return run
+
+
+EMOTION_LABELS = ("anger", "disgust", "fear", "joy", "neutral", "sadness", "surprise")
+
+
+class StubBackend(InferenceBackend):
+    """
+    Deterministic offline stand-in for benchmarks and development without model downloads
+    Labels are derived from a hash of the text; each call sleeps base_ms + per_text_ms * len(texts)
+    to mimic a model whose cost is amortized by batching. With spin=True it burns CPU for that
+    long instead, like a real forward pass, so multi-core scaling can be measured
+    """
+    name = "stub"
+
+    def __init__(self, base_ms: float = 2.0, per_text_ms: float = 0.25, spin: bool = False):
+        self.base = base_ms / 1000.0
+        self.per_text = per_text_ms / 1000.0
+        self.spin = spin
+
+    def _simulate(self, texts: List[str]):
+        delay = self.base + self.per_text * len(texts)
+        if delay <= 0:
+            return
+        if not self.spin:
+            time.sleep(delay)
+            return
+        # Thread CPU time, so the work doesn't shrink when the core is shared
+        deadline = time.thread_time() + delay
+        while time.thread_time() < deadline:
+            pass
+
+    def load_sentiment_model(self) -> Classifier:
+        def classify(texts: List[str]) -> List:
+            self._simulate(texts)
+            results = []
+            for text in texts:
+                digest = zlib.crc32(text.encode("utf-8"))
+                results.append({
+                    'label': 'POSITIVE' if digest & 1 else 'NEGATIVE',
+                    'score': 0.5 + (digest % 500) / 1000.0,
+                })
+            return results
+        return classify
+
+    def load_emotion_model(self) -> Classifier:
+        def classify(texts: List[str]) -> List:
+            self._simulate(texts)
+            results = []
+            for text in texts:
+                digest = zlib.crc32(text.encode("utf-8"), 1)
+                weights = [((digest >> (4 * i)) & 0xF) + 1 for i in range(len(EMOTION_LABELS))]
+                total = float(sum(weights))
+                scored = [{'label': label, 'score': weight / total} for label, weight in zip(EMOTION_LABELS, weights)]
+                results.append(sorted(scored, key=lambda item: item['score'], reverse=True))
+            return results
+        return classify
+
+    @property
+    def version(self) -> str:
+        return "stub:v1"
+
+
+def create_backend(name: str, export_dir: str = "./exported_models") -> InferenceBackend:
+    if name == "stub":
+        return StubBackend()
+    if name == "transformers":
+        return TransformersBackend()
+    if name == "onnx":
+        return OnnxBackend(export_dir)
+    if name == "torchscript":
+        return TorchScriptBackend(export_dir)
+    raise ValueError(f"Unknown inference backend: {name}")
@@ -0,0 +1,170 @@
+"""
+Runs model inference off the asyncio event loop
+Async handlers await the executor; torch code only ever runs in worker threads or processes
+  thread  - one model copy in this process, micro-batched by a scheduler thread
+  process - ProcessPoolExecutor, every worker loads its own model copy
+  pool    - forked workers sharing one model copy (see inference_pool.py)
+"""
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from config import settings
+from services.inference_pool import InferencePool
+from services.nlp_service import get_nlp_service, peek_nlp_service
+
+logger = logging.getLogger(__name__)
+
+
+def _analyze_sentiment(text: str) -> Dict:
+    # Module level so it can be pickled into process pool workers
+    return get_nlp_service().analyze_sentiment(text)
+
+
+def _analyze_batch(texts: List[str]) -> List[Dict]:
+    return get_nlp_service().analyze_batch(texts)
+
+
+def _analyze_emotions(texts: List[str]) -> List[Dict]:
+    return get_nlp_service().analyze_emotions(texts)
+
+
+def _load_models() -> None:
+    get_nlp_service()
+
+
+def _warm_up() -> None:
+    get_nlp_service().warm_up()
+
+
+class InferenceExecutor:
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 2,
+        threads_per_worker: int = 1,
+        max_batch_size: int = 16,
+        pin_cpus: bool = True,
+    ):
+        if kind not in ("thread", "process", "pool"):
+            raise ValueError(f"Unknown inference executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[Executor] = None
+        self.pool = InferencePool(
+            get_nlp_service,
+            workers=self.max_workers,
+            threads_per_worker=threads_per_worker,
+            max_batch_size=max_batch_size,
+            pin_cpus=pin_cpus
+        ) if kind == "pool" else None
+        # Set once load_models() is done with the pool, whether or not the workers started
+        self._pool_loaded = asyncio.Event()
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="inference"
+                )
+            logger.info(f"Started {self.kind} inference executor with {self.max_workers} workers")
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run a blocking callable in the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    async def load_models(self):
+        if self.pool is not None:
+            # Load in a thread, then fork here on the loop thread; requests arriving meanwhile wait
+            try:
+                await asyncio.to_thread(self.pool.load)
+                self.pool.start()
+            finally:
+                self._pool_loaded.set()
+            return
+        await self.run(_load_models)
+
+    async def warm_up(self):
+        if self.pool is not None:
+            # Each worker warms up its own thread pool after the fork
+            await asyncio.to_thread(self.pool.wait_ready)
+        elif self.kind == "process":
+            # Each worker process holds its own copy of the models
+            await asyncio.gather(*[self.run(_warm_up) for _ in range(self.max_workers)])
+        else:
+            await self.run(_warm_up)
+
+    async def _started_pool(self) -> InferencePool:
+        """The pool once its workers are forked; analysis requests can arrive while the models load"""
+        await self._pool_loaded.wait()
+        if not self.pool.running():
+            raise RuntimeError("Inference pool is not running")
+        return self.pool
+
+    async def analyze_sentiment(self, text: str) -> Dict:
+        if self.pool is not None:
+            pool = await self._started_pool()
+            return await asyncio.wrap_future(pool.analyze_sentiment(text))
+        if self.kind == "process":
+            return await self.run(_analyze_sentiment, text)
+
+        # Load the models in the pool, then hand the text to the batch scheduler
+        # thread directly so no pool worker sits blocked on the batch
+        nlp_service = await self.run(get_nlp_service)
+        return await asyncio.wrap_future(nlp_service.submit(text))
+
+    async def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        """Analyze an already-batched list of texts in one pool task"""
+        if self.pool is not None:
+            pool = await self._started_pool()
+            return await asyncio.wrap_future(pool.analyze_batch(texts))
+        return await self.run(_analyze_batch, texts)
+
+    async def analyze_emotions(self, texts: List[str]) -> List[Dict]:
+        """Emotion model only, for backfilling cascade results"""
+        if self.pool is not None:
+            pool = await self._started_pool()
+            return await asyncio.wrap_future(pool.analyze_emotions(texts))
+        return await self.run(_analyze_emotions, texts)
+
+    def pending(self) -> int:
+        """Texts or jobs waiting for the models in this process's view"""
+        if self.pool is not None:
+            return self.pool.pending()
+        nlp_service = peek_nlp_service()
+        return nlp_service.batch_scheduler.pending() if nlp_service is not None else 0
+
+    def stats(self) -> Dict:
+        stats = {"kind": self.kind, "workers": self.max_workers, "pending": self.pending()}
+        if self.pool is not None:
+            stats["pool"] = self.pool.stats()
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        if self.pool is not None:
+            self.pool.shutdown(wait=wait)
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton instance
+_inference_executor = None
+
+def get_inference_executor() -> InferenceExecutor:
+    global _inference_executor
+    if _inference_executor is None:
+        _inference_executor = InferenceExecutor(
+            kind=settings.inference_executor,
+            max_workers=settings.inference_workers,
+            threads_per_worker=settings.inference_threads_per_worker,
+            max_batch_size=settings.inference_max_batch_size,
+            pin_cpus=settings.inference_pin_cpus
+        )
+    return _inference_executor
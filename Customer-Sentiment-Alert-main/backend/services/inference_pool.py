@@ -0,0 +1,363 @@
+"""
+Forked multi-process inference pool
+The parent loads the models once and forks the workers, so they share the weights
+copy-on-write instead of each loading a copy. Before forking, the parent caps torch
+at one thread (an OpenMP pool started in the parent doesn't survive a fork) and
+freezes the garbage collector, so collections in the workers don't write to the
+inherited objects and un-share their pages. Each worker then sets its own intra-op
+thread count and, when there are enough cores, is pinned to its own CPUs, so N
+workers scale across cores instead of contending for one thread pool.
+
+Jobs and results travel over multiprocessing queues. A worker that picks up a single
+text also takes the single texts already queued behind it (up to the batch size), so
+concurrent requests still reach the models in batches. Results are cached in the
+parent, where the result cache lives.
+"""
+import gc
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional
+
+from services.inference_backends import limit_threads
+from services.metrics import INFERENCE_BATCH_SIZE, observe_stage
+from services.nlp_service import NLPService
+
+logger = logging.getLogger(__name__)
+
+_STOP = None
+
+JOB_TEXT = "text"
+JOB_BATCH = "batch"
+JOB_EMOTIONS = "emotions"
+
+READY_TIMEOUT = 300.0
+LIVENESS_INTERVAL = 1.0
+
+
+def _cpu_slices(workers: int, threads: int, pin_cpus: bool) -> List[Optional[List[int]]]:
+    """Disjoint CPU sets per worker, or no pinning when the workers would have to share cores"""
+    if not pin_cpus or not hasattr(os, "sched_getaffinity"):
+        return [None] * workers
+    cpus = sorted(os.sched_getaffinity(0))
+    if workers * threads > len(cpus):
+        logger.warning(f"{workers} workers x {threads} threads exceed {len(cpus)} CPUs, not pinning")
+        return [None] * workers
+    return [cpus[i * threads:(i + 1) * threads] for i in range(workers)]
+
+
+def _memory_mb(pid: int) -> Dict[str, float]:
+    """Resident memory split into pages shared with other processes and private ones (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line and not line.startswith(" "))
+    except OSError:
+        return {}
+
+    def kb(*names):
+        return sum(int(fields[name].split()[0]) for name in names if name in fields)
+
+    return {
+        "rss_mb": round(kb("Rss") / 1024, 1),
+        "shared_mb": round(kb("Shared_Clean", "Shared_Dirty") / 1024, 1),
+        "private_mb": round(kb("Private_Clean", "Private_Dirty") / 1024, 1),
+    }
+
+
+def _worker_main(service, load_service, jobs, results, ready, threads, cpus, max_batch_size):
+    # The parent owns shutdown: ignore Ctrl-C sent to the process group and the parent's signal plumbing
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.set_wakeup_fd(-1)
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    limit_threads(threads)
+    if service is None:
+        service = load_service()  # backend can't cross a fork, this worker loads its own copy
+    service.warm_up()
+    ready.release()
+
+    held = None
+    while True:
+        job = held if held is not None else jobs.get()
+        held = None
+        if job is _STOP:
+            return
+        job_id, kind, payload = job
+
+        if kind == JOB_TEXT:
+            batch = [(job_id, payload)]
+            while len(batch) < max_batch_size:
+                try:
+                    job = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP or job[1] != JOB_TEXT:
+                    held = job
+                    break
+                batch.append((job[0], job[2]))
+            job_ids = [queued_id for queued_id, _ in batch]
+            texts = [text for _, text in batch]
+            run = service.analyze_uncached
+        else:
+            job_ids = [job_id]
+            texts = payload
+            run = service.analyze_uncached if kind == JOB_BATCH else service.analyze_emotions
+
+        start = time.perf_counter()
+        try:
+            outputs = run(texts)
+            replies = [(queued_id, True, output) for queued_id, output in zip(job_ids, outputs)] \
+                if kind == JOB_TEXT else [(job_id, True, outputs)]
+        except Exception as e:
+            replies = [(queued_id, False, RuntimeError(f"Inference failed: {e}")) for queued_id in job_ids]
+        results.put((len(texts), time.perf_counter() - start, replies))
+
+
+class InferencePool:
+    def __init__(
+        self,
+        load_service: Callable[[], NLPService],
+        workers: int = 2,
+        threads_per_worker: int = 1,
+        max_batch_size: int = 16,
+        pin_cpus: bool = True,
+    ):
+        self.load_service = load_service
+        self.workers = max(1, workers)
+        self.threads_per_worker = max(1, threads_per_worker)
+        self.max_batch_size = max(1, max_batch_size)
+        self.pin_cpus = pin_cpus
+        # Raises ValueError where fork isn't available (Windows)
+        self._context = multiprocessing.get_context("fork")
+        self.service: Optional[NLPService] = None
+        self._processes = []
+        self._cpus: List[Optional[List[int]]] = []
+        self._jobs = None
+        self._results = None
+        self._ready = None
+        self._collector: Optional[threading.Thread] = None
+        self._futures: Dict[int, Future] = {}
+        self._ids = itertools.count()
+        self._broken: Optional[BrokenProcessPool] = None
+        self._closing = False
+        self.counts = {"batches": 0, "texts": 0}
+
+    def load(self):
+        """Load the models in this process (slow; any thread)"""
+        if self.service is None:
+            # No OpenMP pool may exist in the parent at fork time; workers set their own thread count
+            limit_threads(1)
+            self.service = self.load_service()
+
+    def start(self):
+        """Fork the workers. Call from the event loop thread after load(); jobs queue until the workers are ready"""
+        if self._processes:
+            return
+        self.load()
+        shared_service = self.service if self.service.backend.fork_safe else None
+        if shared_service is None:
+            logger.warning(f"{self.service.backend.name} models can't be shared across fork, each worker loads its own")
+
+        self._jobs = self._context.Queue()
+        self._results = self._context.Queue()
+        self._ready = self._context.Semaphore(0)
+        self._cpus = _cpu_slices(self.workers, self.threads_per_worker, self.pin_cpus)
+
+        # Everything allocated so far (models included) moves to the permanent generation,
+        # which the workers inherit; the parent thaws its own heap once they're forked
+        gc.collect()
+        gc.freeze()
+        for cpus in self._cpus:
+            process = self._context.Process(
+                target=_worker_main,
+                args=(shared_service, self.load_service, self._jobs, self._results, self._ready,
+                      self.threads_per_worker, cpus, self.max_batch_size),
+                name="inference-worker",
+                daemon=True
+            )
+            process.start()
+            self._processes.append(process)
+        gc.unfreeze()
+
+        self._collector = threading.Thread(target=self._collect, name="inference-pool-results", daemon=True)
+        self._collector.start()
+        logger.info(
+            f"Started inference pool: {self.workers} workers x {self.threads_per_worker} threads, "
+            f"pinned={self._cpus[0] is not None}"
+        )
+
+    def wait_ready(self, timeout: float = READY_TIMEOUT):
+        """Block until every worker has warmed up its models"""
+        deadline = time.monotonic() + timeout
+        waiting = len(self._processes)
+        while waiting:
+            if self._ready.acquire(timeout=LIVENESS_INTERVAL):
+                waiting -= 1
+                continue
+            if self._broken is not None:
+                raise self._broken
+            if time.monotonic() > deadline:
+                raise TimeoutError("Inference workers did not warm up in time")
+
+    def submit(self, kind: str, payload) -> Future:
+        future: Future = Future()
+        if self._broken is not None:
+            future.set_exception(self._broken)
+            return future
+        job_id = next(self._ids)
+        self._futures[job_id] = future
+        self._jobs.put((job_id, kind, payload))
+        # The collector may have failed the pending jobs between the check above and the registration
+        broken = self._broken
+        if broken is not None and self._futures.pop(job_id, None) is not None:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(broken)
+        return future
+
+    def running(self) -> bool:
+        return bool(self._processes)
+
+    def analyze_sentiment(self, text: str) -> Future:
+        cached = self.service.cached(text)
+        if cached is not None:
+            future: Future = Future()
+            future.set_result(cached)
+            return future
+
+        def store(job: Future):
+            if not job.cancelled() and job.exception() is None:
+                self.service.store([text], [job.result()])
+
+        future = self.submit(JOB_TEXT, text)
+        future.add_done_callback(store)
+        return future
+
+    def analyze_batch(self, texts: List[str]) -> Future:
+        """Cache lookups here, the misses spread over the workers in model-sized chunks"""
+        results = [self.service.cached(text) for text in texts]
+        missing = [i for i, result in enumerate(results) if result is None]
+        missing_texts = [texts[i] for i in missing]
+
+        def fill(computed: List[Dict]) -> List[Dict]:
+            self.service.store(missing_texts, computed)
+            for i, result in zip(missing, computed):
+                results[i] = result
+            return results
+
+        return self._run_chunked(JOB_BATCH, missing_texts, fill)
+
+    def analyze_emotions(self, texts: List[str]) -> Future:
+        return self._run_chunked(JOB_EMOTIONS, [text[:512] for text in texts], lambda emotions: emotions)
+
+    def _run_chunked(self, kind: str, texts: List[str], finish: Callable[[List], List]) -> Future:
+        future: Future = Future()
+        chunks = [self.submit(kind, texts[i:i + self.max_batch_size]) for i in range(0, len(texts), self.max_batch_size)]
+        remaining = [len(chunks)]
+        lock = threading.Lock()
+
+        def on_chunk(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] or future.done():
+                    return
+            if any(chunk.cancelled() for chunk in chunks):
+                future.set_exception(RuntimeError("Inference pool shut down"))
+                return
+            errors = [chunk.exception() for chunk in chunks if chunk.exception() is not None]
+            if errors:
+                future.set_exception(errors[0])
+                return
+            future.set_result(finish([output for chunk in chunks for output in chunk.result()]))
+
+        if not chunks:
+            future.set_result(finish([]))
+        for chunk in chunks:
+            chunk.add_done_callback(on_chunk)
+        return future
+
+    def pending(self) -> int:
+        """Jobs sent to the workers and not answered yet"""
+        return len(self._futures)
+
+    def _collect(self):
+        last_check = time.monotonic()
+        while True:
+            try:
+                message = self._results.get(timeout=LIVENESS_INTERVAL)
+            except queue.Empty:
+                message = None
+            if message is _STOP and self._closing:  # the shutdown sentinel, or idle while closing
+                return
+
+            if message is not None:
+                size, seconds, replies = message
+                self.counts["batches"] += 1
+                self.counts["texts"] += size
+                INFERENCE_BATCH_SIZE.observe(size)
+                observe_stage("pool_worker_batch", seconds)
+                for job_id, ok, value in replies:
+                    future = self._futures.pop(job_id, None)
+                    if future is None or not future.set_running_or_notify_cancel():
+                        continue
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(value)
+
+            if time.monotonic() - last_check >= LIVENESS_INTERVAL:
+                last_check = time.monotonic()
+                dead = [process for process in self._processes if not process.is_alive()]
+                if dead and not self._closing:
+                    # Like ProcessPoolExecutor: which jobs the dead worker held is unknown, fail them all
+                    self._broken = BrokenProcessPool(
+                        f"Inference worker {dead[0].pid} exited with code {dead[0].exitcode}"
+                    )
+                    logger.error(str(self._broken))
+                    for job_id in list(self._futures):
+                        future = self._futures.pop(job_id, None)
+                        if future is not None and future.set_running_or_notify_cancel():
+                            future.set_exception(self._broken)
+                    return
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers (after their current batch if waiting) and cancel whatever is still queued"""
+        if not self._processes:
+            return
+        self._closing = True
+        for _ in self._processes:
+            self._jobs.put(_STOP)
+        if wait and self._broken is None:
+            for process in self._processes:
+                process.join(timeout=5.0)
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+        # Unread jobs may fill the pipe; don't let exit block on flushing them
+        self._jobs.cancel_join_thread()
+        self._results.put(_STOP)
+        self._results.cancel_join_thread()
+        for future in list(self._futures.values()):
+            future.cancel()
+        self._futures.clear()
+        self._processes = []
+
+    def stats(self) -> Dict:
+        return {
+            "workers": [
+                {"pid": process.pid, "alive": process.is_alive(), "cpus": cpus, **_memory_mb(process.pid)}
+                for process, cpus in zip(self._processes, self._cpus)
+            ],
+            "parent": {"pid": os.getpid(), **_memory_mb(os.getpid())},
+            "threads_per_worker": self.threads_per_worker,
+            "pending": self.pending(),
+            "broken": self._broken is not None,
+            **self.counts,
+        }
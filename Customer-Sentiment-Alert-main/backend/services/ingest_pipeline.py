@@ -0,0 +1,311 @@
+"""
+Staged ingestion pipeline
+source -> dedupe -> inference -> alerts -> persist -> broadcast, joined by bounded
+queues. Each stage runs its own worker tasks and takes items in batches, so a slow
+stage only fills its own input queue; once that is full the stage before it blocks
+on put, and the pressure carries back to the source. Memory stays bounded by the
+queue sizes however fast mentions arrive.
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import select
+
+from models.database import SentimentRecord, Alert
+from services.metrics import observe_stage
+from services.nlp_service import generate_response_suggestion
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PipelineItem:
+    mention: Dict
+    sentiment: Optional[Dict] = None
+    record: Optional[SentimentRecord] = None
+    alert: Optional[Alert] = None
+
+
+# Takes a batch, returns the items to hand to the next stage (possibly fewer)
+StageHandler = Callable[[List[PipelineItem]], Awaitable[List[PipelineItem]]]
+# Called with the batch a handler raised on, to undo whatever earlier stages did for it
+FailureHandler = Callable[[List[PipelineItem]], None]
+
+
+class Stage:
+    def __init__(
+        self,
+        name: str,
+        handler: StageHandler,
+        concurrency: int = 1,
+        batch_size: int = 1,
+        max_wait_ms: float = 0.0,
+        queue_size: int = 1000,
+        on_failure: Optional[FailureHandler] = None,
+    ):
+        self.name = name
+        self.handler = handler
+        self.on_failure = on_failure
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.next: Optional["Stage"] = None
+        self.counts = {"in": 0, "out": 0, "failed": 0, "batches": 0}
+        self.busy_seconds = 0.0
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+    async def _take_batch(self) -> List[PipelineItem]:
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _work(self):
+        while True:
+            batch = await self._take_batch()
+            self.counts["in"] += len(batch)
+            self.counts["batches"] += 1
+            start = time.perf_counter()
+            try:
+                outputs = await self.handler(batch)
+            except Exception as e:
+                logger.error(f"Ingest stage {self.name} failed on {len(batch)} items: {e}")
+                self.counts["failed"] += len(batch)
+                if self.on_failure is not None:
+                    self.on_failure(batch)
+                outputs = []
+            elapsed = time.perf_counter() - start
+            self.busy_seconds += elapsed
+            observe_stage(f"pipeline_{self.name}", elapsed)
+
+            self.counts["out"] += len(outputs)
+            if self.next is not None:
+                for item in outputs:
+                    await self.next.queue.put(item)  # blocks while the next stage is backed up
+            # Marked done only after forwarding, so draining stage by stage loses nothing
+            for _ in batch:
+                self.queue.task_done()
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "concurrency": self.concurrency,
+            "batch_size": self.batch_size,
+            **self.counts,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+class IngestPipeline:
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+        for stage, following in zip(stages, stages[1:]):
+            stage.next = following
+        self.started_at: Optional[float] = None
+        self._sources: List[asyncio.Task] = []
+
+    def start(self):
+        self.started_at = time.monotonic()
+        for stage in self.stages:
+            stage.start()
+
+    async def submit(self, mention: Dict):
+        """Queue one mention, waiting while the pipeline is full"""
+        await self.stages[0].queue.put(PipelineItem(mention))
+
+    def add_source(self, source: AsyncIterator[Dict]) -> asyncio.Task:
+        """Feed mentions from an async iterator until it ends or the pipeline closes"""
+        async def pump():
+            async for mention in source:
+                await self.submit(mention)
+
+        task = asyncio.create_task(pump())
+        self._sources.append(task)
+        return task
+
+    async def close(self, drain_timeout: float = 10.0):
+        """Stop the sources, let queued items flow through (up to the timeout), then stop the stages"""
+        for task in self._sources:
+            task.cancel()
+        self._sources = []
+
+        async def drain():
+            for stage in self.stages:
+                await stage.queue.join()
+
+        try:
+            await asyncio.wait_for(drain(), drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Ingest pipeline closed with items still queued: {self.queued()}")
+        for stage in self.stages:
+            stage.stop()
+
+    def queued(self) -> int:
+        return sum(stage.queue.qsize() for stage in self.stages)
+
+    def stats(self) -> Dict:
+        uptime = time.monotonic() - self.started_at if self.started_at else 0.0
+        stages = {stage.name: stage.stats() for stage in self.stages}
+        for stage in stages.values():
+            stage["items_per_second"] = round(stage["out"] / uptime, 2) if uptime else 0.0
+        return {"uptime_seconds": round(uptime, 1), "stages": stages}
+
+
+class IngestStages:
+    """Stage handlers for mention ingestion, wired to the app's services"""
+
+    def __init__(self, session_factory, inference, write_behind, alert_service, dedupe_index, on_persisted):
+        self.session_factory = session_factory
+        self.inference = inference
+        self.write_behind = write_behind
+        self.alert_service = alert_service
+        self.dedupe_index = dedupe_index
+        self.on_persisted = on_persisted  # async (items) -> None: index and broadcast
+
+    async def dedupe(self, items: List[PipelineItem]) -> List[PipelineItem]:
+        """
+        Recent IDs and ones the index knows are new skip the database; only IDs its
+        Bloom filters can't rule out are looked up, in one query per batch
+        """
+        unknown = set()
+        fresh = []
+        for item in items:
+            source_id = item.mention['source_id']
+            seen = self.dedupe_index.seen(source_id)
+            if seen:
+                continue
+            if seen is None:
+                unknown.add(source_id)
+            # Claimed right away so repeats later in this batch, or still in flight, are dropped
+            self.dedupe_index.add(source_id)
+            fresh.append(item)
+
+        if unknown:
+            try:
+                async with self.session_factory() as db:
+                    existing = set((await db.execute(
+                        select(SentimentRecord.source_id).where(SentimentRecord.source_id.in_(unknown))
+                    )).scalars())
+            except Exception:
+                self.release(fresh)
+                raise
+            fresh = [item for item in fresh if item.mention['source_id'] not in existing]
+        return fresh
+
+    def release(self, items: List[PipelineItem]):
+        """
+        Undo what earlier stages did for items that failed before being stored: drop the dedupe
+        claims, so a redelivery isn't skipped, and the alert window samples, so it isn't counted twice
+        """
+        for item in items:
+            self.dedupe_index.discard(item.mention['source_id'])
+            if item.record is not None:
+                self.alert_service.forget(item.record.source, item.record.sentiment_score, item.record.processed_at)
+
+    async def infer(self, items: List[PipelineItem]) -> List[PipelineItem]:
+        sentiments = await self.inference.analyze_batch([item.mention['text'] for item in items])
+        for item, sentiment in zip(items, sentiments):
+            item.sentiment = sentiment
+        return items
+
+    async def evaluate_alerts(self, items: List[PipelineItem]) -> List[PipelineItem]:
+        """
+        Runs before persist so each record and its alert commit in the same transaction.
+        Windows are order-sensitive, so this stage should keep a concurrency of 1.
+        """
+        for item in items:
+            mention, sentiment = item.mention, item.sentiment
+            item.record = SentimentRecord(
+                source=mention['source'],
+                source_id=mention['source_id'],
+                text=mention['text'],
+                sentiment_score=sentiment['score'],
+                sentiment_label=sentiment['label'],
+                confidence=sentiment['confidence'],
+                emotions=json.dumps(sentiment['emotions']),
+                author=mention['author'],
+                created_at=mention['created_at'],
+                processed_at=datetime.utcnow()
+            )
+            self.alert_service.observe(item.record.source, item.record.sentiment_score, item.record.processed_at)
+            should_alert, severity = self.alert_service.evaluate(mention['source'], sentiment['score'])
+            if should_alert:
+                alert_msg = self.alert_service.create_alert_message(
+                    severity, mention['text'], mention['source'], mention['author'], sentiment['score']
+                )
+                item.alert = Alert(
+                    severity=severity,
+                    title=alert_msg['title'],
+                    message=alert_msg['message'],
+                    suggested_response=generate_response_suggestion(mention['text'], sentiment['score'])
+                )
+        return items
+
+    async def persist(self, items: List[PipelineItem]) -> List[PipelineItem]:
+        """Hand the whole batch to the write-behind queue at once so it commits as one transaction"""
+        results = await asyncio.gather(
+            *[self.write_behind.add(item.record, item.alert) for item in items], return_exceptions=True
+        )
+        stored = []
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                self.release([item])
+                logger.error(f"Failed to persist {item.mention['source_id']}: {result}")
+                continue
+            stored.append(item)
+        return stored
+
+    async def broadcast(self, items: List[PipelineItem]) -> List[PipelineItem]:
+        await self.on_persisted(items)
+        return items
+
+
+def build_ingest_pipeline(
+    session_factory,
+    inference,
+    write_behind,
+    alert_service,
+    dedupe_index,
+    on_persisted: Callable[[List[PipelineItem]], Awaitable[None]],
+    queue_size: int = 1000,
+    batch_size: int = 32,
+    max_wait_ms: float = 20.0,
+    inference_concurrency: int = 2,
+    persist_concurrency: int = 2,
+) -> IngestPipeline:
+    stages = IngestStages(session_factory, inference, write_behind, alert_service, dedupe_index, on_persisted)
+    return IngestPipeline([
+        Stage("dedupe", stages.dedupe, batch_size=batch_size, max_wait_ms=max_wait_ms, queue_size=queue_size),
+        Stage("inference", stages.infer, concurrency=inference_concurrency, batch_size=batch_size,
+              max_wait_ms=max_wait_ms, queue_size=queue_size, on_failure=stages.release),
+        Stage("alerts", stages.evaluate_alerts, batch_size=batch_size, queue_size=queue_size,
+              on_failure=stages.release),
+        Stage("persist", stages.persist, concurrency=persist_concurrency, batch_size=batch_size,
+              max_wait_ms=max_wait_ms, queue_size=queue_size),
+        Stage("broadcast", stages.broadcast, batch_size=batch_size, queue_size=queue_size),
+    ])
@@ -0,0 +1,60 @@
+"""
+Event loop responsiveness monitor
+Measures how late a periodic timer fires to estimate scheduling lag on the loop
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    def __init__(self, interval_ms: float = 100.0, max_samples: int = 3000):
+        self.interval = interval_ms / 1000.0
+        self.samples: deque = deque(maxlen=max_samples)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - expected)
+            self.samples.append(lag * 1000.0)
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> Dict:
+        """Loop lag in milliseconds over the retained sample window"""
+        return {
+            "samples": len(self.samples),
+            "p50_ms": round(self.percentile(50), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(max(self.samples), 3) if self.samples else 0.0,
+        }
+
+
+# Singleton instance
+_loop_monitor = None
+
+def get_loop_monitor() -> LoopLagMonitor:
+    global _loop_monitor
+    if _loop_monitor is None:
+        _loop_monitor = LoopLagMonitor()
+    return _loop_monitor
@@ -1,24 +1,42 @@
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-from textblob import TextBlob
-import torch
-from typing import Dict, Tuple
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
 import logging
+import threading
+
+from config import settings
+from services.batch_scheduler import BatchScheduler
+from services.inference_backends import InferenceBackend, create_backend
+from services.metrics import INFERENCE_BATCH_SIZE, stage_timer
+from services.result_cache import SentimentCache, get_result_cache
 
 logger = logging.getLogger(__name__)
 
+WARMUP_TEXTS = [
+    "Customer support was amazing! They resolved my issue in minutes.",
+    "The app keeps crashing and support is ignoring my emails.",
+]
+
 
 class NLPService:
-    def __init__(self):
-        self.device = 0 if torch.cuda.is_available() else -1
-        logger.info(f"Initializing NLP models on device: {'GPU' if self.device == 0 else 'CPU'}")
+    def __init__(self, backend: Optional[InferenceBackend] = None, cache: Optional[SentimentCache] = None):
+        self.backend = backend or create_backend(settings.inference_backend, settings.model_export_dir)
+        self.cache = cache or get_result_cache()
+        
+        # Cascade: run the emotion model only where emotions matter (negative or uncertain results)
+        self.emotion_cascade = settings.emotion_cascade
+        self.cascade_max_score = settings.emotion_cascade_max_score
+        self.cascade_min_confidence = settings.emotion_cascade_min_confidence
+        # Cascade results may lack emotions, so they are cached apart from full ones
+        self.cache_version = f"{self.backend.version}:cascade" if self.emotion_cascade else self.backend.version
+        
+        # Deferred so importing this module stays cheap
+        from textblob import TextBlob
+        self._textblob = TextBlob
+        logger.info(f"Using {self.backend.name} inference backend")
         
         # Primary sentiment model (fast and accurate)
         try:
-            self.sentiment_analyzer = pipeline(
-                "sentiment-analysis",
-                model="distilbert-base-uncased-finetuned-sst-2-english",
-                device=self.device
-            )
+            self.sentiment_analyzer = self.backend.load_sentiment_model()
             logger.info("Loaded DistilBERT sentiment model")
         except Exception as e:
             logger.warning(f"Failed to load transformer model: {e}. Falling back to TextBlob only.")
@@ -26,20 +44,23 @@ class NLPService:
         
         # Emotion detection model
         try:
-            self.emotion_analyzer = pipeline(
-                "text-classification",
-                model="j-hartmann/emotion-english-distilroberta-base",
-                device=self.device,
-                top_k=None
-            )
+            self.emotion_analyzer = self.backend.load_emotion_model()
             logger.info("Loaded emotion detection model")
         except Exception as e:
             logger.warning(f"Failed to load emotion model: {e}")
             self.emotion_analyzer = None
+        
+        # Shared micro-batching scheduler in front of both models
+        self.batch_scheduler = BatchScheduler(
+            self._analyze_and_cache,
+            max_batch_size=settings.inference_max_batch_size,
+            max_wait_ms=settings.inference_max_wait_ms
+        )
     
     def analyze_sentiment(self, text: str) -> Dict:
         """
         Analyze sentiment of text using multiple methods
+        Concurrent callers are grouped into micro-batches by the scheduler
         Returns: {
             'score': float (-1 to 1),
             'label': str (positive/negative/neutral),
@@ -47,44 +68,123 @@ class NLPService:
             'emotions': dict
         }
         """
+        return self.submit(text).result()
+    
+    def analyze_batch(self, texts: List[str]) -> List[Dict]:
+        """Analyze a list of texts, running each model once on the cache misses"""
+        results: List[Optional[Dict]] = [
+            self.cache.get(text, self.cache_version) if text and text.strip() else None
+            for text in texts
+        ]
+        missing = [i for i, result in enumerate(results) if result is None]
+        
+        if missing:
+            computed = self._analyze_and_cache([texts[i] for i in missing])
+            for i, result in zip(missing, computed):
+                results[i] = result
+        
+        return results
+    
+    def cached(self, text: str) -> Optional[Dict]:
+        """The result if no model run is needed (blank or cached text), else None"""
         if not text or len(text.strip()) == 0:
             return self._empty_result()
+        return self.cache.get(text, self.cache_version)
+    
+    def store(self, texts: List[str], results: List[Dict]):
+        """Cache results computed elsewhere, e.g. by the forked inference pool"""
+        for text, result in zip(texts, results):
+            if text and text.strip():
+                self.cache.set(text, self.cache_version, result)
+    
+    def _analyze_and_cache(self, texts: List[str]) -> List[Dict]:
+        results = self.analyze_uncached(texts)
+        self.store(texts, results)
+        return results
+    
+    def analyze_uncached(self, texts: List[str]) -> List[Dict]:
+        """Run each model once on the whole batch"""
+        results: List[Optional[Dict]] = [None] * len(texts)
+        
+        # Truncate very long texts, skip empty ones
+        indexed = [(i, text[:512]) for i, text in enumerate(texts) if text and text.strip()]
+        batch = [text for _, text in indexed]
+        if batch:
+            INFERENCE_BATCH_SIZE.observe(len(batch))
+        
+        transformer_results = self._analyze_transformer_batch(batch) if batch else []
+        
+        with stage_timer("textblob"):
+            combined = [
+                self._combine_scores(text, transformer_result, {})
+                for text, transformer_result in zip(batch, transformer_results)
+            ]
+        
+        # Emotions for the whole batch, or in cascade mode only for the results that need them
+        needs_emotions = [j for j, result in enumerate(combined) if not self.emotion_cascade or self._needs_emotions(result)]
+        if needs_emotions:
+            emotion_results = self._analyze_emotions_batch([batch[j] for j in needs_emotions])
+            for j, emotions in zip(needs_emotions, emotion_results):
+                combined[j]['emotions'] = emotions
+        
+        for (i, _), result in zip(indexed, combined):
+            results[i] = result
+        
+        return [result if result is not None else self._empty_result() for result in results]
+    
+    def _needs_emotions(self, result: Dict) -> bool:
+        """Alert priority only looks at emotions on negative mentions; uncertain ones might be negative"""
+        return result['score'] <= self.cascade_max_score or result['confidence'] < self.cascade_min_confidence
+    
+    def analyze_emotions(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Emotion model only, e.g. to backfill results the cascade skipped"""
+        return self._analyze_emotions_batch([text[:512] for text in texts])
+    
+    def _analyze_transformer_batch(self, texts: List[str]) -> List[Optional[Tuple[float, float]]]:
+        """Method 1: Transformer model. Returns (score, confidence) per text, None on failure"""
+        if not self.sentiment_analyzer:
+            return [None] * len(texts)
         
-        # Truncate very long texts
-        text = text[:512]
-        
-        # Method 1: Transformer model
-        transformer_score = None
-        transformer_confidence = 0.5
-        
-        if self.sentiment_analyzer:
-            try:
-                result = self.sentiment_analyzer(text)[0]
-                label = result['label'].lower()
-                confidence = result['score']
-                
-                # Convert to -1 to 1 scale
-                if label == 'positive':
-                    transformer_score = confidence
-                elif label == 'negative':
-                    transformer_score = -confidence
-                else:
-                    transformer_score = 0
-                
-                transformer_confidence = confidence
-            except Exception as e:
-                logger.error(f"Transformer analysis failed: {e}")
+        try:
+            with stage_timer("sentiment_model"):
+                outputs = self.sentiment_analyzer(texts)
+        except Exception as e:
+            logger.error(f"Transformer analysis failed: {e}")
+            return [None] * len(texts)
         
+        scores = []
+        for result in outputs:
+            label = result['label'].lower()
+            confidence = result['score']
+            
+            # Convert to -1 to 1 scale
+            if label == 'positive':
+                transformer_score = confidence
+            elif label == 'negative':
+                transformer_score = -confidence
+            else:
+                transformer_score = 0
+            
+            scores.append((transformer_score, confidence))
+        return scores
+    
+    def _combine_scores(
+        self,
+        text: str,
+        transformer_result: Optional[Tuple[float, float]],
+        emotions: Dict[str, float]
+    ) -> Dict:
         # Method 2: TextBlob (backup and validation)
         try:
-            blob = TextBlob(text)
+            blob = self._textblob(text)
             textblob_score = blob.sentiment.polarity  # -1 to 1
         except Exception as e:
             logger.error(f"TextBlob analysis failed: {e}")
             textblob_score = 0
         
         # Combine scores (weighted average)
-        if transformer_score is not None:
+        if transformer_result is not None:
+            transformer_score, transformer_confidence = transformer_result
             final_score = 0.7 * transformer_score + 0.3 * textblob_score
             confidence = transformer_confidence
         else:
@@ -99,9 +199,6 @@ class NLPService:
         else:
             label = "neutral"
         
-        # Emotion analysis
-        emotions = self._analyze_emotions(text)
-        
         return {
             'score': round(final_score, 3),
             'label': label,
@@ -109,18 +206,21 @@ class NLPService:
             'emotions': emotions
         }
     
-    def _analyze_emotions(self, text: str) -> Dict[str, float]:
-        """Detect emotions in text"""
+    def _analyze_emotions_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Detect emotions for each text in one model call"""
         if not self.emotion_analyzer:
-            return {}
+            return [{} for _ in texts]
         
         try:
-            results = self.emotion_analyzer(text[:512])[0]
-            emotions = {item['label']: round(item['score'], 3) for item in results}
-            return emotions
+            with stage_timer("emotion_model"):
+                outputs = self.emotion_analyzer(texts)
+            return [
+                {item['label']: round(item['score'], 3) for item in results}
+                for results in outputs
+            ]
         except Exception as e:
             logger.error(f"Emotion analysis failed: {e}")
-            return {}
+            return [{} for _ in texts]
     
     def _empty_result(self) -> Dict:
         return {
@@ -130,37 +230,64 @@ class NLPService:
             'emotions': {}
         }
     
+    def warm_up(self):
+        """Run a dummy batch through both models so the first real request pays no lazy-init cost"""
+        self.analyze_uncached(WARMUP_TEXTS)
+    
+    def submit(self, text: str) -> Future:
+        """Queue text on the batch scheduler without blocking the caller"""
+        cached = self.cached(text)
+        if cached is not None:
+            future: Future = Future()
+            future.set_result(cached)
+            return future
+        
+        return self.batch_scheduler.submit(text)
+    
     def generate_response_suggestion(self, text: str, sentiment_score: float) -> str:
         """Generate suggested response based on sentiment"""
-        if sentiment_score >= -0.3:
-            return "Thank you for your feedback! We appreciate you taking the time to share your thoughts with us."
-        
-        # Negative sentiment - more empathetic response
-        suggestions = [
-            "We sincerely apologize for your experience. ",
-            "We understand your frustration and we're here to help. ",
-            "Thank you for bringing this to our attention. "
-        ]
-        
-        # Check for specific issues
-        text_lower = text.lower()
-        if any(word in text_lower for word in ['bug', 'error', 'broken', 'not working']):
-            suggestions.append("Our technical team is investigating this issue. We'll keep you updated on the progress.")
-        elif any(word in text_lower for word in ['support', 'help', 'service']):
-            suggestions.append("We'd like to connect you with our support team immediately to resolve this.")
-        elif any(word in text_lower for word in ['refund', 'money', 'charge']):
-            suggestions.append("We're reviewing your account and will process this request as a priority.")
-        else:
-            suggestions.append("We'd love to make this right. Could you please DM us with more details?")
-        
-        return "".join(suggestions)
+        return generate_response_suggestion(text, sentiment_score)
+
+
+def generate_response_suggestion(text: str, sentiment_score: float) -> str:
+    """Generate suggested response based on sentiment. Needs no models, safe to call on the event loop"""
+    if sentiment_score >= -0.3:
+        return "Thank you for your feedback! We appreciate you taking the time to share your thoughts with us."
+
+    # Negative sentiment - more empathetic response
+    suggestions = [
+        "We sincerely apologize for your experience. ",
+        "We understand your frustration and we're here to help. ",
+        "Thank you for bringing this to our attention. "
+    ]
+
+    # Check for specific issues
+    text_lower = text.lower()
+    if any(word in text_lower for word in ['bug', 'error', 'broken', 'not working']):
+        suggestions.append("Our technical team is investigating this issue. We'll keep you updated on the progress.")
+    elif any(word in text_lower for word in ['support', 'help', 'service']):
+        suggestions.append("We'd like to connect you with our support team immediately to resolve this.")
+    elif any(word in text_lower for word in ['refund', 'money', 'charge']):
+        suggestions.append("We're reviewing your account and will process this request as a priority.")
+    else:
+        suggestions.append("We'd love to make this right. Could you please DM us with more details?")
+
+    return "".join(suggestions)
 
 
 # Singleton instance
 _nlp_service = None
+_nlp_service_lock = threading.Lock()
 
 def get_nlp_service() -> NLPService:
     global _nlp_service
     if _nlp_service is None:
-        _nlp_service = NLPService()
+        # Executor threads may race to load the models on first use
+        with _nlp_service_lock:
+            if _nlp_service is None:
+                _nlp_service = NLPService()
+    return _nlp_service
+
+def peek_nlp_service() -> Optional[NLPService]:
+    """The service if this process already loaded it, without triggering a model load"""
     return _nlp_service
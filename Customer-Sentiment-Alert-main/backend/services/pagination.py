@@ -0,0 +1,72 @@
+"""
+Keyset (cursor) pagination on (created_at, id)
+Cursors are opaque URL-safe tokens; each page seeks straight to its position
+through the composite indexes instead of skipping rows with OFFSET
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 1000  # upper bound for the limit parameter of paginated endpoints
+
+
+def encode_token(values: list) -> str:
+    payload = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_token(token: str) -> list:
+    """Raises ValueError for anything that isn't a token we issued"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def encode_cursor(created_at: datetime, record_id: int) -> str:
+    return encode_token([created_at.isoformat(), record_id])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError for anything that isn't a cursor we issued"""
+    try:
+        created_at, record_id = decode_token(cursor)
+        return datetime.fromisoformat(created_at), int(record_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _page_statement(statement, model, limit: int, cursor: Optional[str]):
+    if cursor:
+        created_at, record_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(model.created_at, model.id) < tuple_(created_at, record_id))
+
+    # Fetch one extra row to know whether another page exists
+    return statement.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+
+def _split_page(rows, limit: int):
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    if not rows:
+        return rows, None
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
+
+
+async def paginate(db, statement, model, limit: int, cursor: Optional[str] = None):
+    """
+    Newest-first page of `limit` rows after `cursor` for a SELECT of columns,
+    which must include created_at and id. Returns (rows, next_cursor).
+    """
+    rows = (await db.execute(_page_statement(statement, model, limit, cursor))).all()
+    return _split_page(rows, limit)
@@ -0,0 +1,36 @@
+"""
+Custom response classes
+"""
+from typing import Any
+
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from services.serialization import dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available (the app's default response class)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """Body that is already encoded JSON, e.g. from services.serialization.RowEncoder"""
+    media_type = "application/json"
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Streams newline-delimited JSON while the request body is still being read
+    The stock StreamingResponse listens on receive() for disconnects, which would
+    swallow request body chunks the generator needs; here the body generator is
+    the only reader and sees disconnects through request.stream() instead
+    """
+    media_type = "application/x-ndjson"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,196 @@
+"""
+Content-addressed cache for sentiment results
+Keyed by a hash of the normalized text and the model version, with LRU + TTL eviction
+and an optional SQLite tier that survives restarts
+"""
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse the differences retweets and copy-paste introduce without changing meaning"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def cache_key(text: str, model_version: str) -> str:
+    payload = f"{model_version}\x00{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _copy_result(result: Dict) -> Dict:
+    # Callers get their own emotions dict so they can't mutate the cached entry
+    return {**result, 'emotions': dict(result.get('emotions') or {})}
+
+
+class _DiskTier:
+    """SQLite-backed second tier, pruned to a maximum number of rows"""
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment_cache ("
+            "key TEXT PRIMARY KEY, result TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_sentiment_cache_stored_at ON sentiment_cache (stored_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[float, Dict]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, stored_at FROM sentiment_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        result, stored_at = row
+        if time.time() - stored_at > self.ttl:
+            return None
+        return stored_at, json.loads(result)
+
+    def set(self, key: str, result: Dict, stored_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sentiment_cache (key, result, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(result), stored_at)
+            )
+            self._conn.commit()
+            self._writes += 1
+            # Prune expired and overflow rows every so often rather than on each write
+            if self._writes % 1000 == 0:
+                self._prune()
+
+    def _prune(self):
+        self._conn.execute("DELETE FROM sentiment_cache WHERE stored_at < ?", (time.time() - self.ttl,))
+        self._conn.execute(
+            "DELETE FROM sentiment_cache WHERE key IN ("
+            "SELECT key FROM sentiment_cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SentimentCache:
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl_seconds: float = 86400,
+        disk_path: Optional[str] = None,
+        disk_max_entries: int = 1000000,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = _DiskTier(disk_path, disk_max_entries, ttl_seconds) if disk_path else None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, text: str, model_version: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        key = cache_key(text, model_version)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, result = entry
+                if now - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _copy_result(result)
+                del self._entries[key]
+                self.expirations += 1
+
+        if self._disk is not None:
+            entry = self._disk.get(key)
+            if entry is not None:
+                with self._lock:
+                    self._insert(key, entry)
+                    self.disk_hits += 1
+                return _copy_result(entry[1])
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, text: str, model_version: str, result: Dict):
+        if not self.enabled:
+            return
+        key = cache_key(text, model_version)
+        entry = (time.time(), _copy_result(result))
+        with self._lock:
+            self._insert(key, entry)
+        if self._disk is not None:
+            self._disk.set(key, entry[1], entry[0])
+
+    def _insert(self, key: str, entry: Tuple[float, Dict]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "disk_enabled": self._disk is not None,
+            }
+
+
+# Singleton instance
+_result_cache = None
+
+def get_result_cache() -> SentimentCache:
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = SentimentCache(
+            max_entries=settings.result_cache_size,
+            ttl_seconds=settings.result_cache_ttl_seconds,
+            disk_path=settings.result_cache_path,
+        )
+    return _result_cache
@@ -0,0 +1,142 @@
+"""
+Full-text search over mention text
+SQLite matches through the FTS5 table and ranks by bm25; PostgreSQL uses the
+GIN tsvector index and ts_rank. Pages are keyset-paginated on (rank, id),
+or on id alone for newest-ingested-first, which the index can walk in order
+and stop after one page
+"""
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, literal, literal_column, select, table, column, tuple_
+
+from models.database import FTS_TABLE, SentimentRecord
+from services.pagination import decode_token, encode_token
+
+SEARCH_SORTS = ("relevance", "recent")
+
+_QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+
+_fts = table(FTS_TABLE, column("rowid"))
+_fts_match = literal_column(FTS_TABLE)
+
+
+def to_fts5_query(query: str) -> str:
+    """
+    Turn user input into an FTS5 expression that cannot be a syntax error:
+    every word and "quoted phrase" becomes a quoted string (all must match),
+    and a trailing * on a word makes it a prefix search
+    """
+    parts = []
+    for phrase, word in _QUERY_TOKEN.findall(query):
+        if phrase:
+            words = phrase.split()
+            if words:
+                parts.append('"' + " ".join(words).replace('"', '""') + '"')
+            continue
+        prefix = word.endswith("*")
+        word = word.rstrip("*")
+        if not word:
+            continue
+        parts.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    if not parts:
+        raise ValueError("Search query is empty")
+    return " ".join(parts)
+
+
+def _match_and_rank(dialect: str, query: str):
+    """
+    (statement joined to the index, match clause, rank expression, highlight expression, id column)
+    Lower rank is better; the id column is the one the index can scan in order
+    """
+    if dialect == "postgresql":
+        # Inline constants so the expression matches ix_sentiment_records_text_tsv
+        config = literal_column("'english'")
+        document = func.to_tsvector(config, func.coalesce(SentimentRecord.text, literal_column("''")))
+        tsquery = func.websearch_to_tsquery(config, query)
+        statement = select(SentimentRecord)
+        rank = -func.ts_rank(document, tsquery)
+        highlight = func.ts_headline(
+            config, SentimentRecord.text, tsquery,
+            "StartSel=<mark>,StopSel=</mark>,MaxWords=24,MinWords=8"
+        )
+        return statement, document.op("@@")(tsquery), rank, highlight, SentimentRecord.id
+
+    statement = select(SentimentRecord).join(_fts, _fts.c.rowid == SentimentRecord.id)
+    match = _fts_match.op("MATCH")(to_fts5_query(query))
+    rank = func.bm25(_fts_match)
+    highlight = func.snippet(_fts_match, 0, "<mark>", "</mark>", "…", 16)
+    return statement, match, rank, highlight, _fts.c.rowid
+
+
+async def search_records(
+    db,
+    query: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    sort: str = "relevance",
+    source: Optional[str] = None,
+    label: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Matching records as dicts with "rank" and "highlight" added. Returns (results, next_cursor).
+    Raises ValueError for an empty query, unknown sort or bad cursor
+    """
+    if sort not in SEARCH_SORTS:
+        raise ValueError(f"Unknown sort '{sort}', expected one of {list(SEARCH_SORTS)}")
+    if not query or not query.strip():
+        raise ValueError("Search query is empty")
+
+    statement, match, rank, highlight, row_id = _match_and_rank(db.bind.dialect.name, query)
+    statement = statement.add_columns(rank.label("rank"), highlight.label("highlight")).where(match)
+
+    if source:
+        statement = statement.where(SentimentRecord.source == source)
+    if label:
+        statement = statement.where(SentimentRecord.sentiment_label == label)
+    if since is not None:
+        statement = statement.where(SentimentRecord.created_at >= since)
+    if until is not None:
+        statement = statement.where(SentimentRecord.created_at < until)
+
+    # Relevance ties break on id, so (rank, id) of the last row is a stable cursor
+    if sort == "relevance":
+        order = (rank, row_id)
+    else:
+        order = (row_id.desc(),)
+
+    if cursor:
+        values = decode_token(cursor)
+        try:
+            if values[0] != sort:
+                raise ValueError
+            if sort == "relevance":
+                _, last_rank, last_id = values
+                statement = statement.where(tuple_(rank, row_id) > tuple_(literal(float(last_rank)), int(last_id)))
+            else:
+                _, last_id = values
+                statement = statement.where(row_id < int(last_id))
+        except (IndexError, TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+
+    rows = (await db.execute(statement.order_by(*order).limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if rows:
+            record, last_rank, _ = rows[-1]
+            if sort == "relevance":
+                next_cursor = encode_token([sort, last_rank, record.id])
+            else:
+                next_cursor = encode_token([sort, record.id])
+
+    results = []
+    for record, row_rank, row_highlight in rows:
+        item = record.to_dict()
+        item["rank"] = row_rank
+        item["highlight"] = row_highlight
+        results.append(item)
+    return results, next_cursor
@@ -0,0 +1,76 @@
+"""
+Fast row serialization for list endpoints
+Rows are selected as plain column tuples (no ORM hydration), encoded with orjson
+when it is installed, and JSON stored in text columns (emotions) is spliced into
+the output as-is instead of being parsed and re-encoded
+"""
+import json
+from datetime import datetime
+from typing import Iterable, List, Sequence
+
+from sqlalchemy import Boolean, type_coerce
+
+from models.database import SentimentRecord, Alert
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder produces the same output, slower
+    orjson = None
+
+# Text columns that already hold JSON, with what to emit when they are empty
+RAW_JSON_COLUMNS = {"emotions": b"{}"}
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def list_columns(model) -> List:
+    """Columns for a fast-path SELECT, typed so rows match model.to_dict()"""
+    columns = []
+    for column in model.__table__.columns:
+        if model is Alert and column.key == "is_resolved":
+            column = type_coerce(column, Boolean).label("is_resolved")
+        columns.append(column)
+    return columns
+
+
+RECORD_COLUMNS = list_columns(SentimentRecord)
+ALERT_COLUMNS = list_columns(Alert)
+
+
+class RowEncoder:
+    """Encodes rows of a fixed column list to JSON objects, splicing raw JSON columns in"""
+
+    def __init__(self, names: Sequence[str]):
+        self.names = list(names)
+        self.raw = [(i, f',"{name}":'.encode("ascii"), RAW_JSON_COLUMNS[name])
+                    for i, name in enumerate(self.names) if name in RAW_JSON_COLUMNS]
+        raw_indexes = {i for i, _, _ in self.raw}
+        self.plain = [(i, name) for i, name in enumerate(self.names) if i not in raw_indexes]
+
+    def encode(self, row: Sequence) -> bytes:
+        body = dumps({name: row[i] for i, name in self.plain})
+        if not self.raw:
+            return body
+        parts = [body[:-1]]
+        for i, prefix, empty in self.raw:
+            value = row[i]
+            parts.append(prefix)
+            parts.append(value.encode("utf-8") if value else empty)
+        parts.append(b"}")
+        return b"".join(parts)
+
+    def encode_array(self, rows: Iterable[Sequence]) -> bytes:
+        return b"[" + b",".join(self.encode(row) for row in rows) + b"]"
+
+    def encode_lines(self, rows: Iterable[Sequence]) -> bytes:
+        return b"".join(self.encode(row) + b"\n" for row in rows)
@@ -0,0 +1,54 @@
+"""
+Startup phase tracking and readiness
+Records how long each startup phase takes and flips to ready once warm-up finishes
+"""
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTracker:
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: Dict[str, Dict] = {}
+        self.error: Optional[str] = None
+        self._ready = asyncio.Event()
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a startup phase and record whether it finished"""
+        self.phases[name] = {"status": "running", "seconds": None}
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.phases[name] = {"status": "failed", "seconds": round(time.perf_counter() - start, 3)}
+            self.error = f"{name}: {e}"
+            raise
+        self.phases[name] = {"status": "done", "seconds": round(time.perf_counter() - start, 3)}
+        logger.info(f"Startup phase '{name}' took {self.phases[name]['seconds']:.3f}s")
+
+    def mark_ready(self):
+        total = time.perf_counter() - self.started_at
+        breakdown = ", ".join(f"{name}={phase['seconds']:.3f}s" for name, phase in self.phases.items())
+        logger.info(f"SentiGuard ready after {total:.3f}s ({breakdown})")
+        self._ready.set()
+
+    async def wait_ready(self):
+        await self._ready.wait()
+
+    def snapshot(self) -> Dict:
+        return {
+            "ready": self.is_ready,
+            "uptime_seconds": round(time.perf_counter() - self.started_at, 3),
+            "phases": self.phases,
+            "error": self.error,
+        }
@@ -0,0 +1,139 @@
+"""
+Incrementally maintained sentiment statistics
+Label counts, score sums and per-source counts are kept in per-minute buckets,
+updated on every insert, so any hours window is answered without scanning rows
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Literal, Optional, Tuple, get_args
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+SentimentLabel = Literal["positive", "negative", "neutral"]
+LABELS = get_args(SentimentLabel)
+
+
+def _minute(ts: datetime) -> int:
+    return int(ts.timestamp() // 60) if ts.tzinfo else int((ts - datetime(1970, 1, 1)).total_seconds() // 60)
+
+
+class _Bucket:
+    __slots__ = ("total", "score_sum", "labels", "sources")
+
+    def __init__(self):
+        self.total = 0
+        self.score_sum = 0.0
+        self.labels: Dict[str, int] = {}
+        self.sources: Dict[str, list] = {}  # source -> [count, score_sum]
+
+
+class StatsAggregator:
+    def __init__(self, retention_hours: int = 168):
+        self.retention_hours = retention_hours
+        self._buckets: Dict[int, _Bucket] = {}
+        self._lock = threading.Lock()
+        self._oldest_allowed = 0
+        self._last_prune = None
+
+    def add(self, created_at: datetime, source: str, label: str, score: float):
+        minute = _minute(created_at)
+        with self._lock:
+            if minute < self._oldest_allowed:
+                return
+            bucket = self._buckets.get(minute)
+            if bucket is None:
+                bucket = self._buckets[minute] = _Bucket()
+                self._prune()
+            bucket.total += 1
+            bucket.score_sum += score
+            bucket.labels[label] = bucket.labels.get(label, 0) + 1
+            per_source = bucket.sources.setdefault(source, [0, 0.0])
+            per_source[0] += 1
+            per_source[1] += score
+
+    def add_record(self, record: Dict):
+        """Update from a record dict as produced by SentimentRecord.to_dict()"""
+        created_at = record.get("created_at")
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        self.add(created_at or datetime.utcnow(), record["source"], record["sentiment_label"], record["sentiment_score"])
+
+    def rebuild(self, rows: Iterable[Tuple[datetime, str, str, float]]):
+        """Replace all buckets from (created_at, source, label, score) rows"""
+        with self._lock:
+            self._buckets = {}
+            self._oldest_allowed = 0
+            self._last_prune = None
+        count = 0
+        for created_at, source, label, score in rows:
+            self.add(created_at, source, label, score or 0.0)
+            count += 1
+        logger.info(f"Rebuilt sentiment stats from {count} records into {len(self._buckets)} buckets")
+
+    def covers(self, hours: float) -> bool:
+        return 0 < hours <= self.retention_hours
+
+    def stats(self, hours: float, now: Optional[datetime] = None) -> Dict:
+        """Same shape as the SQL-backed /api/sentiments/stats response, in O(buckets)"""
+        since = _minute((now or datetime.utcnow()) - timedelta(hours=hours))
+        total = 0
+        score_sum = 0.0
+        labels = dict.fromkeys(LABELS, 0)
+        sources: Dict[str, list] = {}
+
+        with self._lock:
+            for minute, bucket in self._buckets.items():
+                if minute < since:
+                    continue
+                total += bucket.total
+                score_sum += bucket.score_sum
+                for label, count in bucket.labels.items():
+                    labels[label] = labels.get(label, 0) + count
+                for source, (count, source_sum) in bucket.sources.items():
+                    entry = sources.setdefault(source, [0, 0.0])
+                    entry[0] += count
+                    entry[1] += source_sum
+
+        if total == 0:
+            return {
+                "total": 0,
+                "positive": 0,
+                "negative": 0,
+                "neutral": 0,
+                "average_score": 0,
+                "by_source": {}
+            }
+
+        return {
+            "total": total,
+            "positive": labels["positive"],
+            "negative": labels["negative"],
+            "neutral": labels["neutral"],
+            "average_score": round(score_sum / total, 3),
+            "by_source": {
+                source: {"count": count, "avg_score": source_sum / count}
+                for source, (count, source_sum) in sources.items()
+            }
+        }
+
+    def _prune(self):
+        # Called with the lock held whenever a new minute bucket appears; at most one sweep per minute
+        oldest_allowed = _minute(datetime.utcnow() - timedelta(hours=self.retention_hours))
+        if oldest_allowed == self._last_prune:
+            return
+        self._last_prune = self._oldest_allowed = oldest_allowed
+        for minute in [m for m in self._buckets if m < self._oldest_allowed]:
+            del self._buckets[minute]
+
+
+# Singleton instance
+_stats_aggregator = None
+
+def get_stats_aggregator() -> StatsAggregator:
+    global _stats_aggregator
+    if _stats_aggregator is None:
+        _stats_aggregator = StatsAggregator(retention_hours=settings.stats_retention_hours)
+    return _stats_aggregator
@@ -0,0 +1,139 @@
+"""
+Incrementally maintained term frequencies for the word cloud
+Each text is tokenized once at ingest and its terms are counted into per-hour
+buckets split by sentiment label; top-K queries merge the buckets in the window
+"""
+import heapq
+import re
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from config import settings
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further get got had has have
+having he her here hers herself him himself his how i if in into is it its itself just me more most my myself
+no nor not now of off on once only or other our ours ourselves out over own same she should so some such
+than that the their theirs them themselves then there these they this those through to too under until up
+us very was we were what when where which while who whom why will with would you your yours yourself
+yourselves im ive dont cant wont didnt doesnt isnt thats youre been really still even much many every
+""".split())
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9']*")
+
+
+def tokenize(text: str, min_length: int = 4) -> List[str]:
+    """Lowercased words without punctuation or stop words; each term counted once per text"""
+    terms = []
+    seen = set()
+    for word in _WORD.findall((text or "").lower()):
+        word = word.replace("'", "")
+        if len(word) < min_length or word in STOP_WORDS or word.isdigit() or word in seen:
+            continue
+        seen.add(word)
+        terms.append(word)
+    return terms
+
+
+def _hour(ts: datetime) -> int:
+    return int(ts.timestamp() // 3600) if ts.tzinfo else int((ts - datetime(1970, 1, 1)).total_seconds() // 3600)
+
+
+class TermIndex:
+    def __init__(self, retention_hours: int = 72, max_terms_per_bucket: int = 5000):
+        self.retention_hours = retention_hours
+        self.max_terms_per_bucket = max_terms_per_bucket
+        self._buckets: Dict[int, Dict[str, Counter]] = {}  # hour -> label -> term counts
+        self._lock = threading.Lock()
+        self._oldest_allowed = 0
+        self._last_prune = None
+        self.trimmed_terms = 0
+
+    def add(self, created_at: datetime, label: str, text: str):
+        terms = tokenize(text)
+        if not terms:
+            return
+        hour = _hour(created_at)
+        with self._lock:
+            if hour < self._oldest_allowed:
+                return
+            bucket = self._buckets.get(hour)
+            if bucket is None:
+                bucket = self._buckets[hour] = {}
+                self._prune()
+            counts = bucket.get(label)
+            if counts is None:
+                counts = bucket[label] = Counter()
+            counts.update(terms)
+            if len(counts) > self.max_terms_per_bucket:
+                self._trim(counts)
+
+    def add_record(self, record: Dict):
+        """Update from a record dict as produced by SentimentRecord.to_dict()"""
+        created_at = record.get("created_at")
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        self.add(created_at or datetime.utcnow(), record["sentiment_label"], record["text"])
+
+    def clear(self):
+        with self._lock:
+            self._buckets = {}
+            self._oldest_allowed = 0
+            self._last_prune = None
+
+    def covers(self, hours: float) -> bool:
+        return 0 < hours <= self.retention_hours
+
+    def top(self, hours: float, k: int = 20, label: Optional[str] = None, now: Optional[datetime] = None) -> List[Dict]:
+        """Top-k terms over the buckets of the last `hours` (whole hours), optionally for one label"""
+        since = _hour((now or datetime.utcnow()) - timedelta(hours=hours))
+        merged: Counter = Counter()
+        with self._lock:
+            for hour, bucket in self._buckets.items():
+                if hour < since:
+                    continue
+                for bucket_label, counts in bucket.items():
+                    if label is None or bucket_label == label:
+                        merged.update(counts)
+        return [{"term": term, "count": count} for term, count in heapq.nlargest(k, merged.items(), key=lambda item: item[1])]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "buckets": len(self._buckets),
+                "terms": sum(len(counts) for bucket in self._buckets.values() for counts in bucket.values()),
+                "trimmed_terms": self.trimmed_terms,
+            }
+
+    def _trim(self, counts: Counter):
+        # Keep the heaviest half of the bucket; the long tail of one-off words is what grows without bound
+        keep = self.max_terms_per_bucket // 2
+        survivors = heapq.nlargest(keep, counts.items(), key=lambda item: item[1])
+        self.trimmed_terms += len(counts) - len(survivors)
+        counts.clear()
+        counts.update(dict(survivors))
+
+    def _prune(self):
+        # Called with the lock held whenever a new hour bucket appears; at most one sweep per hour
+        oldest_allowed = _hour(datetime.utcnow() - timedelta(hours=self.retention_hours))
+        if oldest_allowed == self._last_prune:
+            return
+        self._last_prune = self._oldest_allowed = oldest_allowed
+        for hour in [h for h in self._buckets if h < self._oldest_allowed]:
+            del self._buckets[hour]
+
+
+# Singleton instance
+_term_index = None
+
+def get_term_index() -> TermIndex:
+    global _term_index
+    if _term_index is None:
+        _term_index = TermIndex(
+            retention_hours=settings.term_retention_hours,
+            max_terms_per_bucket=settings.term_max_per_bucket
+        )
+    return _term_index
@@ -0,0 +1,185 @@
+"""
+Write-behind persistence for sentiment records and their alerts
+Callers hand over ORM objects and await them; a single writer task commits everything
+queued within a short window in one transaction and fills in the assigned IDs
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from models.database import SentimentRecord, Alert
+from services.metrics import ALERTS_CREATED, stage_timer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingWrite:
+    record: SentimentRecord
+    alert: Optional[Alert]
+    future: asyncio.Future
+
+
+def _row(obj) -> Dict:
+    """Column values of a transient ORM object, without the primary key"""
+    return {column.key: getattr(obj, column.key) for column in obj.__table__.columns if column.key != "id"}
+
+
+class WriteBehindQueue:
+    def __init__(self, session_factory, max_batch_size: int = 200, max_delay_ms: float = 20.0, max_queue_size: int = 10000):
+        self.session_factory = session_factory
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_delay = max_delay_ms / 1000.0
+        # Bounded so producers slow down instead of buffering without limit when the DB falls behind
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self._stopped = False  # writer task has exited; nothing queued from now on gets committed
+        self.counts = {"records": 0, "alerts": 0, "transactions": 0, "failed": 0}
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def add(self, record: SentimentRecord, alert: Alert = None) -> Tuple[SentimentRecord, Optional[Alert]]:
+        """
+        Queue a record (and optionally an alert about it) and wait until they are committed
+        The same objects are returned with id, defaults and alert.sentiment_record_id filled in
+        """
+        if self._closed:
+            raise RuntimeError("Write-behind queue is closed")
+        future = asyncio.get_running_loop().create_future()
+        pending = _PendingWrite(record, alert, future)
+        await self._queue.put(pending)
+        # A put that was blocked on a full queue can land behind the stop sentinel
+        if self._stopped:
+            self._fail(pending, RuntimeError("Write-behind queue is closed"))
+        await future
+        return record, alert
+
+    async def close(self):
+        """Stop accepting writes and flush everything already queued"""
+        self._closed = True
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._stopped = True
+        # Producers that were blocked on the full queue enqueued behind the sentinel
+        while not self._queue.empty():
+            pending = self._queue.get_nowait()
+            if pending is not None:
+                self._fail(pending, RuntimeError("Write-behind queue is closed"))
+
+    def stats(self) -> Dict:
+        return {"queued": self._queue.qsize(), **self.counts}
+
+    async def _run(self):
+        while True:
+            first = await self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            stop = False
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                # Take whatever is already queued without waiting
+                if not self._queue.empty():
+                    item = self._queue.get_nowait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+            if stop:
+                return
+
+    async def _flush(self, batch: List[_PendingWrite]):
+        now = datetime.utcnow()
+        for pending in batch:
+            # Column defaults are only applied for omitted keys, so set them here
+            pending.record.created_at = pending.record.created_at or now
+            pending.record.processed_at = pending.record.processed_at or now
+            if pending.alert is not None:
+                pending.alert.created_at = pending.alert.created_at or now
+                pending.alert.is_resolved = pending.alert.is_resolved or 0
+
+        try:
+            await self._write(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                self._fail(batch[0], e)
+                return
+            # One bad row (e.g. a duplicate source_id) must not fail its neighbours: retry one by one
+            logger.warning(f"Write-behind batch of {len(batch)} failed ({e}), retrying individually")
+            for pending in batch:
+                try:
+                    await self._write([pending])
+                except Exception as row_error:
+                    self._fail(pending, row_error)
+                else:
+                    self._resolve([pending])
+            return
+        self._resolve(batch)
+
+    async def _write(self, batch: List[_PendingWrite]):
+        with stage_timer("db_commit"):
+            await self._write_transaction(batch)
+        self.counts["transactions"] += 1
+        self.counts["records"] += len(batch)
+        for pending in batch:
+            if pending.alert is not None:
+                self.counts["alerts"] += 1
+                ALERTS_CREATED.inc(severity=pending.alert.severity)
+
+    async def _write_transaction(self, batch: List[_PendingWrite]):
+        async with self.session_factory() as db:
+            try:
+                record_ids = (await db.execute(
+                    insert(SentimentRecord).returning(SentimentRecord.id, sort_by_parameter_order=True),
+                    [_row(pending.record) for pending in batch]
+                )).scalars().all()
+                for pending, record_id in zip(batch, record_ids):
+                    pending.record.id = record_id
+                    if pending.alert is not None:
+                        pending.alert.sentiment_record_id = record_id
+
+                alerts = [pending.alert for pending in batch if pending.alert is not None]
+                if alerts:
+                    alert_ids = (await db.execute(
+                        insert(Alert).returning(Alert.id, sort_by_parameter_order=True),
+                        [_row(alert) for alert in alerts]
+                    )).scalars().all()
+                    for alert, alert_id in zip(alerts, alert_ids):
+                        alert.id = alert_id
+                await db.commit()
+            except SQLAlchemyError:
+                await db.rollback()
+                raise
+
+    def _resolve(self, batch: List[_PendingWrite]):
+        for pending in batch:
+            if not pending.future.done():
+                pending.future.set_result(None)
+
+    def _fail(self, pending: _PendingWrite, error: Exception):
+        if pending.future.done():
+            return
+        self.counts["failed"] += 1
+        pending.future.set_exception(error)
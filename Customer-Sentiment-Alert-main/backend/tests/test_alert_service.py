@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.alert_service import AlertService
+
+
+def test_observe_expires_samples_outside_the_window():
+    service = AlertService()
+    now = datetime.utcnow()
+    old = now - service.alert_window - timedelta(minutes=5)
+    for i in range(100):
+        service.observe("twitter", 0.5, old + timedelta(seconds=i))
+    assert len(service.windows["twitter"]) == 100
+
+    service.observe("twitter", 0.1, now)
+
+    window = service.windows["twitter"]
+    assert len(window) == 1
+    assert window.trailing_average(10) == pytest.approx(0.1)
+
+
+def test_observe_keeps_samples_inside_the_window():
+    service = AlertService()
+    now = datetime.utcnow()
+    for i in range(10):
+        service.observe("reddit", 0.2, now - timedelta(minutes=1) + timedelta(seconds=i))
+    service.observe("reddit", 0.4, now)
+
+    assert len(service.windows["reddit"]) == 11
+
+
+def test_forget_takes_a_sample_back_out_of_the_window():
+    service = AlertService()
+    now = datetime.utcnow()
+    scores = [0.9, 0.1, 0.8, 0.7]
+    for i, score in enumerate(scores):
+        service.observe("twitter", score, now + timedelta(seconds=i))
+
+    service.forget("twitter", 0.1, now + timedelta(seconds=1))
+
+    window = service.windows["twitter"]
+    assert len(window) == 3
+    assert window.trailing_average(10) == pytest.approx((0.9 + 0.8 + 0.7) / 3)
+    assert window.trailing_average(2) == pytest.approx((0.8 + 0.7) / 2)
+
+
+def test_forget_ignores_samples_no_longer_in_the_window():
+    service = AlertService()
+    now = datetime.utcnow()
+    service.observe("twitter", 0.5, now)
+
+    service.forget("twitter", 0.5, now - timedelta(seconds=1))
+    service.forget("reddit", 0.5, now)
+
+    assert len(service.windows["twitter"]) == 1
@@ -0,0 +1,50 @@
+import asyncio
+import json
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from models.database import SentimentRecord, get_async_session_maker, init_async_db
+from services.bulk_ingest import BulkIngestor
+
+
+class FakeInference:
+    async def analyze_batch(self, texts):
+        return [{"score": 0.5, "label": "neutral", "confidence": 0.9, "emotions": {}} for _ in texts]
+
+
+async def _items(mentions):
+    for index, mention in enumerate(mentions):
+        yield index, mention
+
+
+def test_rows_inserted_concurrently_are_reported_as_duplicates(tmp_path):
+    async def run():
+        engine = await init_async_db(f"sqlite+aiosqlite:///{tmp_path / 'bulk.db'}")
+        session_factory = get_async_session_maker(engine)
+        async with session_factory() as db:
+            db.add(SentimentRecord(
+                source="manual", source_id="taken", text="stored first", sentiment_score=0.5,
+                sentiment_label="neutral", confidence=0.9, emotions="{}", author="a",
+                created_at=datetime.utcnow(), processed_at=datetime.utcnow(),
+            ))
+            await db.commit()
+
+        ingestor = BulkIngestor(session_factory, FakeInference())
+
+        async def nothing_existing(source_ids):
+            return set()  # the other writer commits right after the duplicate check
+
+        ingestor._existing_source_ids = nothing_existing
+        mentions = [{"source_id": "taken", "text": "late copy"}, {"source_id": "new", "text": "fresh"}]
+        lines = [json.loads(line) async for line in ingestor.run(_items(mentions))]
+
+        async with session_factory() as db:
+            count = await db.scalar(select(func.count()).select_from(SentimentRecord))
+        await engine.dispose()
+        return lines, count
+
+    lines, count = asyncio.run(run())
+    assert [line["status"] for line in lines[:2]] == ["duplicate", "ok"]
+    assert lines[-1]["inserted"] == 1 and lines[-1]["duplicates"] == 1 and lines[-1]["errors"] == 0
+    assert count == 2
@@ -0,0 +1,24 @@
+from services.dedupe import DedupeIndex
+
+
+def test_unseeded_index_sends_unknown_ids_to_the_database():
+    index = DedupeIndex(max_entries=10, bloom_capacity=1000)
+    index.add("live")
+
+    assert index.seen("live") is True
+    assert index.seen("stored-before-restart") is None
+
+    index.seed(["stored-before-restart"])
+
+    assert index.seen("stored-before-restart") is True
+    assert index.seen("live") is True
+    assert index.seen("brand-new") is False
+
+
+def test_seed_keeps_only_the_newest_ids_recent():
+    index = DedupeIndex(max_entries=2, bloom_capacity=100000)
+    index.seed([f"id{i}" for i in range(25000)])
+
+    assert index.stats()["recent"] == 2
+    assert index.seen("id24999") is True
+    assert index.seen("id0") is None  # only the Bloom filters remember it
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from config import settings
+from export_models import parity_errors, reference_scores
+from services.inference_backends import (
+    EMOTION_MODEL, SENTIMENT_MODEL, OnnxBackend, TorchScriptBackend, model_dir_name
+)
+
+TOLERANCE = 1e-3
+
+
+def _exported(backend_class) -> bool:
+    return all(
+        os.path.exists(os.path.join(settings.model_export_dir, model_dir_name(name), backend_class.model_file))
+        for name in (SENTIMENT_MODEL, EMOTION_MODEL)
+    )
+
+
+@pytest.fixture(scope="module")
+def expected():
+    return reference_scores()
+
+
+@pytest.mark.parametrize("backend_class", [OnnxBackend, TorchScriptBackend], ids=["onnx", "torchscript"])
+def test_exported_backend_matches_transformers(backend_class, request):
+    if not _exported(backend_class):
+        pytest.skip(f"no exported {backend_class.name} models in {settings.model_export_dir} (run export_models.py)")
+    if backend_class is OnnxBackend:
+        pytest.importorskip("onnxruntime")
+
+    # Requested only now, so the reference models aren't loaded when every backend is skipped
+    expected = request.getfixturevalue("expected")
+    assert parity_errors(backend_class(settings.model_export_dir), expected, TOLERANCE) == []
@@ -0,0 +1,73 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.stats_aggregator import StatsAggregator
+
+
+def _recompute(rows, since):
+    """The per-row aggregation the endpoint used to run over the query result"""
+    recent = [row for row in rows if row[0] >= since]
+    if not recent:
+        return {"total": 0, "positive": 0, "negative": 0, "neutral": 0, "average_score": 0, "by_source": {}}
+    by_source = {}
+    for _, source, _, score in recent:
+        by_source.setdefault(source, []).append(score)
+    return {
+        "total": len(recent),
+        "positive": sum(1 for row in recent if row[2] == "positive"),
+        "negative": sum(1 for row in recent if row[2] == "negative"),
+        "neutral": sum(1 for row in recent if row[2] == "neutral"),
+        "average_score": round(sum(row[3] for row in recent) / len(recent), 3),
+        "by_source": {
+            source: {"count": len(scores), "avg_score": sum(scores) / len(scores)}
+            for source, scores in by_source.items()
+        },
+    }
+
+
+@pytest.mark.parametrize("hours", [1, 6, 24, 72])
+def test_stats_match_recomputation(hours):
+    rng = random.Random(hours)
+    now = datetime.utcnow().replace(second=30, microsecond=0)
+    rows = []
+    while len(rows) < 2000:
+        # Buckets are whole minutes: keep rows out of the minute each window starts in
+        minutes = rng.randint(1, 96 * 60)
+        if minutes % 60 == 0:
+            continue
+        created_at = now - timedelta(minutes=minutes) + timedelta(seconds=rng.randint(-25, 25))
+        score = round(rng.random(), 3)
+        label = "positive" if score > 0.6 else "negative" if score < 0.4 else "neutral"
+        rows.append((created_at, rng.choice(["twitter", "reddit", "manual"]), label, score))
+
+    aggregator = StatsAggregator(retention_hours=168)
+    aggregator.rebuild(rows)
+
+    expected = _recompute(rows, now - timedelta(hours=hours))
+    actual = aggregator.stats(hours, now=now)
+
+    assert {k: v for k, v in actual.items() if k != "by_source"} == \
+        pytest.approx({k: v for k, v in expected.items() if k != "by_source"})
+    assert actual["by_source"].keys() == expected["by_source"].keys()
+    for source, entry in expected["by_source"].items():
+        assert actual["by_source"][source]["count"] == entry["count"]
+        assert actual["by_source"][source]["avg_score"] == pytest.approx(entry["avg_score"])
+
+
+def test_records_added_after_rebuild_are_counted():
+    now = datetime.utcnow()
+    aggregator = StatsAggregator()
+    aggregator.rebuild([(now - timedelta(minutes=5), "twitter", "negative", 0.1)])
+    aggregator.add_record({
+        "created_at": (now - timedelta(minutes=2)).isoformat(),
+        "source": "twitter",
+        "sentiment_label": "positive",
+        "sentiment_score": 0.9,
+    })
+
+    stats = aggregator.stats(1, now=now)
+    assert stats["total"] == 2
+    assert stats["positive"] == 1 and stats["negative"] == 1
+    assert stats["by_source"]["twitter"]["avg_score"] == pytest.approx(0.5)
@@ -0,0 +1,21 @@
+import pytest
+
+from services.connection_manager import SubscriptionFilter
+
+
+def test_from_message_normalizes_values():
+    subscription = SubscriptionFilter.from_message({"events": "Alert", "labels": ["NEGATIVE"], "sources": ["forum"]})
+
+    assert subscription.to_dict() == {"events": ["alert"], "sources": ["forum"], "severities": [], "labels": ["negative"]}
+
+
+@pytest.mark.parametrize("filters", [
+    {"events": ["alerts"]},
+    {"severities": ["critcal"]},
+    {"labels": ["angry"]},
+    {"region": ["eu"]},
+    {"sources": "twitter", "severities": ["high", "urgent"]},
+])
+def test_from_message_rejects_unknown_fields_and_values(filters):
+    with pytest.raises(ValueError):
+        SubscriptionFilter.from_message(filters)
@@ -52,6 +52,40 @@ export interface Stats {
   by_source: Record<string, { count: number; avg_score: number }>
 }
 
+// Counter changes carried by a coalesced 'batch' WebSocket frame
+interface BatchDeltas {
+  total: number
+  positive: number
+  negative: number
+  neutral: number
+  score_sum: number
+  by_source: Record<string, { count: number; score_sum: number }>
+  alerts: Record<string, number>
+}
+
+function applyStatsDeltas(stats: Stats, deltas: BatchDeltas): Stats {
+  const total = stats.total + deltas.total
+  const bySource = { ...stats.by_source }
+  Object.entries(deltas.by_source).forEach(([source, delta]) => {
+    const current = bySource[source] ?? { count: 0, avg_score: 0 }
+    const count = current.count + delta.count
+    bySource[source] = {
+      count,
+      avg_score: count ? (current.avg_score * current.count + delta.score_sum) / count : 0,
+    }
+  })
+  return {
+    total,
+    positive: stats.positive + deltas.positive,
+    negative: stats.negative + deltas.negative,
+    neutral: stats.neutral + deltas.neutral,
+    average_score: total
+      ? Math.round(((stats.average_score * stats.total + deltas.score_sum) / total) * 1000) / 1000
+      : 0,
+    by_source: bySource,
+  }
+}
+
 function App() {
   const [currentView, setCurrentView] = useState<'landing' | 'login' | 'register' | 'app'>('landing')
   const [activeTab, setActiveTab] = useState('dashboard')
@@ -64,7 +98,8 @@ function App() {
   const [voiceEnabled, setVoiceEnabled] = useState(false)
   const lastStatsUpdateRef = useRef(0)
 
-  const { isConnected, lastMessage } = useWebSocket('ws://localhost:8000/ws')
+  // Coalesced stream: at most one 'batch' frame per interval, however fast mentions arrive
+  const { isConnected, lastMessage } = useWebSocket('ws://localhost:8000/ws?coalesce=true')
   const { announceAlert, testVoice } = useVoiceAlerts({ enabled: voiceEnabled })
 
   const handleToggleVoice = () => {
@@ -156,6 +191,28 @@ function App() {
       if (voiceEnabled) {
         announceAlert(newAlert.severity, newAlert.id)
       }
+    } else if (lastMessage.type === 'batch') {
+      const events = lastMessage.data.events as { type: string; data: any }[]
+      const newSentiments = events.filter(e => e.type === 'sentiment').map(e => e.data as SentimentRecord).reverse()
+      const newAlerts = events.filter(e => e.type === 'alert').map(e => e.data as Alert).reverse()
+
+      // One state update per frame instead of one per event
+      if (newSentiments.length) {
+        setSentiments((prev) => {
+          const known = new Set(prev.map(s => s.id))
+          return [...newSentiments.filter(s => !known.has(s.id)), ...prev].slice(0, 100)
+        })
+        setStats((prev) => (prev ? applyStatsDeltas(prev, lastMessage.data.deltas) : prev))
+      }
+      if (newAlerts.length) {
+        setAlerts((prev) => {
+          const known = new Set(prev.map(a => a.id))
+          return [...newAlerts.filter(a => !known.has(a.id)), ...prev]
+        })
+        if (voiceEnabled) {
+          announceAlert(newAlerts[0].severity, newAlerts[0].id)
+        }
+      }
     }
   }, [lastMessage, voiceEnabled, announceAlert])
 
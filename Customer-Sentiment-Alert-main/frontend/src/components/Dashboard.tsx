@@ -4,8 +4,10 @@ import SentimentChart from './SentimentChart'
 import AlertPanel from './AlertPanel'
 import SourceMonitor from './SourceMonitor'
 import InsightsPanel from './InsightsPanel'
+import WordCloud from './WordCloud'
 import type { SentimentRecord, Alert, Stats } from '../App'
 import { exportAsJSON, exportAsCSV, exportSummaryReport } from '../lib/exportReport'
+import { api } from '../lib/api'
 
 interface DashboardProps {
   sentiments: SentimentRecord[]
@@ -31,7 +33,7 @@ export default function Dashboard({
   const [selectedSource, setSelectedSource] = useState<string | null>(null)
   const [showExportMenu, setShowExportMenu] = useState(false)
 
-  const handleExport = (format: 'json' | 'csv' | 'summary') => {
+  const handleExport = (format: 'json' | 'csv' | 'summary' | 'server-csv' | 'server-parquet') => {
     const reportData = {
       sentiments,
       alerts,
@@ -49,6 +51,12 @@ export default function Dashboard({
       case 'summary':
         exportSummaryReport(reportData)
         break
+      case 'server-csv':
+        window.location.href = api.exportUrl('csv', 'sentiments', selectedSource ?? undefined)
+        break
+      case 'server-parquet':
+        window.location.href = api.exportUrl('parquet', 'sentiments', selectedSource ?? undefined)
+        break
     }
 
     setShowExportMenu(false)
@@ -133,6 +141,18 @@ export default function Dashboard({
                     >
                       💾 JSON Data
                     </button>
+                    <button
+                      onClick={() => handleExport('server-csv')}
+                      className="w-full text-left px-4 py-2 text-sm text-slate-700 hover:bg-slate-100"
+                    >
+                      🗄️ Full History (.csv)
+                    </button>
+                    <button
+                      onClick={() => handleExport('server-parquet')}
+                      className="w-full text-left px-4 py-2 text-sm text-slate-700 hover:bg-slate-100"
+                    >
+                      🗄️ Full History (.parquet)
+                    </button>
                   </div>
                 )}
               </div>
@@ -195,6 +215,7 @@ export default function Dashboard({
           <div className="space-y-6">
             <AlertPanel alerts={unresolvedAlerts} onResolve={onResolveAlert} />
             <InsightsPanel sentiments={sentiments} stats={stats} />
+            <WordCloud sentiments={sentiments} />
           </div>
         </div>
       </div>
@@ -1,5 +1,6 @@
 import { Search, Filter, Calendar, X, ChevronDown } from 'lucide-react'
 import { useState } from 'react'
+import { api } from '../lib/api'
 
 export default function SearchPanel() {
   const [searchQuery, setSearchQuery] = useState('')
@@ -11,162 +12,34 @@ export default function SearchPanel() {
   const [selectedSentiment, setSelectedSentiment] = useState('all')
   const [dateRange, setDateRange] = useState('all')
 
-  const allMockResults = [
-    // Twitter
-    {
-      id: 1,
-      text: "Your customer service is absolutely terrible. Been waiting for 3 hours with no response!",
-      author: "frustrated_customer",
-      source: "twitter",
-      sentiment: "negative",
-      score: -0.85,
-      date: "2 hours ago",
-      timestamp: Date.now() - 2 * 60 * 60 * 1000
-    },
-    {
-      id: 2,
-      text: "Just tried your new feature and it's incredible! Best update ever! 🎉",
-      author: "tech_enthusiast",
-      source: "twitter",
-      sentiment: "positive",
-      score: 0.95,
-      date: "3 hours ago",
-      timestamp: Date.now() - 3 * 60 * 60 * 1000
-    },
-    {
-      id: 3,
-      text: "The app keeps crashing on my phone. Really frustrating experience.",
-      author: "mobile_user",
-      source: "twitter",
-      sentiment: "negative",
-      score: -0.68,
-      date: "5 hours ago",
-      timestamp: Date.now() - 5 * 60 * 60 * 1000
-    },
-    // Reddit
-    {
-      id: 4,
-      text: "Has anyone else had issues with the payment system? Mine failed twice today.",
-      author: "reddit_user_123",
-      source: "reddit",
-      sentiment: "negative",
-      score: -0.55,
-      date: "1 hour ago",
-      timestamp: Date.now() - 1 * 60 * 60 * 1000
-    },
-    {
-      id: 5,
-      text: "I've been using this for 6 months now and it's been absolutely fantastic. Highly recommend!",
-      author: "long_time_user",
-      source: "reddit",
-      sentiment: "positive",
-      score: 0.88,
-      date: "4 hours ago",
-      timestamp: Date.now() - 4 * 60 * 60 * 1000
-    },
-    {
-      id: 6,
-      text: "The interface is okay, nothing special but gets the job done.",
-      author: "casual_reviewer",
-      source: "reddit",
-      sentiment: "neutral",
-      score: 0.15,
-      date: "6 hours ago",
-      timestamp: Date.now() - 6 * 60 * 60 * 1000
-    },
-    // Reviews
-    {
-      id: 7,
-      text: "The delivery was 2 weeks late and the package arrived damaged.",
-      author: "angry_user",
-      source: "review",
-      sentiment: "negative",
-      score: -0.72,
-      date: "8 hours ago",
-      timestamp: Date.now() - 8 * 60 * 60 * 1000
-    },
-    {
-      id: 8,
-      text: "Amazing product! Exceeded all my expectations. Highly recommend!",
-      author: "happy_buyer",
-      source: "review",
-      sentiment: "positive",
-      score: 0.92,
-      date: "1 day ago",
-      timestamp: Date.now() - 24 * 60 * 60 * 1000
-    },
-    {
-      id: 9,
-      text: "Good quality but a bit overpriced for what you get.",
-      author: "value_shopper",
-      source: "review",
-      sentiment: "neutral",
-      score: 0.25,
-      date: "2 days ago",
-      timestamp: Date.now() - 48 * 60 * 60 * 1000
-    },
-    // Support
-    {
-      id: 10,
-      text: "Support team was very helpful and resolved my issue quickly!",
-      author: "satisfied_customer",
-      source: "support",
-      sentiment: "positive",
-      score: 0.85,
-      date: "30 minutes ago",
-      timestamp: Date.now() - 30 * 60 * 1000
-    },
-    {
-      id: 11,
-      text: "Still waiting for a response to my ticket from 3 days ago...",
-      author: "waiting_user",
-      source: "support",
-      sentiment: "negative",
-      score: -0.62,
-      date: "3 days ago",
-      timestamp: Date.now() - 72 * 60 * 60 * 1000
-    }
-  ]
-
-  const handleSearch = () => {
+  const handleSearch = async () => {
+    if (!searchQuery.trim()) return
     setIsSearching(true)
     setHasSearched(true)
-    
-    // Simulate search with filters
-    setTimeout(() => {
-      let filtered = allMockResults
-      
-      // Apply search query filter
-      if (searchQuery.trim()) {
-        filtered = filtered.filter(result => 
-          result.text.toLowerCase().includes(searchQuery.toLowerCase()) ||
-          result.author.toLowerCase().includes(searchQuery.toLowerCase())
-        )
-      }
-      
-      // Apply source filter
-      if (selectedSource !== 'all') {
-        filtered = filtered.filter(result => result.source === selectedSource)
-      }
-      
-      // Apply sentiment filter
-      if (selectedSentiment !== 'all') {
-        filtered = filtered.filter(result => result.sentiment === selectedSentiment)
-      }
-      
-      // Apply date range filter
-      const now = Date.now()
-      if (dateRange === '24h') {
-        filtered = filtered.filter(result => now - result.timestamp < 24 * 60 * 60 * 1000)
-      } else if (dateRange === '7d') {
-        filtered = filtered.filter(result => now - result.timestamp < 7 * 24 * 60 * 60 * 1000)
-      } else if (dateRange === '30d') {
-        filtered = filtered.filter(result => now - result.timestamp < 30 * 24 * 60 * 60 * 1000)
-      }
-      
-      setSearchResults(filtered)
+
+    const since = dateRange === '24h' ? 1 : dateRange === '7d' ? 7 : dateRange === '30d' ? 30 : undefined
+
+    try {
+      const { items } = await api.search(searchQuery, {
+        source: selectedSource !== 'all' ? selectedSource : undefined,
+        label: selectedSentiment !== 'all' ? selectedSentiment : undefined,
+        since: since ? new Date(Date.now() - since * 24 * 60 * 60 * 1000).toISOString().slice(0, -1) : undefined, // naive UTC, like created_at
+      })
+      setSearchResults(items.map((record: any) => ({
+        id: record.id,
+        text: record.text,
+        author: record.author,
+        source: record.source,
+        sentiment: record.sentiment_label,
+        score: record.sentiment_score,
+        date: record.created_at ? new Date(record.created_at + 'Z').toLocaleString() : '',
+      })))
+    } catch (error) {
+      console.error('Search failed:', error)
+      setSearchResults([])
+    } finally {
       setIsSearching(false)
-    }, 1000)
+    }
   }
 
   const handleClearSearch = () => {
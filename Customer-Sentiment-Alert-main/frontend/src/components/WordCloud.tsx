@@ -1,45 +1,29 @@
-import { useMemo } from 'react'
+import { useEffect, useState } from 'react'
 import type { SentimentRecord } from '../App'
+import { api } from '../lib/api'
 
 interface WordCloudProps {
   sentiments: SentimentRecord[]
 }
 
 export default function WordCloud({ sentiments }: WordCloudProps) {
-  const wordFrequency = useMemo(() => {
-    // Filter only negative sentiments
-    const negativeSentiments = sentiments.filter(s => s.sentiment_score < -0.1)
-    
-    // Common stop words to exclude
-    const stopWords = new Set([
-      'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-      'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
-      'be', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-      'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those',
-      'i', 'you', 'he', 'she', 'it', 'we', 'they', 'my', 'your', 'his', 'her',
-      'its', 'our', 'their', 'me', 'him', 'them', 'us', 'am', 'not', 'just'
-    ])
+  const [wordFrequency, setWordFrequency] = useState<[string, number][]>([])
 
-    const wordCount = new Map<string, number>()
+  // Term counts are kept by the backend at ingest; refetch whenever a newer mention arrives
+  // (keyed on the newest id, since the feed is capped at 100 entries and its length stops changing)
+  const newestId = sentiments[0]?.id
 
-    negativeSentiments.forEach(sentiment => {
-      // Extract words from text
-      const words = sentiment.text
-        .toLowerCase()
-        .replace(/[^\w\s]/g, '') // Remove punctuation
-        .split(/\s+/)
-        .filter(word => word.length > 3 && !stopWords.has(word))
-
-      words.forEach(word => {
-        wordCount.set(word, (wordCount.get(word) || 0) + 1)
+  useEffect(() => {
+    let active = true
+    api.getTopTerms(24, 20, 'negative')
+      .then(terms => {
+        if (active) setWordFrequency(terms.map(({ term, count }) => [term, count] as [string, number]))
       })
-    })
-
-    // Convert to array and sort by frequency
-    return Array.from(wordCount.entries())
-      .sort((a, b) => b[1] - a[1])
-      .slice(0, 20) // Top 20 words
-  }, [sentiments])
+      .catch(error => console.error('Failed to load top terms:', error))
+    return () => {
+      active = false
+    }
+  }, [newestId])
 
   const maxCount = wordFrequency[0]?.[1] || 1
 
@@ -17,11 +17,43 @@ export const api = {
     return response.data
   },
 
+  // Cursor pagination: pass nextCursor back to fetch the following (older) page
+  getSentimentsPage: async (limit = 50, source?: string, cursor?: string) => {
+    const params = new URLSearchParams({ limit: limit.toString() })
+    if (source) params.append('source', source)
+    if (cursor) params.append('cursor', cursor)
+    const response = await apiClient.get(`/sentiments?${params}`)
+    return { items: response.data, nextCursor: response.headers['x-next-cursor'] as string | undefined }
+  },
+
+  // Full-text search: words must all match, "quoted phrases" match in order, word* matches a prefix
+  search: async (
+    q: string,
+    filters: { source?: string; label?: string; since?: string; sort?: 'relevance' | 'recent' } = {},
+    limit = 20,
+    cursor?: string
+  ) => {
+    const params = new URLSearchParams({ q, limit: limit.toString() })
+    Object.entries(filters).forEach(([key, value]) => {
+      if (value) params.append(key, value)
+    })
+    if (cursor) params.append('cursor', cursor)
+    const response = await apiClient.get(`/search?${params}`)
+    return { items: response.data, nextCursor: response.headers['x-next-cursor'] as string | undefined }
+  },
+
   getStats: async (hours = 24) => {
     const response = await apiClient.get(`/sentiments/stats?hours=${hours}`)
     return response.data
   },
 
+  getTopTerms: async (hours = 24, k = 20, label?: 'positive' | 'negative' | 'neutral') => {
+    const params = new URLSearchParams({ hours: hours.toString(), k: k.toString() })
+    if (label) params.append('label', label)
+    const response = await apiClient.get(`/terms/top?${params}`)
+    return response.data.terms as { term: string; count: number }[]
+  },
+
   getAlerts: async (limit = 20, resolved?: boolean) => {
     const params = new URLSearchParams({ limit: limit.toString() })
     if (resolved !== undefined) params.append('resolved', resolved.toString())
@@ -29,6 +61,14 @@ export const api = {
     return response.data
   },
 
+  getAlertsPage: async (limit = 20, resolved?: boolean, cursor?: string) => {
+    const params = new URLSearchParams({ limit: limit.toString() })
+    if (resolved !== undefined) params.append('resolved', resolved.toString())
+    if (cursor) params.append('cursor', cursor)
+    const response = await apiClient.get(`/alerts?${params}`)
+    return { items: response.data, nextCursor: response.headers['x-next-cursor'] as string | undefined }
+  },
+
   resolveAlert: async (alertId: number) => {
     const response = await apiClient.post(`/alerts/${alertId}/resolve`)
     return response.data
@@ -39,6 +79,13 @@ export const api = {
     return response.data
   },
 
+  // Full-history export streamed by the server; open the URL to download
+  exportUrl: (format: 'csv' | 'ndjson' | 'parquet', kind: 'sentiments' | 'alerts' = 'sentiments', source?: string) => {
+    const params = new URLSearchParams({ format, kind })
+    if (source) params.append('source', source)
+    return `${API_BASE_URL}/export?${params}`
+  },
+
   triggerCrisis: async () => {
     const response = await apiClient.post('/demo/crisis')
     return response.data